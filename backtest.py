@@ -0,0 +1,61 @@
+import numpy as np
+from motor_jogos import DEZENAS_POR_JOGO, MASCARA_IMPARES, MASCARA_MOLDURA, MOLDURA_DEZENAS, contar_bits
+from perfil import perfilado
+
+# --- Backtest Vetorizado de Filtros ---
+# As métricas (repetidas do concurso anterior, ímpares e moldura) são calculadas uma vez para
+# todos os concursos. Uma grade de faixas é avaliada de uma só vez com um histograma 3D e a sua
+# soma de prefixos: cada combinação de faixas vira uma consulta O(1) de inclusão-exclusão.
+MAXIMOS = {'repetidas': DEZENAS_POR_JOGO, 'impares': DEZENAS_POR_JOGO, 'moldura': len(MOLDURA_DEZENAS)}
+
+
+def calcular_metricas_concursos(mascaras):
+    """
+    Métricas de cada concurso a partir do segundo: a posição i dos arrays se refere ao
+    concurso i + 1 do histórico informado, comparado com o concurso i.
+    """
+    mascaras = np.asarray(mascaras, dtype=np.uint32)
+    return {
+        'repetidas': contar_bits(mascaras[1:] & mascaras[:-1]).astype(np.int64),
+        'impares': contar_bits(mascaras[1:] & np.uint32(MASCARA_IMPARES)).astype(np.int64),
+        'moldura': contar_bits(mascaras[1:] & np.uint32(MASCARA_MOLDURA)).astype(np.int64),
+    }
+
+
+def filtrar_concursos_alinhados(metricas, repetidas, impares, moldura):
+    """Máscara booleana dos concursos cujas métricas caem nas três faixas (min, max)."""
+    alinhados = np.ones(len(metricas['repetidas']), dtype=bool)
+    for nome, (minimo, maximo) in (('repetidas', repetidas), ('impares', impares), ('moldura', moldura)):
+        alinhados &= (metricas[nome] >= minimo) & (metricas[nome] <= maximo)
+    return alinhados
+
+
+def gerar_faixas(minimo, maximo, largura_maxima=None):
+    """Todas as faixas (a, b) com minimo <= a <= b <= maximo e b - a < largura_maxima."""
+    return [(a, b) for a in range(minimo, maximo + 1) for b in range(a, maximo + 1)
+            if largura_maxima is None or b - a < largura_maxima]
+
+
+@perfilado("grade_alinhamento")
+def grade_alinhamento(metricas, faixas_repetidas, faixas_impares, faixas_moldura):
+    """
+    Percentual de concursos alinhados para cada combinação de faixas. Devolve um array
+    (len(faixas_repetidas), len(faixas_impares), len(faixas_moldura)).
+    """
+    total = len(metricas['repetidas'])
+    formato = tuple(MAXIMOS[nome] + 1 for nome in ('repetidas', 'impares', 'moldura'))
+    histograma = np.zeros(formato, dtype=np.int64)
+    np.add.at(histograma, (metricas['repetidas'], metricas['impares'], metricas['moldura']), 1)
+    # prefixo[i, j, k] = concursos com repetidas < i, ímpares < j e moldura < k
+    prefixo = np.zeros(tuple(n + 1 for n in formato), dtype=np.int64)
+    prefixo[1:, 1:, 1:] = histograma.cumsum(0).cumsum(1).cumsum(2)
+    limites = []
+    for eixo, faixas in enumerate((faixas_repetidas, faixas_impares, faixas_moldura)):
+        faixas = np.clip(np.asarray(faixas, dtype=np.int64).reshape(-1, 2), 0, formato[eixo] - 1)
+        forma = [1, 1, 1]
+        forma[eixo] = len(faixas)
+        limites.append((faixas[:, 0].reshape(forma), (faixas[:, 1] + 1).reshape(forma)))
+    (r0, r1), (i0, i1), (m0, m1) = limites
+    contagem = (prefixo[r1, i1, m1] - prefixo[r0, i1, m1] - prefixo[r1, i0, m1] - prefixo[r1, i1, m0]
+                + prefixo[r0, i0, m1] + prefixo[r0, i1, m0] + prefixo[r1, i0, m0] - prefixo[r0, i0, m0])
+    return contagem * 100.0 / total if total else np.zeros(contagem.shape)
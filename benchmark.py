@@ -0,0 +1,213 @@
+import os
+import sys
+import json
+import argparse
+import platform
+import tempfile
+from math import comb
+from datetime import datetime
+import numpy as np
+import pandas as pd
+import nucleo
+from historico import COLUNAS_BOLAS, COLUNAS_HISTORICO, carregar_historico
+from motor_jogos import DEZENAS_POR_JOGO, TOTAL_DEZENAS, mascaras_de_sorteios, iterar_blocos_combinacoes
+from estatisticas import sincronizar_estatisticas
+from coocorrencia import combinacoes_frequentes
+from backtest import gerar_faixas, grade_alinhamento
+from modelo_ia import treinar_modelo, pontuar_jogos_ia, gerar_negativos
+from simulacao import simular_custo_beneficio, calcular_valor_esperado
+from conferidor import ler_jogos, conferir_historico
+from exportacao import exportar_jogos
+from indice_jogos import DIRETORIO_INDICE, TOTAL_JOGOS, carregar_indice
+from perfil import ativar_perfil, desativar_perfil, medir, limpar_perfil
+
+# --- Benchmark do Pipeline ---
+# Roda cada etapa (carregamento, extração, estatísticas, geração, backtest, I.A., simulação e
+# conferência) sobre históricos sintéticos e universos de vários tamanhos e grava tempo de parede,
+# vazão e pico de memória em JSON. Cada etapa roda `repeticoes` vezes só com o relógio (vale o
+# menor tempo) e uma vez a mais com o tracemalloc para o pico de memória, que conta apenas o
+# processo principal (etapas que abrem processos têm o pico dos filhos de fora).
+CONCURSOS_PADRAO = (1000, 10000, 50000)
+UNIVERSOS_PADRAO = (15, 18, 21, 25)
+CONCURSOS_RAPIDO = (1000, 5000)
+UNIVERSOS_RAPIDO = (15, 18, 20)
+JOGOS_SIMULACAO = 1000
+JOGOS_CONFERENCIA = 10_000
+JOGOS_IA = 100_000
+JOGOS_VALOR_ESPERADO = 50
+ARQUIVO_SAIDA = "benchmark.json"
+# Uma etapa mais lenta que isso em relação à execução anterior conta como regressão.
+TOLERANCIA_REGRESSAO = 1.25
+# Etapas mais rápidas que isso ficam no ruído do relógio e nunca contam como regressão.
+MINIMO_SEGUNDOS_REGRESSAO = 0.01
+SEMENTE = 42
+
+
+def historico_sintetico(n_concursos, semente=SEMENTE):
+    """Histórico aleatório com as colunas do cache (Concurso, Data Sorteio, Bola1..Bola15)."""
+    rng = np.random.default_rng(semente)
+    bolas = np.sort(np.argsort(rng.random((n_concursos, TOTAL_DEZENAS)), axis=1)[:, :DEZENAS_POR_JOGO] + 1, axis=1)
+    df = pd.DataFrame(bolas, columns=COLUNAS_BOLAS)
+    datas = pd.Timestamp('2003-09-29') + pd.to_timedelta(np.arange(n_concursos) * 2, unit='D')
+    df.insert(0, 'Data Sorteio', datas.strftime('%d/%m/%Y'))
+    df.insert(0, 'Concurso', np.arange(1, n_concursos + 1))
+    return df[COLUNAS_HISTORICO]
+
+
+def jogos_sinteticos(quantidade, semente=SEMENTE):
+    return gerar_negativos(np.zeros(0, dtype=np.uint32), quantidade, semente)
+
+
+def medir_etapa(etapa, parametros, itens, funcao, repeticoes=1, preparar=None):
+    """
+    Mede `funcao()` como a etapa `etapa`. `preparar()`, se houver, roda antes de cada execução
+    fora da medição (para começar sempre do mesmo estado, como um cache frio).
+    """
+    execucoes = []
+    ativar_perfil(memoria=False)
+    for _ in range(repeticoes):
+        if preparar:
+            preparar()
+        with medir(etapa) as medida:
+            funcao()
+        execucoes.append(medida['segundos'])
+    ativar_perfil(memoria=True)
+    if preparar:
+        preparar()
+    with medir(etapa) as medida:
+        funcao()
+    desativar_perfil()
+    segundos = min(execucoes)
+    resultado = {'etapa': etapa, 'parametros': parametros, 'itens': int(itens), 'segundos': round(segundos, 6),
+                 'segundos_execucoes': [round(s, 6) for s in execucoes],
+                 'itens_por_segundo': round(itens / segundos, 1) if segundos > 0 else None, 'pico_bytes': medida['pico_bytes']}
+    print(f"{etapa:<28}{json.dumps(parametros):<22}{segundos:>10.3f}s{resultado['itens_por_segundo'] or 0:>16,.0f}/s"
+          f"{medida['pico_bytes'] / 2**20:>10.1f} MB", flush=True)
+    return resultado
+
+
+def etapas_historico(n_concursos, diretorio, repeticoes=1):
+    """Etapas que dependem do tamanho do histórico."""
+    parametros = {'concursos': n_concursos}
+    resultados = []
+    df_sintetico = historico_sintetico(n_concursos)
+    caminho_excel, caminho_cache = os.path.join(diretorio, f"historico_{n_concursos}.xlsx"), os.path.join(diretorio, f"historico_{n_concursos}.npz")
+    df_sintetico.to_excel(caminho_excel, index=False)
+    remover_cache = lambda: os.path.exists(caminho_cache) and os.remove(caminho_cache)
+    resultados.append(medir_etapa('carregar_planilha', parametros, n_concursos, lambda: carregar_historico(caminho_excel, caminho_cache),
+                                  repeticoes, preparar=remover_cache))
+    resultados.append(medir_etapa('carregar_cache', parametros, n_concursos, lambda: carregar_historico(caminho_excel, caminho_cache), repeticoes))
+    df = carregar_historico(caminho_excel, caminho_cache)
+    resultados.append(medir_etapa('extrair_numeros', parametros, n_concursos, lambda: nucleo.extrair_numeros(df), repeticoes))
+    todos_os_sorteios = nucleo.extrair_numeros(df)
+    resultados.append(medir_etapa('mascaras_de_sorteios', parametros, n_concursos, lambda: mascaras_de_sorteios(todos_os_sorteios), repeticoes))
+    mascaras = mascaras_de_sorteios(todos_os_sorteios)
+    resultados.append(medir_etapa('sincronizar_estatisticas', parametros, n_concursos, lambda: sincronizar_estatisticas(None, todos_os_sorteios), repeticoes))
+    for tamanho in (2, 3):
+        resultados.append(medir_etapa(f'combinacoes_frequentes_{tamanho}', parametros, n_concursos,
+                                      lambda: combinacoes_frequentes(mascaras, tamanho), repeticoes))
+    resultados.append(medir_etapa('metricas_backtest', parametros, n_concursos, lambda: nucleo.metricas_backtest(df, n_concursos), repeticoes))
+    _, metricas = nucleo.metricas_backtest(df, n_concursos)
+    faixas = gerar_faixas(0, 15, 3), gerar_faixas(0, 15, 3), gerar_faixas(0, 16, 3)
+    resultados.append(medir_etapa('grade_alinhamento', parametros, n_concursos, lambda: grade_alinhamento(metricas, *faixas), repeticoes))
+    resultados.append(medir_etapa('treinar_modelo_ia', parametros, 2 * n_concursos, lambda: treinar_modelo(mascaras), repeticoes))
+    modelo = treinar_modelo(mascaras)
+    candidatos = jogos_sinteticos(JOGOS_IA)
+    resultados.append(medir_etapa('pontuar_jogos_ia', parametros, JOGOS_IA, lambda: pontuar_jogos_ia(modelo, candidatos), repeticoes))
+    jogos = candidatos[:JOGOS_SIMULACAO]
+    resultados.append(medir_etapa('simular_custo_beneficio', parametros, JOGOS_SIMULACAO * n_concursos,
+                                  lambda: simular_custo_beneficio(jogos, mascaras), repeticoes))
+    jogos = candidatos[:JOGOS_CONFERENCIA]
+    resultados.append(medir_etapa('conferir_historico', parametros, JOGOS_CONFERENCIA * n_concursos,
+                                  lambda: conferir_historico(jogos, mascaras), repeticoes))
+    return resultados
+
+
+def etapas_universo(tamanho_universo, ultimo_sorteio, indice=None, repeticoes=1):
+    """Etapas de geração, que dependem do tamanho do universo."""
+    parametros = {'universo': tamanho_universo}
+    universo = list(range(1, tamanho_universo + 1))
+    total = comb(tamanho_universo, DEZENAS_POR_JOGO)
+    _, restricoes = nucleo.restricoes_da_estrategia(nucleo.ler_estrategia({'universo_dezenas': universo}))
+    resultados = [medir_etapa('gerar_combinacoes', parametros, total, lambda: sum(len(bloco) for bloco in iterar_blocos_combinacoes(universo)), repeticoes),
+                  medir_etapa('gerar_jogos', parametros, total, lambda: nucleo.gerar_jogos(universo, restricoes, ultimo_sorteio), repeticoes)]
+    if indice is not None:
+        resultados.append(medir_etapa('consultar_indice', parametros, total, lambda: nucleo.gerar_jogos(universo, restricoes, ultimo_sorteio, indice=indice), repeticoes))
+    jogos = nucleo.gerar_jogos(universo, restricoes, ultimo_sorteio)
+    resultados.append(medir_etapa('exportar_jogos', parametros, len(jogos), lambda: sum(len(pedaco) for pedaco in exportar_jogos(jogos)), repeticoes))
+    texto = b''.join(exportar_jogos(jogos, 'txt'))
+    resultados.append(medir_etapa('ler_jogos', parametros, len(jogos), lambda: ler_jogos(texto), repeticoes))
+    return resultados
+
+
+def comparar_resultados(atual, anterior, tolerancia=TOLERANCIA_REGRESSAO):
+    """Razão de tempo (atual / anterior) de cada etapa presente nas duas execuções."""
+    chave = lambda resultado: (resultado['etapa'], json.dumps(resultado['parametros'], sort_keys=True))
+    anteriores = {chave(resultado): resultado for resultado in anterior['resultados']}
+    comparacao = []
+    for resultado in atual['resultados']:
+        base = anteriores.get(chave(resultado))
+        if base is None or not base['segundos']:
+            continue
+        razao = resultado['segundos'] / base['segundos']
+        comparacao.append({'etapa': resultado['etapa'], 'parametros': resultado['parametros'], 'segundos_anterior': base['segundos'],
+                           'segundos': resultado['segundos'], 'razao': round(razao, 3),
+                           'regressao': razao > tolerancia and resultado['segundos'] >= MINIMO_SEGUNDOS_REGRESSAO})
+    return comparacao
+
+
+def executar_benchmark(concursos=CONCURSOS_PADRAO, universos=UNIVERSOS_PADRAO, repeticoes=1, usar_indice=False, diretorio_indice=DIRETORIO_INDICE):
+    """Roda todas as etapas e devolve o relatório (metadados + resultados) pronto para gravar em JSON."""
+    resultados = []
+    indice = carregar_indice(diretorio_indice) if usar_indice else None
+    with tempfile.TemporaryDirectory() as diretorio:
+        for n_concursos in concursos:
+            resultados += etapas_historico(n_concursos, diretorio, repeticoes)
+    ultimo_sorteio = historico_sintetico(1)[COLUNAS_BOLAS].iloc[0].tolist()
+    for tamanho_universo in universos:
+        resultados += etapas_universo(tamanho_universo, ultimo_sorteio, indice, repeticoes)
+    if indice is not None:
+        jogos = jogos_sinteticos(JOGOS_VALOR_ESPERADO)
+        resultados.append(medir_etapa('calcular_valor_esperado', {'jogos': JOGOS_VALOR_ESPERADO}, JOGOS_VALOR_ESPERADO * TOTAL_JOGOS,
+                                      lambda: calcular_valor_esperado(jogos, diretorio_indice=diretorio_indice), repeticoes))
+    limpar_perfil()
+    return {'metadados': {'data': datetime.now().isoformat(timespec='seconds'), 'python': platform.python_version(),
+                          'numpy': np.__version__, 'pandas': pd.__version__, 'plataforma': platform.platform(), 'cpus': os.cpu_count(),
+                          'concursos': list(concursos), 'universos': list(universos), 'repeticoes': repeticoes, 'semente': SEMENTE},
+            'resultados': resultados}
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Benchmark das etapas do pipeline da Lotofácil sobre dados sintéticos.")
+    parser.add_argument("--saida", default=ARQUIVO_SAIDA, help="Arquivo JSON do relatório (padrão: %(default)s).")
+    parser.add_argument("--concursos", type=int, nargs='+', default=None, help=f"Tamanhos de histórico (padrão: {' '.join(map(str, CONCURSOS_PADRAO))}).")
+    parser.add_argument("--universos", type=int, nargs='+', default=None, help=f"Tamanhos de universo (padrão: {' '.join(map(str, UNIVERSOS_PADRAO))}).")
+    parser.add_argument("--rapido", action='store_true', help="Tamanhos menores, para uma checagem rápida.")
+    parser.add_argument("--repeticoes", type=int, default=1, help="Execuções por etapa; vale o menor tempo.")
+    parser.add_argument("--indice", action='store_true', help="Incluir as etapas que usam o índice de jogos (monta o índice se faltar).")
+    parser.add_argument("--comparar", help="Relatório JSON anterior para comparar os tempos.")
+    opcoes = parser.parse_args(argumentos)
+    concursos = opcoes.concursos or (CONCURSOS_RAPIDO if opcoes.rapido else CONCURSOS_PADRAO)
+    universos = opcoes.universos or (UNIVERSOS_RAPIDO if opcoes.rapido else UNIVERSOS_PADRAO)
+    if min(concursos) < 2 or not all(DEZENAS_POR_JOGO <= u <= TOTAL_DEZENAS for u in universos):
+        print("ERRO: use pelo menos 2 concursos e universos entre 15 e 25 dezenas.")
+        return 1
+    print(f"{'Etapa':<28}{'Parâmetros':<22}{'Tempo':>11}{'Vazão':>18}{'Pico':>13}")
+    relatorio = executar_benchmark(concursos, universos, opcoes.repeticoes, opcoes.indice)
+    codigo = 0
+    if opcoes.comparar:
+        with open(opcoes.comparar, encoding='utf-8') as arquivo:
+            relatorio['comparacao'] = comparar_resultados(relatorio, json.load(arquivo))
+        print(f"\n--- COMPARAÇÃO COM {opcoes.comparar} ---")
+        for item in relatorio['comparacao']:
+            marca = "  <-- REGRESSÃO" if item['regressao'] else ""
+            print(f"{item['etapa']:<28}{json.dumps(item['parametros']):<22}{item['segundos_anterior']:>10.3f}s -> {item['segundos']:>8.3f}s  x{item['razao']:.2f}{marca}")
+        codigo = 1 if any(item['regressao'] for item in relatorio['comparacao']) else 0
+    with open(opcoes.saida, 'w', encoding='utf-8') as arquivo:
+        json.dump(relatorio, arquivo, indent=2, ensure_ascii=False)
+    print(f"\nRelatório gravado em '{opcoes.saida}'.")
+    return codigo
+
+
+if __name__ == "__main__":
+    sys.exit(main())
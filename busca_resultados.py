@@ -0,0 +1,98 @@
+import threading
+import pandas as pd
+import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from historico import ARQUIVO_CACHE, carregar_historico, anexar_concursos
+
+# --- Busca de Resultados na API da Caixa ---
+# Descobre o último concurso publicado, baixa em paralelo todos os que faltam no histórico local
+# (não só o mais recente) e grava no cache. Tudo com timeout, novas tentativas e conexões reaproveitadas.
+URL_API = "https://servicebus2.caixa.gov.br/portaldeloterias/api/lotofacil"
+TIMEOUT = 10
+TENTATIVAS = 3
+CONEXOES = 8
+
+
+def criar_sessao(tentativas=TENTATIVAS, conexoes=CONEXOES, verificar_certificado=False):
+    """Sessão HTTP com pool de conexões e novas tentativas com espera exponencial."""
+    sessao = requests.Session()
+    sessao.headers.update({'User-Agent': 'Mozilla/5.0'})
+    sessao.verify = verificar_certificado
+    retry = Retry(total=tentativas, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504), allowed_methods=('GET',))
+    adaptador = HTTPAdapter(pool_connections=conexoes, pool_maxsize=conexoes, max_retries=retry)
+    sessao.mount('http://', adaptador)
+    sessao.mount('https://', adaptador)
+    return sessao
+
+
+def buscar_concurso(sessao, numero=None, url_base=URL_API, timeout=TIMEOUT):
+    """Baixa um concurso (o mais recente se `numero` for None) no formato de linha do histórico."""
+    url = url_base if numero is None else f"{url_base}/{numero}"
+    response = sessao.get(url, timeout=timeout)
+    response.raise_for_status()
+    data = response.json()
+    dezenas = data.get('listaDezenas', [])
+    if len(dezenas) != 15:
+        raise ValueError(f"Resposta da API sem as 15 dezenas para o concurso {data.get('numero', numero)}.")
+    return {'Concurso': int(data.get('numero')), 'Data Sorteio': data.get('dataApuracao'),
+            **{f'Bola{i+1}': int(dezena) for i, dezena in enumerate(dezenas)}}
+
+
+def buscar_concursos_faltantes(ultimo_local, url_base=URL_API, max_workers=CONEXOES, timeout=TIMEOUT, tentativas=TENTATIVAS, sessao=None):
+    """
+    Baixa os concursos publicados depois de `ultimo_local`. O mais recente vem da primeira
+    chamada; os intervalos são baixados em paralelo. Devolve um DataFrame só com os concursos
+    em sequência até a primeira falha (um buraco no meio deixaria as repetidas erradas; a próxima
+    atualização recomeça dele) e um dicionário {concurso: mensagem} com as falhas.
+    """
+    sessao = sessao or criar_sessao(tentativas, max_workers)
+    ultimo = buscar_concurso(sessao, url_base=url_base, timeout=timeout)
+    baixados, falhas = {ultimo['Concurso']: ultimo}, {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        tarefas = {executor.submit(buscar_concurso, sessao, numero, url_base, timeout): numero
+                   for numero in range(int(ultimo_local) + 1, ultimo['Concurso'])}
+        for tarefa in as_completed(tarefas):
+            try:
+                baixados[tarefas[tarefa]] = tarefa.result()
+            except Exception as erro:
+                falhas[tarefas[tarefa]] = f"{type(erro).__name__}: {erro}"
+    novos = []
+    for numero in range(int(ultimo_local) + 1, ultimo['Concurso'] + 1):
+        if numero not in baixados:
+            break
+        novos.append(baixados[numero])
+    return pd.DataFrame(novos), dict(sorted(falhas.items()))
+
+
+def atualizar_historico(caminho_cache=ARQUIVO_CACHE, url_base=URL_API, **opcoes):
+    """
+    Completa o cache local com os concursos que faltam. Devolve quantos concursos foram gravados
+    e as falhas de download ({concurso: mensagem}).
+    """
+    df = carregar_historico(caminho_cache=caminho_cache)
+    ultimo_local = int(df['Concurso'].max()) if not df.empty else 0
+    novos, falhas = buscar_concursos_faltantes(ultimo_local, url_base=url_base, **opcoes)
+    if novos.empty:
+        return 0, falhas
+    return len(anexar_concursos(novos, caminho_cache)) - len(df), falhas
+
+
+def iniciar_atualizacao_em_segundo_plano(caminho_cache=ARQUIVO_CACHE, url_base=URL_API, **opcoes):
+    """
+    Roda atualizar_historico numa thread separada, fora da renderização da página.
+    Devolve um dicionário de estado com 'thread', 'novos', 'falhas' (concursos que não baixaram)
+    e 'erro', preenchidos ao terminar.
+    """
+    estado = {'thread': None, 'novos': None, 'falhas': {}, 'erro': None}
+
+    def executar():
+        try:
+            estado['novos'], estado['falhas'] = atualizar_historico(caminho_cache, url_base, **opcoes)
+        except Exception as erro:
+            estado['erro'] = erro
+
+    estado['thread'] = threading.Thread(target=executar, name="atualizacao-historico", daemon=True)
+    estado['thread'].start()
+    return estado
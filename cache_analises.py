@@ -0,0 +1,92 @@
+import sys
+import zlib
+import threading
+import functools
+import numpy as np
+import pandas as pd
+from collections import OrderedDict
+
+# --- Cache de Análises por Conteúdo ---
+# A chave de cada resultado é a impressão digital do conteúdo dos argumentos (quantidade de
+# linhas, último concurso e um checksum das dezenas), e não o objeto em si: DataFrames diferentes
+# nunca compartilham resultado. As entradas saem por LRU quando o orçamento de memória estoura.
+# Os resultados são devolvidos sem cópia; quem chama não deve modificá-los.
+ORCAMENTO_BYTES = 256 * 1024 * 1024
+
+_entradas = OrderedDict()
+_trava = threading.Lock()
+_estado = {'acertos': 0, 'falhas': 0, 'bytes': 0, 'descartes': 0}
+
+
+def impressao_digital(valor):
+    """Impressão digital barata de um argumento; valores que não são dados de concursos usam repr."""
+    if isinstance(valor, pd.DataFrame):
+        colunas_bolas = [col for col in valor.columns if str(col).startswith('Bola')]
+        ultimo = int(valor['Concurso'].iloc[-1]) if 'Concurso' in valor.columns and len(valor) else None
+        dezenas = np.nan_to_num(valor[colunas_bolas].to_numpy(dtype=np.float64)).astype(np.uint8)
+        return ('DataFrame', len(valor), ultimo, tuple(colunas_bolas), zlib.adler32(dezenas.tobytes()))
+    if isinstance(valor, np.ndarray):
+        return ('ndarray', valor.dtype.str, valor.shape, zlib.adler32(np.ascontiguousarray(valor).tobytes()))
+    if isinstance(valor, list) and valor and isinstance(valor[0], (list, tuple, set)):
+        dezenas = np.array([sorted(sorteio) for sorteio in valor], dtype=np.uint8)
+        return ('sorteios', dezenas.shape, zlib.adler32(dezenas.tobytes()))
+    if isinstance(valor, (set, frozenset)):
+        return ('set', tuple(sorted(valor)))
+    return repr(valor)
+
+
+def _tamanho(valor, profundidade=0):
+    # Estimativa do tamanho em memória de um resultado (arrays, DataFrames e coleções aninhadas).
+    if isinstance(valor, np.ndarray):
+        return valor.nbytes
+    if isinstance(valor, (pd.DataFrame, pd.Series)):
+        return int(valor.memory_usage(deep=True).sum()) if isinstance(valor, pd.DataFrame) else int(valor.memory_usage(deep=True))
+    tamanho = sys.getsizeof(valor)
+    if profundidade < 3:
+        if isinstance(valor, dict):
+            tamanho += sum(_tamanho(k, profundidade + 1) + _tamanho(v, profundidade + 1) for k, v in valor.items())
+        elif isinstance(valor, (list, tuple, set, frozenset)):
+            tamanho += sum(_tamanho(item, profundidade + 1) for item in valor)
+    return tamanho
+
+
+def _descartar_excesso(orcamento):
+    while _estado['bytes'] > orcamento and _entradas:
+        _, (_, tamanho) = _entradas.popitem(last=False)
+        _estado['bytes'] -= tamanho
+        _estado['descartes'] += 1
+
+
+def cache_por_conteudo(funcao):
+    """Decorador que guarda o resultado de `funcao` no cache compartilhado, por conteúdo dos argumentos."""
+    @functools.wraps(funcao)
+    def envoltorio(*args, **kwargs):
+        chave = (funcao.__module__, funcao.__qualname__, tuple(impressao_digital(arg) for arg in args),
+                 tuple(sorted((nome, impressao_digital(valor)) for nome, valor in kwargs.items())))
+        with _trava:
+            if chave in _entradas:
+                _entradas.move_to_end(chave)
+                _estado['acertos'] += 1
+                return _entradas[chave][0]
+            _estado['falhas'] += 1
+        resultado = funcao(*args, **kwargs)
+        tamanho = _tamanho(resultado)
+        with _trava:
+            if chave not in _entradas and tamanho <= ORCAMENTO_BYTES:
+                _entradas[chave] = (resultado, tamanho)
+                _estado['bytes'] += tamanho
+                _descartar_excesso(ORCAMENTO_BYTES)
+        return resultado
+    return envoltorio
+
+
+def estatisticas_cache():
+    """Acertos, falhas, descartes, entradas e bytes ocupados pelo cache."""
+    with _trava:
+        return {**_estado, 'entradas': len(_entradas), 'orcamento': ORCAMENTO_BYTES}
+
+
+def limpar_cache():
+    with _trava:
+        _entradas.clear()
+        _estado.update(acertos=0, falhas=0, bytes=0, descartes=0)
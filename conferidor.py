@@ -0,0 +1,170 @@
+import os
+import io
+from math import comb
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from motor_jogos import TOTAL_DEZENAS, DEZENAS_POR_JOGO, contar_bits
+from simulacao import (BYTES_POR_CONFERENCIA, FAIXAS_PREMIADAS, MEMORIA_BLOCO_SORTEIOS, MINIMO_CONFERENCIAS_PARALELO,
+                       TAMANHO_BLOCO_SORTEIOS, matriz_acertos)
+from perfil import perfilado
+
+# --- Conferidor em Massa ---
+# Os jogos colados ou enviados em arquivo são lidos em blocos de bytes e viram máscaras uint32 sem
+# laço por linha: o texto é tratado como um array de bytes e as dezenas são os trechos de 1 ou 2
+# dígitos. Depois todos os jogos são conferidos de uma vez contra um concurso ou contra o histórico.
+TAMANHO_BLOCO_LEITURA = 1 << 22
+# Quantidades de dezenas aceitas em uma aposta da Lotofácil.
+MINIMO_DEZENAS_APOSTA = DEZENAS_POR_JOGO
+MAXIMO_DEZENAS_APOSTA = 20
+# PREMIOS_POR_ACERTO[k, h, c]: prêmios na faixa FAIXAS_PREMIADAS[c] de uma aposta de k dezenas com
+# h acertos. A aposta vale C(k, 15) jogos simples, e C(h, t) * C(k - h, 15 - t) deles fazem t acertos.
+PREMIOS_POR_ACERTO = np.array([[[comb(h, faixa) * comb(k - h, DEZENAS_POR_JOGO - faixa) if h <= k else 0 for faixa in FAIXAS_PREMIADAS]
+                                for h in range(TOTAL_DEZENAS + 1)] for k in range(MAXIMO_DEZENAS_APOSTA + 1)], dtype=np.int64)
+
+_DIGITO_0, _DIGITO_9 = ord('0'), ord('9')
+
+
+def _mascaras_do_texto(dados):
+    """
+    Converte um trecho de texto com linhas completas em máscaras, uma por linha não vazia.
+    Tudo até o último ':' da linha é rótulo ("Jogo 001: [ ... ]") e é ignorado; números colados
+    em letras (cabeçalho "Bola1,...") também. Devolve as máscaras das linhas válidas e a
+    quantidade de linhas com dezenas que não formam uma aposta válida.
+    """
+    texto = np.frombuffer(dados, dtype=np.uint8)
+    if not len(texto):
+        return np.zeros(0, dtype=np.uint32), 0
+    quebra = texto == ord('\n')
+    linha = np.cumsum(quebra) - quebra
+    total_linhas = int(linha[-1]) + 1
+    posicao = np.arange(len(texto))
+    # Posição do último ':' de cada linha; o que vem antes dele não é conferido.
+    ultimo_rotulo = np.full(total_linhas, -1)
+    dois_pontos = np.flatnonzero(texto == ord(':'))
+    np.maximum.at(ultimo_rotulo, linha[dois_pontos], dois_pontos)
+    conteudo = posicao > ultimo_rotulo[linha]
+    digito = (texto >= _DIGITO_0) & (texto <= _DIGITO_9)
+    letra = ((texto | 0x20) >= ord('a')) & ((texto | 0x20) <= ord('z')) | (texto >= 0x80)
+    anterior = np.concatenate(([False], digito[:-1]))
+    proximo = np.concatenate((digito[1:], [False]))
+    inicio = np.flatnonzero(digito & ~anterior & conteudo)
+    fim = np.flatnonzero(digito & ~proximo)
+    fim = fim[np.searchsorted(fim, inicio)]
+    tamanho = fim - inicio + 1
+    colado_em_letra = (inicio > 0) & letra[np.maximum(inicio - 1, 0)]
+    inicio, tamanho = inicio[~colado_em_letra], tamanho[~colado_em_letra]
+    valor = (texto[inicio] - _DIGITO_0).astype(np.int64)
+    dois_digitos = tamanho == 2
+    valor[dois_digitos] = valor[dois_digitos] * 10 + (texto[inicio[dois_digitos] + 1] - _DIGITO_0)
+    linha_numero = linha[inicio]
+    # Linhas com trechos de 3+ dígitos ou dezenas fora de 1..25 são descartadas inteiras.
+    invalido = (tamanho > 2) | (valor < 1) | (valor > TOTAL_DEZENAS)
+    linhas_invalidas = np.zeros(total_linhas, dtype=bool)
+    linhas_invalidas[linha_numero[invalido]] = True
+    mascaras = np.zeros(total_linhas, dtype=np.uint32)
+    np.bitwise_or.at(mascaras, linha_numero[~invalido], np.left_shift(np.uint32(1), (valor[~invalido] - 1).astype(np.uint32)))
+    quantidade = np.bincount(linha_numero, minlength=total_linhas)
+    distintas = contar_bits(mascaras)
+    # Cada dezena só pode aparecer uma vez, e a aposta tem de 15 a 20 dezenas.
+    validas = ~linhas_invalidas & (quantidade == distintas) & (distintas >= MINIMO_DEZENAS_APOSTA) & (distintas <= MAXIMO_DEZENAS_APOSTA)
+    # Linhas sem nenhuma dezena (vazias, cabeçalhos) não contam como descartadas.
+    return mascaras[validas], int((~validas & (quantidade > 0)).sum())
+
+
+def iterar_jogos_em_blocos(arquivo, tamanho_bloco=TAMANHO_BLOCO_LEITURA):
+    """
+    Lê um arquivo binário (ou texto já codificado em bytes) em blocos e devolve, para cada bloco,
+    as máscaras dos jogos válidos e quantas linhas foram descartadas. Uma linha partida entre dois
+    blocos é completada no bloco seguinte.
+    """
+    if isinstance(arquivo, (bytes, bytearray)):
+        arquivo = io.BytesIO(arquivo)
+    restante = b''
+    while True:
+        bloco = arquivo.read(tamanho_bloco)
+        if isinstance(bloco, str):
+            bloco = bloco.encode()
+        if not bloco:
+            break
+        dados = restante + bloco
+        corte = dados.rfind(b'\n') + 1
+        restante = dados[corte:]
+        if corte:
+            yield _mascaras_do_texto(dados[:corte])
+    if restante:
+        yield _mascaras_do_texto(restante)
+
+
+@perfilado("ler_jogos")
+def ler_jogos(arquivo, tamanho_bloco=TAMANHO_BLOCO_LEITURA):
+    """Todos os jogos válidos de um arquivo ou texto, como array uint32, e o total de linhas descartadas."""
+    if isinstance(arquivo, str):
+        arquivo = arquivo.encode()
+    blocos, descartadas = [], 0
+    for mascaras, invalidas in iterar_jogos_em_blocos(arquivo, tamanho_bloco):
+        blocos.append(mascaras)
+        descartadas += invalidas
+    return (np.concatenate(blocos) if blocos else np.zeros(0, dtype=np.uint32)), descartadas
+
+
+def premios_por_faixa(jogos, acertos):
+    """
+    Prêmios de cada aposta em cada faixa (colunas na ordem de FAIXAS_PREMIADAS) para os
+    `acertos` de cada uma em um sorteio. Apostas de 16 a 20 dezenas contam todos os jogos simples.
+    """
+    return PREMIOS_POR_ACERTO[contar_bits(np.asarray(jogos, dtype=np.uint32)), np.asarray(acertos)]
+
+
+def _conferir_bloco(jogos, sorteios, deslocamento=0, tamanho_bloco=TAMANHO_BLOCO_SORTEIOS):
+    # Melhor acerto de cada jogo (no máximo 15), o primeiro sorteio em que ele ocorreu e os prêmios por faixa.
+    melhor = np.zeros(len(jogos), dtype=np.uint8)
+    posicao_melhor = np.zeros(len(jogos), dtype=np.int64)
+    faixas = np.zeros((len(jogos), len(FAIXAS_PREMIADAS)), dtype=np.int64)
+    dezenas = contar_bits(jogos)
+    maior_aposta = int(dezenas.max()) if len(jogos) else DEZENAS_POR_JOGO
+    # Tudo o que é devolvido é por jogo: cada fatia de jogos percorre os sorteios sozinha, e os
+    # temporários (fatia x bloco de sorteios) ficam dentro de MEMORIA_BLOCO_SORTEIOS.
+    jogos_por_fatia = max(MEMORIA_BLOCO_SORTEIOS // (tamanho_bloco * BYTES_POR_CONFERENCIA), 1)
+    for fatia in range(0, len(jogos), jogos_por_fatia):
+        parte = slice(fatia, fatia + jogos_por_fatia)
+        melhor_parte, posicao_parte = melhor[parte], posicao_melhor[parte]
+        for inicio in range(0, len(sorteios), tamanho_bloco):
+            acertos = matriz_acertos(jogos[parte], sorteios[inicio:inicio + tamanho_bloco])
+            for quantidade in range(FAIXAS_PREMIADAS[0], maior_aposta + 1):
+                # Soma em uint16 sobre a visão uint8 da comparação: bem mais rápido que somar bool em int64.
+                vezes = (acertos == quantidade).view(np.uint8).sum(axis=1, dtype=np.uint16)
+                faixas[parte] += vezes[:, None] * PREMIOS_POR_ACERTO[dezenas[parte], quantidade]
+            if maior_aposta > DEZENAS_POR_JOGO:
+                np.minimum(acertos, DEZENAS_POR_JOGO, out=acertos)
+            maximo = acertos.max(axis=1)
+            melhorou = np.flatnonzero(maximo > melhor_parte)
+            melhor_parte[melhorou] = maximo[melhorou]
+            posicao_parte[melhorou] = deslocamento + inicio + acertos[melhorou].argmax(axis=1)
+    return melhor, posicao_melhor, faixas
+
+
+@perfilado("conferir_historico")
+def conferir_historico(jogos, sorteios, processos=None):
+    """
+    Confere todos os jogos contra todos os sorteios (máscaras) de uma vez. Para cada jogo devolve
+    o melhor acerto (até 15), a posição do primeiro sorteio em que ele aconteceu e a contagem de
+    prêmios de cada faixa (colunas na ordem de FAIXAS_PREMIADAS), já expandida nas apostas de 16 a 20 dezenas.
+    """
+    jogos = np.asarray(jogos, dtype=np.uint32)
+    sorteios = np.asarray(sorteios, dtype=np.uint32)
+    if processos is None:
+        processos = (os.cpu_count() or 1) if len(jogos) * len(sorteios) >= MINIMO_CONFERENCIAS_PARALELO else 1
+    if processos <= 1 or len(sorteios) < 2:
+        melhor, posicao_melhor, faixas = _conferir_bloco(jogos, sorteios)
+    else:
+        limites = np.linspace(0, len(sorteios), min(processos, len(sorteios)) + 1).astype(np.int64)
+        with ProcessPoolExecutor(max_workers=len(limites) - 1) as executor:
+            partes = list(executor.map(_conferir_bloco, [jogos] * (len(limites) - 1),
+                                       [sorteios[a:b] for a, b in zip(limites[:-1], limites[1:])], limites[:-1]))
+        melhor, posicao_melhor, faixas = partes[0]
+        for melhor_parte, posicao_parte, faixas_parte in partes[1:]:
+            melhorou = melhor_parte > melhor
+            melhor = np.where(melhorou, melhor_parte, melhor)
+            posicao_melhor = np.where(melhorou, posicao_parte, posicao_melhor)
+            faixas = faixas + faixas_parte
+    return {'melhor_acerto': melhor, 'posicao_melhor': posicao_melhor, 'faixas': faixas}
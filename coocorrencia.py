@@ -0,0 +1,82 @@
+import itertools
+import numpy as np
+from motor_jogos import TOTAL_DEZENAS, contar_bits, gerar_combinacoes, mascara_para_jogo
+from perfil import perfilado
+
+# --- Coocorrência de Dezenas ---
+# Contagens de pares e trios saem da matriz de incidência dos concursos (N x 25):
+# pares = I^T I e trios = um produto por dezena, sem enumerar tuplas por concurso.
+# Para quadras e quinas cada subconjunto possível é testado contra todos os concursos
+# como máscara de bits ((sorteio & subconjunto) == subconjunto).
+TAMANHO_MAXIMO = 5
+# Subconjuntos testados por vez na varredura de quadras/quinas.
+_BLOCO_SUBCONJUNTOS = 2048
+
+
+def matriz_incidencia(mascaras):
+    """Matriz (N x 25) com 1 onde a dezena saiu no concurso."""
+    mascaras = np.asarray(mascaras, dtype=np.uint32)
+    return ((mascaras[:, None] >> np.arange(TOTAL_DEZENAS, dtype=np.uint32)) & 1).astype(np.float64)
+
+
+def contar_pares(mascaras):
+    """Matriz 25 x 25 com quantas vezes cada par de dezenas saiu junto (diagonal = frequência)."""
+    incidencia = matriz_incidencia(mascaras)
+    return np.rint(incidencia.T @ incidencia).astype(np.int64)
+
+
+def contar_trios(mascaras):
+    """Tensor 25 x 25 x 25 com quantas vezes cada trio de dezenas saiu junto."""
+    incidencia = matriz_incidencia(mascaras)
+    trios = np.empty((TOTAL_DEZENAS,) * 3, dtype=np.int64)
+    for i in range(TOTAL_DEZENAS):
+        com_i = incidencia * incidencia[:, i:i + 1]
+        trios[i] = np.rint(com_i.T @ incidencia)
+    return trios
+
+
+def contar_subconjuntos(mascaras, tamanho):
+    """
+    Conta, para cada subconjunto de `tamanho` dezenas (ordem de itertools.combinations),
+    em quantos concursos ele apareceu inteiro. Devolve (máscaras dos subconjuntos, contagens).
+    """
+    mascaras = np.asarray(mascaras, dtype=np.uint32)
+    subconjuntos = gerar_combinacoes(range(1, TOTAL_DEZENAS + 1), tamanho)
+    contagens = np.zeros(len(subconjuntos), dtype=np.int64)
+    for inicio in range(0, len(subconjuntos), _BLOCO_SUBCONJUNTOS):
+        bloco = subconjuntos[inicio:inicio + _BLOCO_SUBCONJUNTOS]
+        contagens[inicio:inicio + len(bloco)] = (contar_bits(mascaras[None, :] & bloco[:, None]) == tamanho).sum(axis=1)
+    return subconjuntos, contagens
+
+
+def _posicoes_dos_melhores(contagens, top_n):
+    # Seleção parcial dos top_n e ordenação estável só entre eles (empates em ordem lexicográfica).
+    if top_n < len(contagens):
+        corte = np.partition(contagens, len(contagens) - top_n)[len(contagens) - top_n]
+        candidatos = np.flatnonzero(contagens >= corte)
+    else:
+        candidatos = np.arange(len(contagens))
+    return candidatos[np.argsort(-contagens[candidatos], kind='stable')][:top_n]
+
+
+@perfilado("combinacoes_frequentes")
+def combinacoes_frequentes(mascaras, tamanho, top_n=15):
+    """
+    Top-N exato das combinações de `tamanho` dezenas (1 a 5) que mais saíram juntas nos
+    concursos informados, no formato [((d1, d2, ...), vezes), ...] de Counter.most_common.
+    """
+    if not 1 <= tamanho <= TAMANHO_MAXIMO:
+        raise ValueError(f"O tamanho das combinações deve estar entre 1 e {TAMANHO_MAXIMO}.")
+    if tamanho <= 3:
+        indices = np.array(list(itertools.combinations(range(TOTAL_DEZENAS), tamanho)))
+        if tamanho == 1:
+            contagens = matriz_incidencia(mascaras).sum(axis=0).astype(np.int64)[indices[:, 0]]
+        elif tamanho == 2:
+            contagens = contar_pares(mascaras)[indices[:, 0], indices[:, 1]]
+        else:
+            contagens = contar_trios(mascaras)[indices[:, 0], indices[:, 1], indices[:, 2]]
+        chave = lambda posicao: tuple(int(i) + 1 for i in indices[posicao])
+    else:
+        subconjuntos, contagens = contar_subconjuntos(mascaras, tamanho)
+        chave = lambda posicao: tuple(mascara_para_jogo(subconjuntos[posicao]))
+    return [(chave(posicao), int(contagens[posicao])) for posicao in _posicoes_dos_melhores(contagens, top_n) if contagens[posicao] > 0]
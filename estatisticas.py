@@ -0,0 +1,132 @@
+import zlib
+import numpy as np
+from collections import Counter
+from motor_jogos import DEZENAS_POR_JOGO, TOTAL_DEZENAS, jogo_para_mascara, mascaras_de_sorteios
+from perfil import perfilado
+
+# --- Estatísticas Incrementais por Dezena ---
+# O estado guarda frequência, índice da última aparição e contagem na janela móvel das
+# últimas `janela` extrações. Um concurso novo atualiza só as suas 15 dezenas; o estado
+# só é refeito do zero quando o histórico muda de forma retroativa.
+# O estado também mantém a contagem acumulada por dezena (soma de prefixos), de forma que a
+# frequência de qualquer intervalo de concursos sai de uma única subtração de 25 posições.
+# O histórico do estado é identificado pelo adler32 das suas dezenas (uint8), atualizado a cada
+# concurso anexado: conferir se um histórico novo começa pelo do estado custa um adler32 em C.
+JANELA_PADRAO = 200
+_POSICOES = np.arange(TOTAL_DEZENAS, dtype=np.uint32)
+
+
+def _dezenas_da_mascara(mascara):
+    return [posicao for posicao in range(TOTAL_DEZENAS) if mascara >> posicao & 1]
+
+
+def _dezenas_em_bytes(sorteios):
+    return np.asarray(sorteios, dtype=np.uint8).reshape(len(sorteios), DEZENAS_POR_JOGO)
+
+
+def criar_estado_estatisticas(sorteios, janela=JANELA_PADRAO):
+    """Monta o estado completo a partir de uma lista de sorteios (listas de dezenas)."""
+    mascaras = mascaras_de_sorteios(sorteios) if len(sorteios) else np.zeros(0, dtype=np.uint32)
+    incidencia = ((mascaras[:, None] >> _POSICOES) & 1).astype(bool)
+    apareceu = incidencia.any(axis=0)
+    ultima = len(mascaras) - 1 - np.argmax(incidencia[::-1], axis=0) if len(mascaras) else np.zeros(TOTAL_DEZENAS)
+    acumulado = np.zeros((max(2 * len(mascaras), 16) + 1, TOTAL_DEZENAS), dtype=np.int32)
+    np.cumsum(incidencia, axis=0, out=acumulado[1:len(mascaras) + 1])
+    return {
+        'janela': janela,
+        'mascaras': [int(m) for m in mascaras],
+        'impressao': zlib.adler32(_dezenas_em_bytes(sorteios).tobytes()),
+        'frequencia': incidencia.sum(axis=0).astype(np.int64),
+        'ultimo_indice': np.where(apareceu, ultima, -1).astype(np.int64),
+        'frequencia_janela': incidencia[-janela:].sum(axis=0).astype(np.int64),
+        # Linha i = contagem de cada dezena nos concursos [0, i). Tem folga para crescer sem realocar.
+        'acumulado': acumulado,
+    }
+
+
+def anexar_sorteio(estado, sorteio):
+    """Acrescenta um concurso ao final do histórico atualizando o estado em O(15)."""
+    mascaras = estado['mascaras']
+    mascara = jogo_para_mascara(sorteio)
+    mascaras.append(mascara)
+    estado['impressao'] = zlib.adler32(np.asarray(sorteio, dtype=np.uint8).tobytes(), estado['impressao'])
+    indice = len(mascaras) - 1
+    if indice + 1 >= len(estado['acumulado']):
+        maior = np.zeros((2 * len(estado['acumulado']), TOTAL_DEZENAS), dtype=np.int32)
+        maior[:len(estado['acumulado'])] = estado['acumulado']
+        estado['acumulado'] = maior
+    linha = estado['acumulado'][indice + 1]
+    linha[:] = estado['acumulado'][indice]
+    for posicao in _dezenas_da_mascara(mascara):
+        linha[posicao] += 1
+        estado['frequencia'][posicao] += 1
+        estado['ultimo_indice'][posicao] = indice
+        estado['frequencia_janela'][posicao] += 1
+    if len(mascaras) > estado['janela']:
+        for posicao in _dezenas_da_mascara(mascaras[-estado['janela'] - 1]):
+            estado['frequencia_janela'][posicao] -= 1
+
+
+@perfilado("sincronizar_estatisticas")
+def sincronizar_estatisticas(estado, sorteios, janela=JANELA_PADRAO):
+    """
+    Leva o estado até o histórico informado. Se o histórico só cresceu no final, os
+    concursos novos são anexados um a um; se algum concurso já conhecido mudou (uma correção
+    na planilha, por exemplo), o estado é reconstruído. A checagem compara o adler32 das dezenas
+    conhecidas com o do estado, sem converter o histórico em máscaras.
+    """
+    if estado is None or estado['janela'] != janela or len(sorteios) < len(estado['mascaras']):
+        return criar_estado_estatisticas(sorteios, janela)
+    dezenas = _dezenas_em_bytes(sorteios)
+    conhecidos = len(estado['mascaras'])
+    if zlib.adler32(dezenas[:conhecidos].tobytes()) != estado['impressao']:
+        return criar_estado_estatisticas(sorteios, janela)
+    for sorteio in dezenas[conhecidos:]:
+        anexar_sorteio(estado, sorteio)
+    return estado
+
+
+def frequencia_e_atraso(estado):
+    """Devolve (frequência, atraso) no mesmo formato de analisar_frequencia_e_atraso."""
+    total_concursos = len(estado['mascaras'])
+    frequencia = Counter({dezena: int(estado['frequencia'][dezena - 1]) for dezena in range(1, TOTAL_DEZENAS + 1) if estado['frequencia'][dezena - 1]})
+    atraso = {}
+    for dezena in range(1, TOTAL_DEZENAS + 1):
+        ultimo = estado['ultimo_indice'][dezena - 1]
+        atraso[dezena] = total_concursos - 1 - int(ultimo) if ultimo >= 0 else total_concursos
+    return frequencia, atraso
+
+
+def frequencia_na_janela(estado):
+    """Frequência de cada dezena nas últimas `janela` extrações do estado."""
+    return Counter({dezena: int(estado['frequencia_janela'][dezena - 1]) for dezena in range(1, TOTAL_DEZENAS + 1) if estado['frequencia_janela'][dezena - 1]})
+
+
+def acumulado_por_dezena(estado):
+    """Matriz (N + 1, 25) de contagens acumuladas; a linha i cobre os concursos [0, i)."""
+    return estado['acumulado'][:len(estado['mascaras']) + 1]
+
+
+def frequencia_intervalo(estado, inicio, fim):
+    """Frequência de cada dezena entre as posições `inicio` e `fim` (inclusive) do histórico."""
+    acumulado = acumulado_por_dezena(estado)
+    inicio = max(int(inicio), 0)
+    fim = min(int(fim), len(acumulado) - 2)
+    if fim < inicio:
+        return Counter()
+    contagem = acumulado[fim + 1] - acumulado[inicio]
+    return Counter({dezena: int(contagem[dezena - 1]) for dezena in range(1, TOTAL_DEZENAS + 1) if contagem[dezena - 1]})
+
+
+def frequencia_recente(estado, quantidade):
+    """Frequência de cada dezena nos últimos `quantidade` concursos."""
+    total_concursos = len(estado['mascaras'])
+    return frequencia_intervalo(estado, total_concursos - quantidade, total_concursos - 1)
+
+
+def frequencia_movel(estado, largura):
+    """Frequência em janela móvel de `largura` concursos para todo o histórico: matriz (N - largura + 1, 25)."""
+    if largura < 1:
+        raise ValueError("A largura da janela móvel deve ser de pelo menos 1 concurso.")
+    acumulado = acumulado_por_dezena(estado)
+    return acumulado[largura:] - acumulado[:-largura]
@@ -0,0 +1,46 @@
+import numpy as np
+from motor_jogos import DEZENAS_POR_JOGO, mascaras_para_matriz
+from historico import COLUNAS_BOLAS
+
+# --- Exportação de Jogos ---
+# Os jogos saem direto das máscaras uint32, um bloco por vez: cada bloco vira uma matriz de bytes
+# de largura fixa (dois dígitos por dezena, separadores e quebra de linha) montada pelo NumPy,
+# então quem grava em disco (o lote) nunca tem o arquivo inteiro na memória. O download do app
+# é diferente: o Streamlit lê e guarda o arquivo inteiro na memória do servidor para servi-lo,
+# por isso ele é limitado a MAXIMO_JOGOS_DOWNLOAD jogos.
+TAMANHO_BLOCO_EXPORTACAO = 1 << 16
+MAXIMO_JOGOS_DOWNLOAD = 500_000
+FORMATOS_EXPORTACAO = {
+    'csv': {'separador': b',', 'cabecalho': (",".join(COLUNAS_BOLAS) + "\n").encode(), 'mime': 'text/csv'},
+    # Mesmo formato aceito pelo Conferidor e pela Simulação ("01, 02, ..., 15").
+    'txt': {'separador': b', ', 'cabecalho': b'', 'mime': 'text/plain'},
+}
+
+
+def codificar_jogos(mascaras, separador=b','):
+    """Converte um bloco de máscaras em linhas de texto ("01,02,...,15\\n"), sem laços em Python."""
+    matriz = mascaras_para_matriz(mascaras)
+    passo = 2 + len(separador)
+    largura = DEZENAS_POR_JOGO * passo - len(separador) + 1
+    linhas = np.empty((len(matriz), largura), dtype=np.uint8)
+    linhas[:, 0::passo] = ord('0') + matriz // 10
+    linhas[:, 1::passo] = ord('0') + matriz % 10
+    for deslocamento, caractere in enumerate(separador):
+        linhas[:, 2 + deslocamento:largura - 1:passo] = caractere
+    linhas[:, -1] = ord('\n')
+    return linhas.tobytes()
+
+
+def exportar_jogos(mascaras, formato='csv', tamanho_bloco=TAMANHO_BLOCO_EXPORTACAO):
+    """Gera o arquivo exportado em pedaços de bytes, um bloco de jogos por vez."""
+    configuracao = FORMATOS_EXPORTACAO[formato]
+    if configuracao['cabecalho']:
+        yield configuracao['cabecalho']
+    for inicio in range(0, len(mascaras), tamanho_bloco):
+        yield codificar_jogos(mascaras[inicio:inicio + tamanho_bloco], configuracao['separador'])
+
+
+def tamanho_exportacao(quantidade, formato='csv'):
+    """Tamanho em bytes do arquivo exportado com `quantidade` jogos."""
+    configuracao = FORMATOS_EXPORTACAO[formato]
+    return len(configuracao['cabecalho']) + quantidade * (DEZENAS_POR_JOGO * (2 + len(configuracao['separador'])) - len(configuracao['separador']) + 1)
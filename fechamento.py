@@ -0,0 +1,86 @@
+import os
+import heapq
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from motor_jogos import DEZENAS_POR_JOGO, contar_bits, gerar_combinacoes
+from simulacao import CUSTO_APOSTA
+from perfil import perfilado
+
+# --- Fechamento (Cobertura Garantida) ---
+# Escolhe o menor subconjunto possível dos jogos gerados que garante pelo menos `garantia` acertos
+# sempre que `condicao` das dezenas sorteadas caírem dentro do universo. Cada alvo é um subconjunto
+# de `condicao` dezenas do universo; a cobertura de cada jogo é um bitset sobre os alvos e a escolha
+# é a cobertura de conjuntos gulosa "preguiçosa": o ganho de um jogo só é recalculado quando ele
+# chega ao topo do heap, já que ganhos só diminuem à medida que os alvos vão sendo cobertos.
+# A montagem dos bitsets e os ganhos iniciais são calculados em paralelo, em blocos de jogos.
+# Orçamento de memória do fechamento: os bitsets mais os temporários de cada thread de montagem.
+MEMORIA_MAXIMA_COBERTURA = 1 << 30
+_BLOCO_CANDIDATOS = 256
+# Bytes temporários por par (jogo do bloco, alvo) em _montar_cobertura: o AND em uint32, a
+# contagem de bits em uint8 e a comparação em bool.
+_BYTES_TEMPORARIOS_POR_PAR = 6
+
+
+def _montar_cobertura(candidatos, alvos, garantia, palavras):
+    # Bitsets (jogos x palavras de 32 bits) e ganhos iniciais de um bloco de candidatos.
+    cobre = contar_bits(candidatos[:, None] & alvos[None, :]) >= garantia
+    bytes_cobertura = np.packbits(cobre, axis=1, bitorder='little')
+    cobertura = np.zeros((len(candidatos), palavras * 4), dtype=np.uint8)
+    cobertura[:, :bytes_cobertura.shape[1]] = bytes_cobertura
+    return cobertura.view(np.uint32), cobre.sum(axis=1)
+
+
+@perfilado("construir_fechamento")
+def construir_fechamento(candidatos, universo, garantia=11, condicao=DEZENAS_POR_JOGO, custo_aposta=CUSTO_APOSTA, processos=None):
+    """
+    Seleciona jogos dentre os `candidatos` (máscaras) até cobrir todos os alvos que eles
+    conseguem cobrir. Devolve um dicionário com os jogos escolhidos, a garantia atingida e o custo.
+    """
+    if not 1 <= garantia <= condicao <= min(len(universo), DEZENAS_POR_JOGO):
+        raise ValueError("É preciso ter 1 <= garantia <= condição <= 15 e condição <= tamanho do universo.")
+    candidatos = np.unique(np.asarray(candidatos, dtype=np.uint32))
+    alvos = gerar_combinacoes(universo, condicao)
+    palavras = (len(alvos) + 31) // 32
+    memoria_bitsets = len(candidatos) * palavras * 4
+    memoria_por_thread = min(_BLOCO_CANDIDATOS, len(candidatos)) * len(alvos) * _BYTES_TEMPORARIOS_POR_PAR
+    if memoria_bitsets + memoria_por_thread > MEMORIA_MAXIMA_COBERTURA:
+        raise ValueError(f"{len(candidatos)} jogos x {len(alvos)} alvos excedem a memória do fechamento. "
+                         "Use filtros mais restritivos ou um universo menor.")
+    # Só abre tantas threads quantas cabem no que sobra do orçamento depois dos bitsets.
+    threads = max(1, min(processos or os.cpu_count() or 1, (MEMORIA_MAXIMA_COBERTURA - memoria_bitsets) // max(memoria_por_thread, 1)))
+    cobertura = np.empty((len(candidatos), palavras), dtype=np.uint32)
+    ganhos = np.empty(len(candidatos), dtype=np.int64)
+    inicios = range(0, len(candidatos), _BLOCO_CANDIDATOS)
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        blocos = executor.map(lambda inicio: _montar_cobertura(candidatos[inicio:inicio + _BLOCO_CANDIDATOS], alvos, garantia, palavras), inicios)
+        for inicio, (bloco_cobertura, bloco_ganhos) in zip(inicios, blocos):
+            cobertura[inicio:inicio + len(bloco_cobertura)] = bloco_cobertura
+            ganhos[inicio:inicio + len(bloco_ganhos)] = bloco_ganhos
+
+    coberto = np.zeros(palavras, dtype=np.uint32)
+    cobriveis = int(contar_bits(np.bitwise_or.reduce(cobertura, axis=0)).sum()) if len(candidatos) else 0
+    total_coberto = 0
+    escolhidos = []
+    heap = [(-int(ganho), i) for i, ganho in enumerate(ganhos) if ganho > 0]
+    heapq.heapify(heap)
+    while heap and total_coberto < cobriveis:
+        _, i = heapq.heappop(heap)
+        ganho = int(contar_bits(cobertura[i] & ~coberto).sum())
+        if ganho == 0:
+            continue
+        if heap and ganho < -heap[0][0]:
+            heapq.heappush(heap, (-ganho, i))
+            continue
+        escolhidos.append(i)
+        coberto |= cobertura[i]
+        total_coberto += ganho
+    return {
+        'jogos': candidatos[escolhidos],
+        'garantia': garantia,
+        'condicao': condicao,
+        'alvos': len(alvos),
+        'alvos_cobertos': total_coberto,
+        'cobertura': total_coberto / len(alvos) if len(alvos) else 0.0,
+        'garantia_completa': total_coberto == len(alvos),
+        'custo': len(escolhidos) * custo_aposta,
+    }
@@ -1,5 +1,7 @@
-import pandas as pd
-import itertools
+from historico import carregar_historico
+from math import comb
+import numpy as np
+from motor_jogos import gerar_jogos_filtrados, mascaras_para_matriz
 
 # --- CONFIGURAÇÕES DOS SEUS FILTROS ---
 # Altere os valores abaixo para definir sua estratégia
@@ -27,8 +29,8 @@ def analisar_e_gerar():
     e gera jogos filtrados.
     """
     try:
-        # Tenta ler o arquivo Excel. O arquivo deve estar na mesma pasta do script.
-        df = pd.read_excel("Lotofácil.xlsx")
+        # Lê o histórico pelo cache binário; a planilha deve estar na mesma pasta do script.
+        df = carregar_historico()
     except FileNotFoundError:
         print("ERRO: Arquivo 'Lotofácil.xlsx' não encontrado.")
         print("Por favor, verifique se a planilha está na mesma pasta que este programa.")
@@ -51,28 +53,16 @@ def analisar_e_gerar():
         return
 
     # Gera todas as combinações de 15 dezenas a partir do seu universo
-    todas_combinacoes = list(itertools.combinations(DEZENAS_ESCOLHIDAS, 15))
-    total_inicial = len(todas_combinacoes)
+    total_inicial = comb(len(DEZENAS_ESCOLHIDAS), 15)
     print(f"Gerando {total_inicial} jogos a partir das {len(DEZENAS_ESCOLHIDAS)} dezenas escolhidas...")
 
-    # Aplicando os filtros
+    # Aplicando os filtros (Repetidas e Ímpares) bloco a bloco, sem guardar todas as combinações
     print("Aplicando filtros para selecionar os melhores jogos...")
-    jogos_filtrados = []
-    for jogo_tupla in todas_combinacoes:
-        jogo_set = set(jogo_tupla)
-
-        # Filtro 1: Dezenas Repetidas
-        qtd_repetidas = len(jogo_set.intersection(dezenas_ultimo_concurso))
-        if not (MIN_REPETIDAS <= qtd_repetidas <= MAX_REPETIDAS):
-            continue
-
-        # Filtro 2: Números Ímpares
-        qtd_impares = len([num for num in jogo_set if num % 2 != 0])
-        if not (MIN_IMPARES <= qtd_impares <= MAX_IMPARES):
-            continue
-            
-        # Se o jogo passou por todos os filtros, ele é adicionado à lista
-        jogos_filtrados.append(sorted(list(jogo_set)))
+    blocos_filtrados = list(gerar_jogos_filtrados(DEZENAS_ESCOLHIDAS, dezenas_ultimo_concurso,
+                                                  repetidas=(MIN_REPETIDAS, MAX_REPETIDAS),
+                                                  impares=(MIN_IMPARES, MAX_IMPARES)))
+    mascaras_filtradas = np.concatenate(blocos_filtrados) if blocos_filtrados else np.zeros(0, dtype=np.uint32)
+    jogos_filtrados = mascaras_para_matriz(mascaras_filtradas).tolist()
 
     print("-" * 50)
     print("--- RESULTADO ---")
@@ -0,0 +1,102 @@
+import numpy as np
+from motor_jogos import DEZENAS_POR_JOGO, IMPARES, MOLDURA_DEZENAS, PRIMOS, filtrar_jogos, gerar_combinacoes
+
+# --- Gerador com Restrições (branch-and-bound) ---
+# Percorre a árvore de escolhas dezena a dezena (em ordem crescente, o que dá a ordem de
+# itertools.combinations) e corta um ramo assim que as escolhas restantes não conseguem mais
+# satisfazer alguma restrição. Estratégias apertadas visitam só uma fração dos 3.268.760 jogos.
+# A árvore só é percorrida em Python até restarem TAMANHO_SUFIXO_VETORIZADO dezenas: cada ramo
+# que chega viável até ali é completado de uma vez com as combinações dessas últimas dezenas
+# (calculadas uma vez só) e conferido por filtrar_jogos, sem laço por jogo.
+#
+# Restrições aceitas (todas opcionais):
+#   'repetidas', 'impares', 'moldura', 'primos', 'soma': faixas (min, max)
+#   'max_sequencia': maior quantidade de dezenas consecutivas permitida
+#   'fixas', 'excluidas': dezenas obrigatórias e proibidas
+TAMANHO_BLOCO_RESTRICOES = 1 << 16
+TAMANHO_SUFIXO_VETORIZADO = 16
+
+
+def gerar_jogos_com_restricoes(universo, restricoes, ultimo_sorteio=None, limite=None, tamanho_bloco=TAMANHO_BLOCO_RESTRICOES):
+    """Gera, em blocos de máscaras uint32, os jogos do universo que satisfazem todas as restrições."""
+    fixas = set(restricoes.get('fixas') or [])
+    elementos = sorted(set(int(d) for d in universo) - set(restricoes.get('excluidas') or []))
+    if not fixas <= set(elementos) or len(elementos) < DEZENAS_POR_JOGO:
+        return
+    if restricoes.get('repetidas') is not None and ultimo_sorteio is None:
+        raise ValueError("O filtro de repetidas precisa do último sorteio.")
+    conjuntos = {'repetidas': set(ultimo_sorteio or []), 'impares': IMPARES, 'moldura': MOLDURA_DEZENAS, 'primos': PRIMOS}
+    categorias = [(conjuntos[nome], restricoes[nome]) for nome in conjuntos if restricoes.get(nome) is not None]
+    soma_min, soma_max = restricoes.get('soma') or (0, float('inf'))
+    max_sequencia = restricoes.get('max_sequencia') or DEZENAS_POR_JOGO
+    n = len(elementos)
+
+    # Tabelas de sufixo: quanto de cada categoria (e quantas fixas) ainda há a partir da posição i.
+    pertence = [[dezena in conjunto for conjunto, _ in categorias] for dezena in elementos]
+    sufixo = [[0] * len(categorias) for _ in range(n + 1)]
+    fixas_sufixo = [0] * (n + 1)
+    for i in range(n - 1, -1, -1):
+        sufixo[i] = [sufixo[i + 1][c] + pertence[i][c] for c in range(len(categorias))]
+        fixas_sufixo[i] = fixas_sufixo[i + 1] + (elementos[i] in fixas)
+    prefixo_soma = [0]
+    for dezena in elementos:
+        prefixo_soma.append(prefixo_soma[-1] + dezena)
+
+    def viavel(i, escolhidas, contagens, soma):
+        restantes = DEZENAS_POR_JOGO - escolhidas
+        disponiveis = n - i
+        if restantes > disponiveis or fixas_sufixo[i] > restantes:
+            return False
+        for c, (_, (minimo, maximo)) in enumerate(categorias):
+            da_categoria = sufixo[i][c]
+            if contagens[c] + min(restantes, da_categoria) < minimo:
+                return False
+            if contagens[c] + max(0, restantes - (disponiveis - da_categoria)) > maximo:
+                return False
+        # Menor e maior soma possíveis: as `restantes` menores e maiores dezenas ainda disponíveis.
+        if soma + prefixo_soma[i + restantes] - prefixo_soma[i] > soma_max:
+            return False
+        if soma + prefixo_soma[n] - prefixo_soma[n - restantes] < soma_min:
+            return False
+        return True
+
+    profundidade = max(n - TAMANHO_SUFIXO_VETORIZADO, 0)
+    # Combinações das dezenas a partir de `profundidade`, por quantidade que falta escolher.
+    sufixos = {}
+    bloco, pendentes = [], 0
+    aceitos = 0
+    # Estado: (posição, escolhidas, contagens por categoria, soma, última dezena escolhida, sequência atual, máscara)
+    pilha = [(0, 0, (0,) * len(categorias), 0, -1, 0, 0)]
+    while pilha:
+        i, escolhidas, contagens, soma, ultima, sequencia, mascara = pilha.pop()
+        if not viavel(i, escolhidas, contagens, soma):
+            continue
+        if escolhidas == DEZENAS_POR_JOGO or i == profundidade:
+            restantes = DEZENAS_POR_JOGO - escolhidas
+            if restantes not in sufixos:
+                sufixos[restantes] = gerar_combinacoes(elementos[profundidade:], restantes)
+            jogos = filtrar_jogos(sufixos[restantes] | np.uint32(mascara), ultimo_sorteio, **restricoes)
+            if limite is not None:
+                jogos = jogos[:limite - aceitos]
+            aceitos += len(jogos)
+            bloco.append(jogos)
+            pendentes += len(jogos)
+            if limite is not None and aceitos >= limite:
+                break
+            if pendentes >= tamanho_bloco:
+                saida = np.concatenate(bloco)
+                cheios = len(saida) - len(saida) % tamanho_bloco
+                for inicio in range(0, cheios, tamanho_bloco):
+                    yield saida[inicio:inicio + tamanho_bloco]
+                bloco, pendentes = [saida[cheios:]], len(saida) - cheios
+            continue
+        dezena = elementos[i]
+        # O ramo "sem a dezena" vai para a pilha primeiro, para o ramo "com a dezena" sair antes.
+        if dezena not in fixas:
+            pilha.append((i + 1, escolhidas, contagens, soma, ultima, sequencia, mascara))
+        nova_sequencia = sequencia + 1 if ultima == dezena - 1 else 1
+        if nova_sequencia <= max_sequencia:
+            novas_contagens = tuple(contagem + membro for contagem, membro in zip(contagens, pertence[i]))
+            pilha.append((i + 1, escolhidas + 1, novas_contagens, soma + dezena, dezena, nova_sequencia, mascara | 1 << (dezena - 1)))
+    if pendentes:
+        yield np.concatenate(bloco)
@@ -0,0 +1,67 @@
+import numpy as np
+from motor_jogos import iterar_blocos_combinacoes, jogo_para_mascara
+from coocorrencia import combinacoes_frequentes
+from perfil import perfilado
+
+# --- Gerador "Ultra" ---
+# Cada candidato do universo de elite é pontuado pelos pares e trios mais frequentes que contém,
+# testados como (jogo & padrão) == padrão sobre o bloco inteiro de candidatos.
+PESO_PAR = 1
+PESO_TRIO = 3
+
+
+def pontuar_jogos(candidatos, padroes, pesos):
+    """Soma o peso de cada padrão (máscara) contido integralmente em cada candidato."""
+    candidatos = np.asarray(candidatos, dtype=np.uint32)
+    pontuacao = np.zeros(len(candidatos), dtype=np.int64)
+    for padrao, peso in zip(padroes, pesos):
+        padrao = np.uint32(padrao)
+        pontuacao += peso * ((candidatos & padrao) == padrao)
+    return pontuacao
+
+
+def selecionar_melhores(candidatos, pontuacao, top_n, deslocamento=0):
+    """
+    Seleção parcial dos top_n candidatos (np.argpartition), sem ordenar a lista inteira.
+    Empates ficam na ordem original dos candidatos, como numa ordenação estável.
+    Devolve (candidatos, chaves) em ordem decrescente; `deslocamento` é a posição global
+    do primeiro candidato, para que as chaves de blocos diferentes sejam comparáveis.
+    """
+    candidatos = np.asarray(candidatos, dtype=np.uint32)
+    posicao = deslocamento + np.arange(len(candidatos), dtype=np.int64)
+    # Chave única: maior pontuação primeiro e, no empate, a menor posição.
+    chaves = np.asarray(pontuacao, dtype=np.int64) * (1 << 32) - posicao
+    if top_n < len(chaves):
+        escolhidos = np.argpartition(chaves, len(chaves) - top_n)[len(chaves) - top_n:]
+    else:
+        escolhidos = np.arange(len(chaves))
+    escolhidos = escolhidos[np.argsort(-chaves[escolhidos])]
+    return candidatos[escolhidos], chaves[escolhidos]
+
+
+@perfilado("gerar_jogos_ultra")
+def gerar_jogos_ultra(mascaras_alinhadas, tamanho_universo=19, n_pares=20, n_trios=20, top_n=50):
+    """
+    Monta o universo de elite com as `tamanho_universo` dezenas mais frequentes nos concursos
+    alinhados e devolve (universo_elite, melhores jogos como máscaras, pontuações).
+    """
+    universo_elite = [dezena for (dezena,), _ in combinacoes_frequentes(mascaras_alinhadas, 1, top_n=tamanho_universo)]
+    padroes = [jogo_para_mascara(par) for par, _ in combinacoes_frequentes(mascaras_alinhadas, 2, top_n=n_pares)]
+    pesos = [PESO_PAR] * len(padroes)
+    trios = [jogo_para_mascara(trio) for trio, _ in combinacoes_frequentes(mascaras_alinhadas, 3, top_n=n_trios)]
+    padroes += trios
+    pesos += [PESO_TRIO] * len(trios)
+    melhores = np.zeros(0, dtype=np.uint32)
+    chaves = np.zeros(0, dtype=np.int64)
+    deslocamento = 0
+    for bloco in iterar_blocos_combinacoes(universo_elite):
+        pontuacao = pontuar_jogos(bloco, padroes, pesos)
+        bloco_melhores, bloco_chaves = selecionar_melhores(bloco, pontuacao, top_n, deslocamento)
+        deslocamento += len(bloco)
+        # Os melhores acumulados já têm chaves globais; basta repetir a seleção sobre a união.
+        melhores = np.concatenate([melhores, bloco_melhores])
+        chaves = np.concatenate([chaves, bloco_chaves])
+        ordem = np.argsort(-chaves)[:top_n]
+        melhores, chaves = melhores[ordem], chaves[ordem]
+    pontuacoes = (chaves + (1 << 32) - 1) >> 32
+    return sorted(universo_elite), melhores, pontuacoes
@@ -0,0 +1,115 @@
+import os
+import hashlib
+import tempfile
+import numpy as np
+import pandas as pd
+from perfil import perfilado
+
+# --- Histórico de Concursos ---
+# A planilha é lida uma única vez e convertida em um cache binário (.npz) com número do concurso,
+# data e as 15 bolas em uint8. O cache é invalidado quando a planilha muda (data de modificação e
+# tamanho; se só a data mudou, o hash do conteúdo decide) e recebe os concursos novos vindos da API.
+ARQUIVO_EXCEL = "Lotofácil.xlsx"
+ARQUIVO_CACHE = "historico_cache.npz"
+COLUNAS_BOLAS = [f'Bola{i}' for i in range(1, 16)]
+COLUNAS_HISTORICO = ['Concurso', 'Data Sorteio'] + COLUNAS_BOLAS
+
+
+def _assinatura_excel(caminho_excel):
+    info = os.stat(caminho_excel)
+    return info.st_mtime_ns, info.st_size
+
+
+def _hash_arquivo(caminho):
+    hash_arquivo = hashlib.sha256()
+    with open(caminho, 'rb') as arquivo:
+        for pedaco in iter(lambda: arquivo.read(1 << 20), b''):
+            hash_arquivo.update(pedaco)
+    return hash_arquivo.hexdigest()
+
+
+def ler_planilha(caminho_excel=ARQUIVO_EXCEL):
+    """Lê a planilha oficial e padroniza as colunas (Concurso, Data Sorteio, Bola1..Bola15)."""
+    df = pd.read_excel(caminho_excel)
+    df = df.iloc[:, :17]
+    df.columns = COLUNAS_HISTORICO
+    return df
+
+
+def _normalizar(df):
+    # Converte para os tipos do cache e descarta concursos sem as 15 bolas.
+    df = df.copy()
+    for col in ['Concurso'] + COLUNAS_BOLAS:
+        df[col] = pd.to_numeric(df[col], errors='coerce')
+    df = df.dropna(subset=['Concurso'] + COLUNAS_BOLAS)
+    return df.sort_values(by='Concurso').drop_duplicates(subset='Concurso', keep='last').reset_index(drop=True)
+
+
+def _salvar_cache(df, caminho_cache, origem):
+    # Nome temporário único: a busca em segundo plano e o script do app gravam do mesmo processo.
+    with tempfile.NamedTemporaryFile(dir=os.path.dirname(os.path.abspath(caminho_cache)), prefix=os.path.basename(caminho_cache) + ".",
+                                     suffix=".tmp", delete=False) as arquivo:
+        try:
+            np.savez(arquivo,
+                     concurso=df['Concurso'].to_numpy(dtype=np.int32),
+                     data=df['Data Sorteio'].astype(str).to_numpy(dtype='U10'),
+                     bolas=df[COLUNAS_BOLAS].to_numpy(dtype=np.uint8),
+                     excel_mtime_ns=np.int64(origem['mtime_ns']),
+                     excel_tamanho=np.int64(origem['tamanho']),
+                     excel_sha256=np.array(origem['sha256']))
+        except BaseException:
+            arquivo.close()
+            os.remove(arquivo.name)
+            raise
+    os.replace(arquivo.name, caminho_cache)
+
+
+def _ler_cache(caminho_cache):
+    with np.load(caminho_cache, allow_pickle=False) as dados:
+        df = pd.DataFrame(dados['bolas'].astype(np.int64), columns=COLUNAS_BOLAS)
+        df.insert(0, 'Data Sorteio', dados['data'].astype(object))
+        df.insert(0, 'Concurso', dados['concurso'].astype(np.int64))
+        origem = {'mtime_ns': int(dados['excel_mtime_ns']), 'tamanho': int(dados['excel_tamanho']), 'sha256': str(dados['excel_sha256'])}
+    return df, origem
+
+
+@perfilado("carregar_historico")
+def carregar_historico(caminho_excel=ARQUIVO_EXCEL, caminho_cache=ARQUIVO_CACHE):
+    """
+    Devolve o histórico completo como DataFrame, lendo do cache binário sempre que ele
+    corresponder à planilha atual. Sem planilha, usa o cache se ele existir.
+    """
+    cache_existe = os.path.exists(caminho_cache)
+    if not os.path.exists(caminho_excel):
+        if cache_existe:
+            return _ler_cache(caminho_cache)[0]
+        raise FileNotFoundError(f"Arquivo '{caminho_excel}' não encontrado.")
+    mtime_ns, tamanho = _assinatura_excel(caminho_excel)
+    if cache_existe:
+        try:
+            df, origem = _ler_cache(caminho_cache)
+        except (OSError, ValueError, KeyError):
+            df, origem = None, None
+        if origem is not None and origem['tamanho'] == tamanho:
+            if origem['mtime_ns'] == mtime_ns:
+                return df
+            # A planilha foi tocada mas pode não ter mudado: o hash do conteúdo decide.
+            sha256 = _hash_arquivo(caminho_excel)
+            if origem['sha256'] == sha256:
+                _salvar_cache(df, caminho_cache, {'mtime_ns': mtime_ns, 'tamanho': tamanho, 'sha256': sha256})
+                return df
+    df = _normalizar(ler_planilha(caminho_excel))
+    _salvar_cache(df, caminho_cache, {'mtime_ns': mtime_ns, 'tamanho': tamanho, 'sha256': _hash_arquivo(caminho_excel)})
+    return _ler_cache(caminho_cache)[0]
+
+
+def anexar_concursos(df_novos, caminho_cache=ARQUIVO_CACHE):
+    """Acrescenta ao cache os concursos que ainda não estão nele e devolve o histórico atualizado."""
+    df, origem = _ler_cache(caminho_cache)
+    novos = _normalizar(df_novos[COLUNAS_HISTORICO])
+    novos = novos[~novos['Concurso'].isin(df['Concurso'])]
+    if novos.empty:
+        return df
+    df = _normalizar(pd.concat([df, novos], ignore_index=True))
+    _salvar_cache(df, caminho_cache, origem)
+    return _ler_cache(caminho_cache)[0]
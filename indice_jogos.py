@@ -0,0 +1,119 @@
+import os
+import shutil
+import tempfile
+import numpy as np
+from math import comb
+from motor_jogos import (TOTAL_DEZENAS, DEZENAS_POR_JOGO, iterar_blocos_combinacoes, calcular_contagens,
+                         somar_dezenas, contar_bits, jogo_para_mascara, maior_sequencia)
+from perfil import perfilado
+
+# --- Índice de Todos os Jogos ---
+# Todos os C(25, 15) jogos possíveis ficam gravados em disco, uma coluna .npy por característica.
+# As colunas são abertas com np.memmap (mmap_mode='r'): nada é copiado para a memória do processo
+# e vários processos compartilham as mesmas páginas pelo cache do sistema operacional.
+DIRETORIO_INDICE = "indice_jogos"
+TOTAL_JOGOS = comb(TOTAL_DEZENAS, DEZENAS_POR_JOGO)
+COLUNAS_INDICE = {'mascara': np.uint32, 'impares': np.uint8, 'primos': np.uint8, 'moldura': np.uint8, 'soma': np.uint16}
+
+
+def _arquivos_indice(diretorio):
+    return {nome: os.path.join(diretorio, f"{nome}.npy") for nome in COLUNAS_INDICE}
+
+
+def _indice_existe(diretorio):
+    return all(os.path.exists(caminho) for caminho in _arquivos_indice(diretorio).values())
+
+
+def construir_indice(diretorio=DIRETORIO_INDICE):
+    """
+    Grava o índice completo (ordem de itertools.combinations(range(1, 26), 15)).
+    A escrita é feita em uma pasta temporária própria deste processo e renomeada no final, para
+    que um processo nunca abra um índice pela metade. Se outro processo construir o mesmo índice
+    ao mesmo tempo, o primeiro a terminar fica valendo e a cópia do outro é descartada.
+    """
+    pai = os.path.dirname(os.path.abspath(diretorio))
+    temporario = tempfile.mkdtemp(prefix=os.path.basename(diretorio) + ".", suffix=".tmp", dir=pai)
+    os.chmod(temporario, 0o755)
+    try:
+        colunas = {nome: np.lib.format.open_memmap(caminho, mode='w+', dtype=COLUNAS_INDICE[nome], shape=(TOTAL_JOGOS,))
+                   for nome, caminho in _arquivos_indice(temporario).items()}
+        posicao = 0
+        for bloco in iterar_blocos_combinacoes(range(1, TOTAL_DEZENAS + 1)):
+            fim = posicao + len(bloco)
+            contagens = calcular_contagens(bloco)
+            colunas['mascara'][posicao:fim] = bloco
+            colunas['impares'][posicao:fim] = contagens['impares']
+            colunas['primos'][posicao:fim] = contagens['primos']
+            colunas['moldura'][posicao:fim] = contagens['moldura']
+            colunas['soma'][posicao:fim] = somar_dezenas(bloco)
+            posicao = fim
+        for coluna in colunas.values():
+            coluna.flush()
+        del colunas
+        try:
+            os.rename(temporario, diretorio)
+        except OSError:
+            # A pasta de destino já existe: se outro processo terminou antes, o índice dele fica;
+            # senão é uma pasta incompleta de uma construção interrompida e é substituída.
+            if not _indice_existe(diretorio):
+                shutil.rmtree(diretorio, ignore_errors=True)
+                os.replace(temporario, diretorio)
+    finally:
+        shutil.rmtree(temporario, ignore_errors=True)
+
+
+def carregar_indice(diretorio=DIRETORIO_INDICE, construir_se_ausente=True):
+    """Abre as colunas do índice como memmaps somente leitura. Constrói o índice se ele não existir."""
+    arquivos = _arquivos_indice(diretorio)
+    if not _indice_existe(diretorio):
+        if not construir_se_ausente:
+            raise FileNotFoundError(f"Índice de jogos não encontrado em '{diretorio}'.")
+        construir_indice(diretorio)
+    indice = {nome: np.load(caminho, mmap_mode='r') for nome, caminho in arquivos.items()}
+    if any(len(coluna) != TOTAL_JOGOS for coluna in indice.values()):
+        raise ValueError(f"Índice de jogos em '{diretorio}' está incompleto. Apague a pasta e construa novamente.")
+    return indice
+
+
+@perfilado("consultar_indice")
+def consultar_indice(indice, universo=None, ultimo_sorteio=None, repetidas=None, impares=None, moldura=None, primos=None, soma=None,
+                     max_sequencia=None, fixas=None, excluidas=None, limite=None):
+    """
+    Responde a uma consulta de filtros como uma varredura de colunas e devolve as
+    máscaras aprovadas, na ordem do índice. Filtros com valor None são ignorados.
+    """
+    aprovados = np.ones(TOTAL_JOGOS, dtype=bool)
+    proibidas = jogo_para_mascara(excluidas or [])
+    if universo is not None:
+        proibidas |= ~jogo_para_mascara(universo) & ((1 << TOTAL_DEZENAS) - 1)
+    if proibidas:
+        aprovados &= (indice['mascara'] & np.uint32(proibidas)) == 0
+    if fixas:
+        mascara_fixas = np.uint32(jogo_para_mascara(fixas))
+        aprovados &= (indice['mascara'] & mascara_fixas) == mascara_fixas
+    for nome, faixa in (('impares', impares), ('moldura', moldura), ('primos', primos), ('soma', soma)):
+        if faixa is not None:
+            coluna = indice[nome]
+            aprovados &= (coluna >= faixa[0]) & (coluna <= faixa[1])
+    posicoes = np.flatnonzero(aprovados)
+    # Repetidas e sequência dependem de cada consulta: são calculadas só sobre as linhas restantes.
+    if repetidas is not None or max_sequencia is not None:
+        if repetidas is not None and ultimo_sorteio is None:
+            raise ValueError("O filtro de repetidas precisa do último sorteio.")
+        candidatos = np.asarray(indice['mascara'][posicoes])
+        aprovados_restantes = np.ones(len(posicoes), dtype=bool)
+        if repetidas is not None:
+            qtd = contar_bits(candidatos & np.uint32(jogo_para_mascara(ultimo_sorteio)))
+            aprovados_restantes &= (qtd >= repetidas[0]) & (qtd <= repetidas[1])
+        if max_sequencia is not None:
+            aprovados_restantes &= maior_sequencia(candidatos) <= max_sequencia
+        posicoes = posicoes[aprovados_restantes]
+    if limite is not None:
+        posicoes = posicoes[:limite]
+    return np.asarray(indice['mascara'][posicoes])
+
+
+# Constrói o índice quando o script é executado diretamente: python indice_jogos.py
+if __name__ == "__main__":
+    construir_indice()
+    print(f"Índice com {TOTAL_JOGOS} jogos gravado em '{DIRETORIO_INDICE}'.")
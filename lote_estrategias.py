@@ -0,0 +1,133 @@
+import os
+import sys
+import json
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import pandas as pd
+from nucleo import carregar_dados, executar_estrategia
+from indice_jogos import carregar_indice
+from exportacao import FORMATOS_EXPORTACAO, exportar_jogos
+from perfil import ativar_perfil, perfil_ativo, relatorio_perfil, limpar_perfil, somar_relatorios, formatar_relatorio
+
+# --- Estratégias em Lote ---
+# Roda vários arquivos de estratégia (o JSON do "💾 Salvar / Carregar Estratégia") em paralelo,
+# sem navegador. Cada processo carrega o histórico e abre o índice uma única vez; cada estratégia
+# grava seus jogos e seu resumo na pasta de saída, e no final sai um resumo de todas.
+DIRETORIO_SAIDA = "resultados_lote"
+
+_contexto = {}
+
+
+def _iniciar_processo(usar_indice, perfil=None):
+    if perfil:
+        ativar_perfil(memoria=perfil == 'memoria')
+    _contexto['df'] = carregar_dados()
+    _contexto['indice'] = carregar_indice(construir_se_ausente=False) if usar_indice else None
+    # O carregamento acontece uma vez por processo: vai no perfil da primeira estratégia que ele rodar.
+    _contexto['perfil_carregamento'] = relatorio_perfil() if perfil else {}
+
+
+def _nome_estrategia(caminho):
+    return os.path.splitext(os.path.basename(caminho))[0]
+
+
+def processar_estrategia(caminho, diretorio_saida, formato='csv', limite=None, n_backtest=100, n_simulacao=50, valor_esperado=False):
+    """Executa uma estratégia salva e grava `<nome>.<formato>` (jogos) e `<nome>.json` (resumo)."""
+    nome = _nome_estrategia(caminho)
+    limpar_perfil()
+    inicio = time.perf_counter()
+    try:
+        with open(caminho, encoding='utf-8') as arquivo:
+            estrategia = json.load(arquivo)
+        # Dentro de um processo do lote, a simulação e o valor esperado rodam sem criar outros processos.
+        mascaras, resumo = executar_estrategia(estrategia, _contexto['df'], limite, n_backtest, n_simulacao, valor_esperado,
+                                               indice=_contexto['indice'], processos=1)
+        caminho_jogos = os.path.join(diretorio_saida, f"{nome}.{formato}")
+        with open(caminho_jogos, 'wb') as arquivo:
+            for pedaco in exportar_jogos(mascaras, formato):
+                arquivo.write(pedaco)
+        resumo = {'estrategia': nome, 'arquivo_jogos': caminho_jogos, **resumo}
+    except Exception as erro:
+        resumo = {'estrategia': nome, 'erro': f"{type(erro).__name__}: {erro}"}
+    resumo['segundos'] = round(time.perf_counter() - inicio, 3)
+    if perfil_ativo():
+        resumo['perfil'] = somar_relatorios([_contexto.pop('perfil_carregamento', {}), relatorio_perfil()])
+    with open(os.path.join(diretorio_saida, f"{nome}.json"), 'w', encoding='utf-8') as arquivo:
+        json.dump(resumo, arquivo, indent=2, ensure_ascii=False)
+    return resumo
+
+
+def _linha_resumo(resumo):
+    # Uma linha por estratégia no resumo geral, com as métricas principais achatadas.
+    linha = {chave: valor for chave, valor in resumo.items() if not isinstance(valor, (dict, list))}
+    for secao in ('backtest', 'simulacao', 'valor_esperado'):
+        for chave, valor in resumo.get(secao, {}).items():
+            if isinstance(valor, dict):
+                linha.update({f"{secao}_{chave}_{faixa}": quantidade for faixa, quantidade in valor.items()})
+            else:
+                linha[f"{secao}_{chave}"] = valor
+    return linha
+
+
+def executar_lote(caminhos, diretorio_saida=DIRETORIO_SAIDA, processos=None, formato='csv', limite=None,
+                  n_backtest=100, n_simulacao=50, valor_esperado=False, perfil=None):
+    """
+    Processa as estratégias em um pool de processos e grava `resumo.csv` e `resumo.json`.
+    Com `perfil` ('tempo' ou 'memoria'), cada resumo traz o tempo de cada etapa; o carregamento do
+    histórico de cada processo entra no resumo da primeira estratégia que o processo rodou.
+    """
+    os.makedirs(diretorio_saida, exist_ok=True)
+    nomes = [_nome_estrategia(caminho) for caminho in caminhos]
+    if len(set(nomes)) != len(nomes):
+        raise ValueError("Há estratégias com o mesmo nome de arquivo; os resultados se sobrescreveriam.")
+    if carregar_dados() is None:
+        raise FileNotFoundError("Arquivo 'Lotofácil.xlsx' não encontrado.")
+    # O índice é montado aqui, uma vez, antes de os processos o abrirem.
+    usar_indice = not limite
+    if usar_indice:
+        carregar_indice()
+    resumos = []
+    with ProcessPoolExecutor(max_workers=processos, initializer=_iniciar_processo, initargs=(usar_indice, perfil)) as executor:
+        tarefas = [executor.submit(processar_estrategia, caminho, diretorio_saida, formato, limite, n_backtest, n_simulacao, valor_esperado)
+                   for caminho in caminhos]
+        for tarefa in as_completed(tarefas):
+            resumo = tarefa.result()
+            resumos.append(resumo)
+            situacao = f"ERRO ({resumo['erro']})" if 'erro' in resumo else f"{resumo['jogos']} jogos"
+            print(f"[{len(resumos)}/{len(caminhos)}] {resumo['estrategia']}: {situacao} em {resumo['segundos']:.1f}s")
+    resumos.sort(key=lambda resumo: resumo['estrategia'])
+    with open(os.path.join(diretorio_saida, "resumo.json"), 'w', encoding='utf-8') as arquivo:
+        json.dump(resumos, arquivo, indent=2, ensure_ascii=False)
+    pd.DataFrame([_linha_resumo(resumo) for resumo in resumos]).convert_dtypes().to_csv(os.path.join(diretorio_saida, "resumo.csv"), index=False)
+    return resumos
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Roda estratégias salvas da Lotofácil em lote, em paralelo.")
+    parser.add_argument("estrategias", nargs='+', help="Arquivos JSON de estratégia.")
+    parser.add_argument("--saida", default=DIRETORIO_SAIDA, help="Pasta de resultados (padrão: %(default)s).")
+    parser.add_argument("--processos", type=int, default=None, help="Processos em paralelo (padrão: todos os núcleos).")
+    parser.add_argument("--formato", choices=tuple(FORMATOS_EXPORTACAO), default='csv', help="Formato dos arquivos de jogos.")
+    parser.add_argument("--limite", type=int, default=0, help="Parar após X jogos aceitos por estratégia (0 = todos).")
+    parser.add_argument("--backtest", type=int, default=100, help="Validar os filtros nos últimos X concursos (0 = não validar).")
+    parser.add_argument("--simulacao", type=int, default=50, help="Simular os jogos nos últimos X concursos (0 = não simular).")
+    parser.add_argument("--valor-esperado", action='store_true', help="Calcular o valor esperado exato de cada estratégia.")
+    parser.add_argument("--perfil", choices=('tempo', 'memoria'), default=None, help="Medir cada etapa (tempo, ou tempo e pico de memória).")
+    opcoes = parser.parse_args(argumentos)
+    try:
+        resumos = executar_lote(opcoes.estrategias, opcoes.saida, opcoes.processos, opcoes.formato, opcoes.limite or None,
+                                opcoes.backtest, opcoes.simulacao, opcoes.valor_esperado, opcoes.perfil)
+    except (FileNotFoundError, ValueError) as erro:
+        print(f"ERRO: {erro}")
+        return 1
+    if opcoes.perfil:
+        print("\n--- PERFIL POR ETAPA (todas as estratégias) ---")
+        print(formatar_relatorio(somar_relatorios(resumo.get('perfil', {}) for resumo in resumos)))
+    falhas = sum('erro' in resumo for resumo in resumos)
+    print(f"{len(resumos) - falhas} estratégia(s) concluída(s), {falhas} com erro. Resultados em '{opcoes.saida}'.")
+    return 1 if falhas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
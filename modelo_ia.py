@@ -0,0 +1,111 @@
+import os
+import glob
+import hashlib
+import tempfile
+import joblib
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from motor_jogos import (TOTAL_DEZENAS, DEZENAS_POR_JOGO, MASCARA_IMPARES, MASCARA_PRIMOS, MASCARA_MOLDURA,
+                         contar_bits, somar_dezenas)
+from perfil import perfilado
+
+# --- Modelo de I.A. ("Crítico de Arte") ---
+# O modelo treinado fica salvo em disco com uma chave que combina o histórico de concursos e o
+# esquema de features; ao reiniciar o processo ele é carregado em vez de treinado outra vez.
+# Mude VERSAO_FEATURES sempre que COLUNAS_FEATURES ou o cálculo delas mudar.
+VERSAO_FEATURES = 1
+COLUNAS_FEATURES = (['soma_dezenas', 'qtd_impares', 'qtd_primos', 'qtd_moldura', 'qtd_pares']
+                    + [f'dezena_{i}' for i in range(1, TOTAL_DEZENAS + 1)])
+DIRETORIO_MODELOS = "modelos_ia"
+TAMANHO_LOTE = 100_000
+SEMENTE = 42
+# Modelos de outras chaves salvos há mais que isso (segundos) antes do atual são apagados.
+IDADE_LIMPEZA_MODELOS = 3600
+
+
+def matriz_features(mascaras):
+    """Matriz de features (N x 30) na ordem de COLUNAS_FEATURES, calculada direto das máscaras."""
+    mascaras = np.asarray(mascaras, dtype=np.uint32)
+    features = np.empty((len(mascaras), len(COLUNAS_FEATURES)), dtype=np.int16)
+    features[:, 0] = somar_dezenas(mascaras)
+    features[:, 1] = contar_bits(mascaras & np.uint32(MASCARA_IMPARES))
+    features[:, 2] = contar_bits(mascaras & np.uint32(MASCARA_PRIMOS))
+    features[:, 3] = contar_bits(mascaras & np.uint32(MASCARA_MOLDURA))
+    features[:, 4] = DEZENAS_POR_JOGO - features[:, 1]
+    features[:, 5:] = (mascaras[:, None] >> np.arange(TOTAL_DEZENAS, dtype=np.uint32)) & 1
+    return features
+
+
+def gerar_negativos(positivos, quantidade, semente=SEMENTE):
+    """Sorteia `quantidade` jogos aleatórios distintos que não estão entre os positivos."""
+    rng = np.random.default_rng(semente)
+    vistos = set(np.asarray(positivos, dtype=np.uint32).tolist())
+    negativos = []
+    while len(negativos) < quantidade:
+        # Um lote de jogos aleatórios: as 15 menores posições de uma permutação aleatória.
+        dezenas = np.argsort(rng.random((2 * (quantidade - len(negativos)) + 16, TOTAL_DEZENAS)), axis=1)[:, :DEZENAS_POR_JOGO]
+        for mascara in np.bitwise_or.reduce(np.left_shift(np.uint32(1), dezenas.astype(np.uint32)), axis=1).tolist():
+            if mascara not in vistos:
+                vistos.add(mascara)
+                negativos.append(mascara)
+                if len(negativos) == quantidade:
+                    break
+    return np.array(negativos, dtype=np.uint32)
+
+
+@perfilado("treinar_modelo_ia")
+def treinar_modelo(mascaras_sorteios):
+    """Treina o RandomForest com os sorteios reais (1) e a mesma quantidade de jogos aleatórios (0)."""
+    positivos = np.asarray(mascaras_sorteios, dtype=np.uint32)
+    negativos = gerar_negativos(positivos, len(positivos))
+    X = matriz_features(np.concatenate([positivos, negativos]))
+    y = np.concatenate([np.ones(len(positivos), dtype=np.int8), np.zeros(len(negativos), dtype=np.int8)])
+    modelo = RandomForestClassifier(n_estimators=100, random_state=SEMENTE, n_jobs=-1)
+    modelo.fit(X, y)
+    return modelo
+
+
+def chave_modelo(mascaras_sorteios):
+    """Hash do histórico de concursos e do esquema de features que identifica o modelo salvo."""
+    hash_modelo = hashlib.sha256(f"v{VERSAO_FEATURES}:{','.join(COLUNAS_FEATURES)}".encode())
+    hash_modelo.update(np.ascontiguousarray(mascaras_sorteios, dtype='<u4').tobytes())
+    return hash_modelo.hexdigest()[:16]
+
+
+def carregar_ou_treinar_modelo(mascaras_sorteios, diretorio=DIRETORIO_MODELOS):
+    """Carrega o modelo salvo para este histórico; se não houver, treina, salva e apaga os antigos (por idade)."""
+    chave = chave_modelo(mascaras_sorteios)
+    caminho = os.path.join(diretorio, f"modelo_{chave}.joblib")
+    if os.path.exists(caminho):
+        try:
+            return joblib.load(caminho)
+        except Exception:
+            pass
+    modelo = treinar_modelo(mascaras_sorteios)
+    os.makedirs(diretorio, exist_ok=True)
+    # Arquivo temporário único: sessões do app (threads do mesmo processo) podem salvar ao mesmo tempo.
+    descritor, temporario = tempfile.mkstemp(prefix=f"modelo_{chave}.", suffix=".tmp", dir=diretorio)
+    os.close(descritor)
+    joblib.dump(modelo, temporario)
+    os.replace(temporario, caminho)
+    # Só apaga modelos bem mais antigos que o recém-salvo: um modelo recente de outra chave pode
+    # estar em uso por outro processo (lote, outra sessão) com um histórico diferente.
+    limite = os.path.getmtime(caminho) - IDADE_LIMPEZA_MODELOS
+    for antigo in glob.glob(os.path.join(diretorio, "modelo_*.joblib")):
+        try:
+            if antigo != caminho and os.path.getmtime(antigo) < limite:
+                os.remove(antigo)
+        except FileNotFoundError:
+            pass  # Outro processo já apagou.
+    return modelo
+
+
+@perfilado("pontuar_jogos_ia")
+def pontuar_jogos_ia(modelo, mascaras, tamanho_lote=TAMANHO_LOTE):
+    """Probabilidade de 'jogo vencedor' para cada máscara, calculada em lotes de memória limitada."""
+    mascaras = np.asarray(mascaras, dtype=np.uint32)
+    probabilidades = np.empty(len(mascaras), dtype=np.float32)
+    for inicio in range(0, len(mascaras), tamanho_lote):
+        lote = mascaras[inicio:inicio + tamanho_lote]
+        probabilidades[inicio:inicio + len(lote)] = modelo.predict_proba(matriz_features(lote))[:, 1]
+    return probabilidades
@@ -0,0 +1,203 @@
+import numpy as np
+
+# --- Constantes do Volante ---
+# Cada jogo é guardado como um inteiro de 25 bits: a dezena d ocupa o bit (d - 1).
+TOTAL_DEZENAS = 25
+DEZENAS_POR_JOGO = 15
+MOLDURA_DEZENAS = {1, 2, 3, 4, 5, 6, 10, 11, 15, 16, 20, 21, 22, 23, 24, 25}
+PRIMOS = {2, 3, 5, 7, 11, 13, 17, 19, 23}
+IMPARES = set(range(1, TOTAL_DEZENAS + 1, 2))
+# Quantidade de máscaras locais examinadas por bloco na enumeração em fluxo (~4 MB).
+TAMANHO_BLOCO = 1 << 20
+
+
+def jogo_para_mascara(jogo):
+    """Converte uma coleção de dezenas (1 a 25) na máscara de bits correspondente."""
+    mascara = 0
+    for dezena in jogo:
+        mascara |= 1 << (int(dezena) - 1)
+    return mascara
+
+
+def mascara_para_jogo(mascara):
+    """Converte uma máscara de bits de volta para a lista ordenada de dezenas."""
+    mascara = int(mascara)
+    return [dezena for dezena in range(1, TOTAL_DEZENAS + 1) if mascara >> (dezena - 1) & 1]
+
+
+MASCARA_MOLDURA = jogo_para_mascara(MOLDURA_DEZENAS)
+MASCARA_PRIMOS = jogo_para_mascara(PRIMOS)
+MASCARA_IMPARES = jogo_para_mascara(IMPARES)
+
+# Tabela de popcount para 16 bits, usada quando o NumPy não tem np.bitwise_count (< 2.0).
+_POPCOUNT_16 = np.array([bin(i).count("1") for i in range(1 << 16)], dtype=np.uint8)
+
+
+def contar_bits(mascaras):
+    """Popcount vetorizado de um array de máscaras uint32."""
+    mascaras = np.asarray(mascaras, dtype=np.uint32)
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(mascaras)
+    return _POPCOUNT_16[mascaras & 0xFFFF] + _POPCOUNT_16[mascaras >> 16]
+
+
+# Soma das dezenas presentes em cada byte da máscara, uma tabela por byte.
+_SOMA_POR_BYTE = [np.array([sum(8 * byte + j + 1 for j in range(8) if valor >> j & 1) for valor in range(256)],
+                           dtype=np.uint16) for byte in range(4)]
+
+
+def somar_dezenas(mascaras):
+    """Soma vetorizada das dezenas de cada jogo, a partir das máscaras."""
+    mascaras = np.asarray(mascaras, dtype=np.uint32)
+    soma = np.zeros(len(mascaras), dtype=np.uint16)
+    for byte, tabela in enumerate(_SOMA_POR_BYTE):
+        soma += tabela[(mascaras >> np.uint32(8 * byte)) & 0xFF]
+    return soma
+
+
+def mascaras_de_sorteios(sorteios):
+    """Converte uma lista de sorteios (listas de dezenas) em um array uint32 de máscaras."""
+    dezenas = np.asarray(sorteios, dtype=np.uint32).reshape(len(sorteios), -1)
+    if dezenas.size == 0:
+        return np.zeros(len(sorteios), dtype=np.uint32)
+    return np.bitwise_or.reduce(np.left_shift(np.uint32(1), dezenas - 1), axis=1).astype(np.uint32)
+
+
+def mascaras_para_matriz(mascaras, tamanho=DEZENAS_POR_JOGO):
+    """Converte máscaras em uma matriz (N x tamanho) com as dezenas em ordem crescente."""
+    mascaras = np.asarray(mascaras, dtype=np.uint32)
+    bits = (mascaras[:, None] >> np.arange(TOTAL_DEZENAS, dtype=np.uint32)) & 1
+    _, colunas = np.nonzero(bits)
+    return (colunas + 1).astype(np.uint8).reshape(len(mascaras), tamanho)
+
+
+def _tabelas_de_traducao(dezenas):
+    """
+    Monta as tabelas que traduzem uma máscara "local" (um bit por posição do universo)
+    para a máscara global do volante, um byte por vez. A menor dezena fica no bit mais
+    alto, de forma que a ordem decrescente das máscaras locais é a ordem lexicográfica
+    de itertools.combinations.
+    """
+    n = len(dezenas)
+    bit_global = [1 << (dezenas[n - 1 - posicao] - 1) for posicao in range(n)]
+    tabelas = []
+    for byte in range((n + 7) // 8):
+        tabela = np.zeros(256, dtype=np.uint32)
+        for valor in range(256):
+            mascara = 0
+            for j in range(8):
+                posicao = 8 * byte + j
+                if valor >> j & 1 and posicao < n:
+                    mascara |= bit_global[posicao]
+            tabela[valor] = mascara
+        tabelas.append(tabela)
+    return tabelas
+
+
+def _traduzir_mascaras_locais(locais, tabelas):
+    resultado = np.zeros(len(locais), dtype=np.uint32)
+    for byte, tabela in enumerate(tabelas):
+        resultado |= tabela[(locais >> np.uint32(8 * byte)) & 0xFF]
+    return resultado
+
+
+def iterar_blocos_combinacoes(dezenas, tamanho=DEZENAS_POR_JOGO, tamanho_bloco=TAMANHO_BLOCO):
+    """
+    Percorre as combinações de `tamanho` dezenas do universo em blocos de máscaras uint32,
+    na mesma ordem de itertools.combinations(sorted(dezenas), tamanho). Cada bloco varre no
+    máximo `tamanho_bloco` máscaras locais, então o pico de memória não depende do universo.
+    """
+    dezenas = sorted(set(int(d) for d in dezenas))
+    n = len(dezenas)
+    if n < tamanho:
+        return
+    tabelas = _tabelas_de_traducao(dezenas)
+    fim = 1 << n
+    while fim > 0:
+        inicio = max(fim - tamanho_bloco, 0)
+        locais = np.arange(fim - 1, inicio - 1, -1, dtype=np.uint32)
+        locais = locais[contar_bits(locais) == tamanho]
+        if len(locais):
+            yield _traduzir_mascaras_locais(locais, tabelas)
+        fim = inicio
+
+
+def gerar_combinacoes(dezenas, tamanho=DEZENAS_POR_JOGO):
+    """Gera todas as combinações do universo de uma vez, como um único array de máscaras."""
+    blocos = list(iterar_blocos_combinacoes(dezenas, tamanho))
+    return np.concatenate(blocos) if blocos else np.zeros(0, dtype=np.uint32)
+
+
+def calcular_contagens(mascaras, ultimo_sorteio=None):
+    """
+    Calcula, para cada jogo, a quantidade de repetidas (em relação ao último sorteio),
+    ímpares, dezenas da moldura e primos.
+    """
+    mascaras = np.asarray(mascaras, dtype=np.uint32)
+    contagens = {
+        'impares': contar_bits(mascaras & np.uint32(MASCARA_IMPARES)),
+        'moldura': contar_bits(mascaras & np.uint32(MASCARA_MOLDURA)),
+        'primos': contar_bits(mascaras & np.uint32(MASCARA_PRIMOS)),
+    }
+    if ultimo_sorteio is not None:
+        contagens['repetidas'] = contar_bits(mascaras & np.uint32(jogo_para_mascara(ultimo_sorteio)))
+    return contagens
+
+
+def maior_sequencia(mascaras):
+    """Tamanho da maior sequência de dezenas consecutivas de cada jogo."""
+    restante = np.asarray(mascaras, dtype=np.uint32).copy()
+    sequencia = np.zeros(len(restante), dtype=np.uint8)
+    # Cada passo de m & (m >> 1) encurta todas as sequências em uma dezena.
+    while restante.any():
+        sequencia += restante != 0
+        restante &= restante >> np.uint32(1)
+    return sequencia
+
+
+def filtrar_jogos(mascaras, ultimo_sorteio=None, repetidas=None, impares=None, moldura=None, primos=None,
+                  soma=None, max_sequencia=None, fixas=None, excluidas=None):
+    """
+    Aplica os filtros de faixa (min, max) a um array de máscaras e devolve apenas os
+    jogos aprovados. Filtros com valor None são ignorados.
+    """
+    mascaras = np.asarray(mascaras, dtype=np.uint32)
+    aprovados = np.ones(len(mascaras), dtype=bool)
+    faixas = [(repetidas, jogo_para_mascara(ultimo_sorteio) if ultimo_sorteio is not None else None),
+              (impares, MASCARA_IMPARES), (moldura, MASCARA_MOLDURA), (primos, MASCARA_PRIMOS)]
+    for faixa, mascara_referencia in faixas:
+        if faixa is None:
+            continue
+        if mascara_referencia is None:
+            raise ValueError("O filtro de repetidas precisa do último sorteio.")
+        minimo, maximo = faixa
+        qtd = contar_bits(mascaras & np.uint32(mascara_referencia))
+        aprovados &= (qtd >= minimo) & (qtd <= maximo)
+    if fixas:
+        mascara_fixas = np.uint32(jogo_para_mascara(fixas))
+        aprovados &= (mascaras & mascara_fixas) == mascara_fixas
+    if excluidas:
+        aprovados &= (mascaras & np.uint32(jogo_para_mascara(excluidas))) == 0
+    if soma is not None:
+        total = somar_dezenas(mascaras)
+        aprovados &= (total >= soma[0]) & (total <= soma[1])
+    if max_sequencia is not None:
+        aprovados &= maior_sequencia(mascaras) <= max_sequencia
+    return mascaras[aprovados]
+
+
+def gerar_jogos_filtrados(dezenas, ultimo_sorteio=None, limite=None, tamanho_bloco=TAMANHO_BLOCO, **faixas):
+    """
+    Enumera as combinações do universo bloco a bloco, aplica filtrar_jogos em cada bloco
+    e devolve os sobreviventes à medida que aparecem. Para depois de `limite` jogos aceitos.
+    """
+    aceitos = 0
+    for bloco in iterar_blocos_combinacoes(dezenas, tamanho_bloco=tamanho_bloco):
+        sobreviventes = filtrar_jogos(bloco, ultimo_sorteio, **faixas)
+        if limite is not None:
+            sobreviventes = sobreviventes[:limite - aceitos]
+        if len(sobreviventes):
+            aceitos += len(sobreviventes)
+            yield sobreviventes
+        if limite is not None and aceitos >= limite:
+            return
@@ -0,0 +1,142 @@
+import json
+from math import comb
+import numpy as np
+from historico import COLUNAS_BOLAS, carregar_historico
+from motor_jogos import DEZENAS_POR_JOGO, mascaras_de_sorteios
+from indice_jogos import consultar_indice
+from gerador_restricoes import gerar_jogos_com_restricoes
+from estatisticas import frequencia_e_atraso, frequencia_recente
+from backtest import calcular_metricas_concursos, filtrar_concursos_alinhados
+from simulacao import CUSTO_APOSTA, FAIXAS_PREMIADAS, simular_custo_beneficio, calcular_valor_esperado
+from perfil import perfilado
+
+# --- Núcleo sem Interface ---
+# Carregamento, análise, geração, backtest e simulação sem nenhuma dependência do Streamlit: o app
+# só acrescenta cache e widgets por cima destas funções, e os jobs em lote (lote_estrategias.py)
+# as chamam diretamente.
+
+# Valores usados quando uma estratégia salva não traz algum campo (os mesmos padrões dos widgets).
+ESTRATEGIA_PADRAO = {"universo_dezenas": "", "filtro_repetidas": (8, 10), "filtro_impares": (7, 9), "filtro_moldura": (0, 16),
+                     "filtro_primos": (0, 9), "filtro_soma": (120, 270), "max_sequencia": 15, "dezenas_fixas": "", "dezenas_excluidas": ""}
+
+
+def carregar_dados():
+    """Histórico de concursos (cache binário ou planilha); None se a planilha não existir."""
+    try:
+        return carregar_historico()
+    except FileNotFoundError:
+        return None
+
+
+@perfilado("extrair_numeros")
+def extrair_numeros(df):
+    bola_cols = [col for col in df.columns if col.startswith('Bola')]
+    return df[bola_cols].dropna().astype(int).values.tolist()
+
+
+def ler_dezenas(texto):
+    return sorted(set(int(num.strip()) for num in texto.split(',') if num.strip()))
+
+
+def sugerir_universo_estrategico(estado, num_sorteios=1000, tamanho_universo=19):
+    """Universo sugerido a partir do estado de estatísticas: 60% frequência recente, 40% atraso."""
+    frequencia = frequencia_recente(estado, num_sorteios)
+    _, atraso_geral = frequencia_e_atraso(estado)
+    scores = {}
+    max_freq = max(frequencia.values()) if frequencia else 1
+    max_atraso = max(atraso_geral.values()) if atraso_geral else 1
+    for dezena in range(1, 26):
+        score_freq = frequencia.get(dezena, 0) / max_freq
+        score_atraso = atraso_geral.get(dezena, 0) / max_atraso
+        scores[dezena] = (0.6 * score_freq) + (0.4 * score_atraso)
+    dezenas_ordenadas = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+    universo_sugerido = [dezena for dezena, score in dezenas_ordenadas[:tamanho_universo]]
+    return sorted(universo_sugerido)
+
+
+@perfilado("metricas_backtest")
+def metricas_backtest(df, n_concursos):
+    # Linhas incompletas (alguma bola vazia) ficam de fora, como em extrair_numeros.
+    sorteios_teste = df.tail(n_concursos).dropna(subset=COLUNAS_BOLAS)
+    mascaras = mascaras_de_sorteios(sorteios_teste[COLUNAS_BOLAS].astype(int).values.tolist())
+    return sorteios_teste['Concurso'].astype(int).values[1:], calcular_metricas_concursos(mascaras)
+
+
+def concursos_alinhados(concursos, metricas, repetidas, impares, moldura):
+    return concursos[filtrar_concursos_alinhados(metricas, repetidas, impares, moldura)].tolist()
+
+
+def executar_backtest_filtros(df, n_concursos, min_rep, max_rep, min_imp, max_imp, min_mold, max_mold):
+    if len(df.tail(n_concursos)) < 2: return []
+    concursos, metricas = metricas_backtest(df, n_concursos)
+    return concursos_alinhados(concursos, metricas, (min_rep, max_rep), (min_imp, max_imp), (min_mold, max_mold))
+
+
+@perfilado("gerar_jogos")
+def gerar_jogos(universo, restricoes, ultimo_sorteio, limite=None, indice=None):
+    """
+    Máscaras dos jogos do universo aprovados pelas restrições. Com `limite`, a busca com cortes
+    para nos primeiros jogos aceitos; sem limite, usa o índice em disco quando ele é informado.
+    """
+    if not limite and indice is not None:
+        return consultar_indice(indice, universo, ultimo_sorteio, **restricoes)
+    blocos = list(gerar_jogos_com_restricoes(universo, restricoes, ultimo_sorteio, limite=limite or None))
+    return np.concatenate(blocos) if blocos else np.zeros(0, dtype=np.uint32)
+
+
+def ler_estrategia(dados):
+    """Completa uma estratégia salva (dict ou texto JSON) com os valores padrão."""
+    if isinstance(dados, str):
+        dados = json.loads(dados)
+    estrategia = {**ESTRATEGIA_PADRAO, **dados}
+    for chave, padrao in ESTRATEGIA_PADRAO.items():
+        if isinstance(padrao, tuple):
+            estrategia[chave] = tuple(estrategia[chave])
+    return estrategia
+
+
+def restricoes_da_estrategia(estrategia):
+    """Universo de dezenas e dicionário de restrições (formato de gerar_jogos_com_restricoes)."""
+    universo = estrategia["universo_dezenas"]
+    universo = ler_dezenas(universo) if isinstance(universo, str) else sorted(set(int(d) for d in universo))
+    fixas, excluidas = estrategia["dezenas_fixas"], estrategia["dezenas_excluidas"]
+    restricoes = {'repetidas': estrategia["filtro_repetidas"], 'impares': estrategia["filtro_impares"],
+                  'moldura': estrategia["filtro_moldura"], 'primos': estrategia["filtro_primos"],
+                  'soma': estrategia["filtro_soma"], 'max_sequencia': estrategia["max_sequencia"],
+                  'fixas': ler_dezenas(fixas) if isinstance(fixas, str) else list(fixas),
+                  'excluidas': ler_dezenas(excluidas) if isinstance(excluidas, str) else list(excluidas)}
+    return universo, restricoes
+
+
+def executar_estrategia(estrategia, df, limite=None, n_backtest=100, n_simulacao=50, valor_esperado=False, indice=None, processos=None):
+    """
+    Roda uma estratégia completa contra o histórico: gera os jogos a partir do último concurso,
+    valida os filtros nos últimos `n_backtest` concursos e simula os jogos nos últimos
+    `n_simulacao`. Devolve as máscaras dos jogos e um resumo serializável em JSON.
+    """
+    universo, restricoes = restricoes_da_estrategia(ler_estrategia(estrategia))
+    if len(universo) < DEZENAS_POR_JOGO:
+        raise ValueError("Você precisa escolher pelo menos 15 dezenas.")
+    todos_os_sorteios = extrair_numeros(df)
+    mascaras = gerar_jogos(universo, restricoes, set(todos_os_sorteios[-1]), limite, indice)
+    resumo = {'concurso_base': int(df.iloc[-1]['Concurso']), 'universo': universo, 'total_combinacoes': comb(len(universo), DEZENAS_POR_JOGO),
+              'jogos': int(len(mascaras)), 'custo': len(mascaras) * CUSTO_APOSTA}
+    if n_backtest:
+        concursos, metricas = metricas_backtest(df, n_backtest)
+        alinhados = concursos_alinhados(concursos, metricas, restricoes['repetidas'], restricoes['impares'], restricoes['moldura'])
+        total_testado = len(concursos)
+        resumo['backtest'] = {'concursos_testados': total_testado, 'concursos_alinhados': len(alinhados),
+                              'alinhamento': len(alinhados) / total_testado * 100 if total_testado > 0 else 0.0}
+    if n_simulacao and len(mascaras):
+        simulacao = simular_custo_beneficio(mascaras, mascaras_de_sorteios(todos_os_sorteios[-n_simulacao:]), processos=processos)
+        resumo['simulacao'] = {'concursos': min(n_simulacao, len(todos_os_sorteios)),
+                               'premios': {faixa: int(simulacao['premios'][faixa]) for faixa in FAIXAS_PREMIADAS},
+                               'custo_total': float(simulacao['custo_total']), 'receita_total': float(simulacao['receita_total']),
+                               'saldo': float(simulacao['saldo'])}
+    if valor_esperado and len(mascaras):
+        valor = calcular_valor_esperado(mascaras, processos=processos)
+        resumo['valor_esperado'] = {'retorno_esperado': float(valor['retorno_esperado']), 'saldo_esperado': float(valor['saldo_esperado']),
+                                    'desvio_padrao': float(valor['desvio_padrao']),
+                                    'probabilidade_sem_prejuizo': float(valor['probabilidade_sem_prejuizo']),
+                                    'premios_esperados': {faixa: float(p) for faixa, p in valor['premios_esperados'].items()}}
+    return mascaras, resumo
@@ -0,0 +1,171 @@
+import time
+import threading
+import functools
+import contextvars
+import tracemalloc
+from contextlib import contextmanager
+
+# --- Perfil por Etapa ---
+# Mede tempo de parede e pico de memória das etapas do pipeline (carregamento, geração, backtest,
+# I.A., simulação...). Desligado, o custo é uma checagem de flag por chamada. A memória vem do
+# tracemalloc (o NumPy registra nele as suas alocações) e só é medida quando pedida, porque o
+# rastreamento deixa as alocações mais lentas.
+# O estado (ligado, memória e medições) é um dicionário de perfil. Scripts e o lote usam o perfil
+# do processo; o app dá a cada sessão o seu com usar_perfil(), então uma sessão não liga, desliga
+# nem mistura as medições da outra. Só o tracemalloc é do processo inteiro: ele é ligado quando
+# começa uma etapa com medição de memória e desligado quando a última delas termina, então nada
+# fica rastreando depois das medições (nem quando uma sessão é fechada com a memória ligada). Os
+# picos de etapas simultâneas de sessões diferentes se misturam.
+_trava = threading.Lock()
+_pilha = threading.local()
+# Etapas em andamento com medição de memória e se foi este módulo que ligou o tracemalloc.
+_etapas_com_memoria = 0
+_ligou_tracemalloc = False
+
+
+def criar_perfil():
+    """Estado de perfil novo e desligado."""
+    return {'ativo': False, 'memoria': False, 'registro': {}}
+
+
+_perfil_processo = criar_perfil()
+_perfil_contexto = contextvars.ContextVar('perfil', default=None)
+
+
+def usar_perfil(perfil):
+    """Faz o contexto atual (no app, a execução do script de uma sessão) medir em `perfil`."""
+    _perfil_contexto.set(perfil)
+
+
+def _perfil_atual():
+    return _perfil_contexto.get() or _perfil_processo
+
+
+def _iniciar_rastreamento():
+    global _etapas_com_memoria, _ligou_tracemalloc
+    with _trava:
+        _etapas_com_memoria += 1
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _ligou_tracemalloc = True
+
+
+def _encerrar_rastreamento():
+    # Um tracemalloc ligado por fora (python -X tracemalloc, por exemplo) continua ligado.
+    global _etapas_com_memoria, _ligou_tracemalloc
+    with _trava:
+        _etapas_com_memoria -= 1
+        if not _etapas_com_memoria and _ligou_tracemalloc:
+            tracemalloc.stop()
+            _ligou_tracemalloc = False
+
+
+def ativar_perfil(memoria=False):
+    perfil = _perfil_atual()
+    perfil['ativo'] = True
+    perfil['memoria'] = memoria
+
+
+def desativar_perfil():
+    _perfil_atual()['ativo'] = False
+
+
+def perfil_ativo():
+    return _perfil_atual()['ativo']
+
+
+def _registrar(perfil, etapa, segundos, pico_bytes):
+    with _trava:
+        entrada = perfil['registro'].setdefault(etapa, {'chamadas': 0, 'segundos': 0.0, 'max_segundos': 0.0, 'pico_bytes': None})
+        entrada['chamadas'] += 1
+        entrada['segundos'] += segundos
+        entrada['max_segundos'] = max(entrada['max_segundos'], segundos)
+        if pico_bytes is not None:
+            entrada['pico_bytes'] = max(entrada['pico_bytes'] or 0, pico_bytes)
+
+
+@contextmanager
+def medir(etapa):
+    """
+    Mede o bloco como a etapa `etapa`. O dicionário devolvido recebe 'segundos' e 'pico_bytes'
+    (memória alocada além da existente no início; None sem medição de memória) ao sair do bloco.
+    """
+    medida = {'etapa': etapa, 'segundos': None, 'pico_bytes': None}
+    perfil = _perfil_atual()
+    if not perfil['ativo']:
+        yield medida
+        return
+    memoria = perfil['memoria']
+    pilha = _pilha.__dict__.setdefault('quadros', [])
+    if memoria:
+        _iniciar_rastreamento()
+        # Etapas aninhadas: o pico visto até aqui é guardado nas etapas de fora antes de zerá-lo.
+        atual, pico = tracemalloc.get_traced_memory()
+        for quadro in pilha:
+            quadro['pico'] = max(quadro['pico'], pico)
+        tracemalloc.reset_peak()
+        quadro = {'base': atual, 'pico': atual}
+        pilha.append(quadro)
+    inicio = time.perf_counter()
+    try:
+        yield medida
+    finally:
+        medida['segundos'] = time.perf_counter() - inicio
+        if memoria:
+            # Se o tracemalloc foi desligado por fora no meio da etapa, o pico dela não vale.
+            rastreando = tracemalloc.is_tracing()
+            if rastreando:
+                quadro['pico'] = max(quadro['pico'], tracemalloc.get_traced_memory()[1])
+            pilha.pop()
+            for externo in pilha:
+                externo['pico'] = max(externo['pico'], quadro['pico'])
+            medida['pico_bytes'] = quadro['pico'] - quadro['base'] if rastreando else None
+            _encerrar_rastreamento()
+        _registrar(perfil, etapa, medida['segundos'], medida['pico_bytes'])
+
+
+def perfilado(etapa):
+    """Decorador que mede cada chamada da função como a etapa `etapa` quando o perfil está ativo."""
+    def decorador(funcao):
+        @functools.wraps(funcao)
+        def envoltorio(*args, **kwargs):
+            if not _perfil_atual()['ativo']:
+                return funcao(*args, **kwargs)
+            with medir(etapa):
+                return funcao(*args, **kwargs)
+        return envoltorio
+    return decorador
+
+
+def relatorio_perfil():
+    """Cópia do registro: etapa -> chamadas, segundos (total), max_segundos e pico_bytes."""
+    with _trava:
+        return {etapa: dict(entrada) for etapa, entrada in _perfil_atual()['registro'].items()}
+
+
+def limpar_perfil(perfil=None):
+    with _trava:
+        (perfil or _perfil_atual())['registro'].clear()
+
+
+def somar_relatorios(relatorios):
+    """Junta relatórios de vários processos (por exemplo, os processos de um lote)."""
+    total = {}
+    for relatorio in relatorios:
+        for etapa, entrada in relatorio.items():
+            soma = total.setdefault(etapa, {'chamadas': 0, 'segundos': 0.0, 'max_segundos': 0.0, 'pico_bytes': None})
+            soma['chamadas'] += entrada['chamadas']
+            soma['segundos'] += entrada['segundos']
+            soma['max_segundos'] = max(soma['max_segundos'], entrada['max_segundos'])
+            if entrada['pico_bytes'] is not None:
+                soma['pico_bytes'] = max(soma['pico_bytes'] or 0, entrada['pico_bytes'])
+    return total
+
+
+def formatar_relatorio(relatorio):
+    """Tabela de texto do relatório, das etapas mais demoradas para as mais rápidas."""
+    linhas = [f"{'Etapa':<32}{'Chamadas':>9}{'Total (s)':>11}{'Máx. (s)':>10}{'Pico (MB)':>11}"]
+    for etapa, entrada in sorted(relatorio.items(), key=lambda item: item[1]['segundos'], reverse=True):
+        pico = f"{entrada['pico_bytes'] / 2**20:.1f}" if entrada['pico_bytes'] is not None else "-"
+        linhas.append(f"{etapa:<32}{entrada['chamadas']:>9}{entrada['segundos']:>11.3f}{entrada['max_segundos']:>10.3f}{pico:>11}")
+    return "\n".join(linhas)
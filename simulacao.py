@@ -0,0 +1,162 @@
+import os
+import numpy as np
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from motor_jogos import DEZENAS_POR_JOGO, contar_bits
+from indice_jogos import DIRETORIO_INDICE, TOTAL_JOGOS, carregar_indice
+from perfil import perfilado
+
+# --- Simulação de Custo/Benefício ---
+CUSTO_APOSTA = 3.0
+PREMIOS_FIXOS = {11: 6.0, 12: 12.0, 13: 30.0}
+FAIXAS_PREMIADAS = (11, 12, 13, 14, 15)
+# Sorteios conferidos por vez contra o portfólio inteiro (matriz jogos x bloco em uint8).
+TAMANHO_BLOCO_SORTEIOS = 256
+# Abaixo deste número de conferências (jogos x sorteios) não compensa abrir processos.
+MINIMO_CONFERENCIAS_PARALELO = 50_000_000
+# Memória dos temporários (jogos x sorteios do bloco) de cada conferência: portfólios grandes são
+# conferidos em fatias de jogos que cabem nisso. Por par: AND em uint32, acertos em uint8 e a
+# comparação com a faixa.
+MEMORIA_BLOCO_SORTEIOS = 1 << 26
+BYTES_POR_CONFERENCIA = 6
+
+
+def matriz_acertos(jogos, sorteios):
+    """Matriz (jogos x sorteios) com a quantidade de acertos de cada jogo em cada sorteio."""
+    jogos = np.asarray(jogos, dtype=np.uint32)
+    sorteios = np.asarray(sorteios, dtype=np.uint32)
+    return contar_bits(jogos[:, None] & sorteios[None, :])
+
+
+def _contar_faixas(jogos, sorteios, tamanho_bloco=TAMANHO_BLOCO_SORTEIOS):
+    # Para cada faixa premiada: quantas vezes cada jogo e cada sorteio a atingiram.
+    por_jogo = np.zeros((len(jogos), len(FAIXAS_PREMIADAS)), dtype=np.int64)
+    por_sorteio = np.zeros((len(sorteios), len(FAIXAS_PREMIADAS)), dtype=np.int64)
+    jogos_por_fatia = max(MEMORIA_BLOCO_SORTEIOS // (tamanho_bloco * BYTES_POR_CONFERENCIA), 1)
+    for inicio in range(0, len(sorteios), tamanho_bloco):
+        bloco = sorteios[inicio:inicio + tamanho_bloco]
+        for fatia in range(0, len(jogos), jogos_por_fatia):
+            acertos = matriz_acertos(jogos[fatia:fatia + jogos_por_fatia], bloco)
+            for coluna, faixa in enumerate(FAIXAS_PREMIADAS):
+                atingiu = acertos == faixa
+                por_jogo[fatia:fatia + jogos_por_fatia, coluna] += atingiu.sum(axis=1)
+                por_sorteio[inicio:inicio + tamanho_bloco, coluna] += atingiu.sum(axis=0)
+    return por_jogo, por_sorteio
+
+
+def contar_faixas_premiadas(jogos, sorteios, processos=None):
+    """
+    Conta as faixas premiadas por jogo e por sorteio: devolve duas matrizes
+    (jogos x 5) e (sorteios x 5), com colunas na ordem de FAIXAS_PREMIADAS.
+    Com muitos jogos x sorteios o trabalho é dividido em blocos de sorteios entre processos.
+    """
+    jogos = np.asarray(jogos, dtype=np.uint32)
+    sorteios = np.asarray(sorteios, dtype=np.uint32)
+    if processos is None:
+        processos = (os.cpu_count() or 1) if len(jogos) * len(sorteios) >= MINIMO_CONFERENCIAS_PARALELO else 1
+    if processos <= 1 or len(sorteios) < 2:
+        return _contar_faixas(jogos, sorteios)
+    partes = [parte for parte in np.array_split(sorteios, min(processos, len(sorteios))) if len(parte)]
+    with ProcessPoolExecutor(max_workers=len(partes)) as executor:
+        resultados = list(executor.map(_contar_faixas, [jogos] * len(partes), partes))
+    por_jogo = sum(resultado[0] for resultado in resultados)
+    por_sorteio = np.concatenate([resultado[1] for resultado in resultados])
+    return por_jogo, por_sorteio
+
+
+@perfilado("simular_custo_beneficio")
+def simular_custo_beneficio(jogos, sorteios, custo_aposta=CUSTO_APOSTA, premios=PREMIOS_FIXOS, processos=None):
+    """
+    Simula apostar todos os jogos em todos os sorteios informados (máscaras uint32).
+    Só as faixas com valor em `premios` entram na receita; as demais são apenas contadas.
+    """
+    por_jogo, por_sorteio = contar_faixas_premiadas(jogos, sorteios, processos)
+    valores = np.array([premios.get(faixa, 0.0) for faixa in FAIXAS_PREMIADAS])
+    saldo_por_jogo = por_jogo @ valores - len(sorteios) * custo_aposta
+    saldo_por_concurso = por_sorteio @ valores - len(jogos) * custo_aposta
+    custo_total = len(jogos) * len(sorteios) * custo_aposta
+    return {
+        'premios': Counter({faixa: int(total) for faixa, total in zip(FAIXAS_PREMIADAS, por_jogo.sum(axis=0))}),
+        'custo_total': custo_total,
+        'receita_total': float(saldo_por_jogo.sum() + custo_total),
+        'saldo': float(saldo_por_jogo.sum()),
+        'saldo_por_jogo': saldo_por_jogo,
+        'saldo_por_concurso': saldo_por_concurso,
+    }
+
+
+# --- Valor Esperado Exato ---
+# Em vez de repetir os últimos concursos, confere o portfólio contra todos os C(25, 15) sorteios
+# possíveis (a coluna de máscaras do índice em disco), dividindo o espaço entre processos.
+TAMANHO_BLOCO_EXATO = 1 << 16
+# Memória dos temporários (sorteios do bloco x jogos) de cada processo: com portfólios grandes os
+# jogos são conferidos em fatias que cabem nisso. Por par: AND em uint32, acertos em uint8 e o
+# valor do prêmio em float64.
+MEMORIA_BLOCO_EXATO = 1 << 26
+_BYTES_POR_CONFERENCIA_EXATA = 13
+
+
+def _avaliar_intervalo(jogos, diretorio_indice, inicio, fim, valores, custo_portfolio):
+    # Agregados de um trecho do espaço de sorteios: contagem de acertos por (jogo, sorteio),
+    # distribuição do melhor acerto por sorteio, soma e soma dos quadrados do retorno e empates.
+    sorteios = carregar_indice(diretorio_indice, construir_se_ausente=False)['mascara']
+    contagem = np.zeros(DEZENAS_POR_JOGO + 1, dtype=np.int64)
+    melhor = np.zeros(DEZENAS_POR_JOGO + 1, dtype=np.int64)
+    soma = soma_quadrados = 0.0
+    sem_prejuizo = 0
+    jogos_por_fatia = max(MEMORIA_BLOCO_EXATO // (TAMANHO_BLOCO_EXATO * _BYTES_POR_CONFERENCIA_EXATA), 1)
+    for posicao in range(inicio, fim, TAMANHO_BLOCO_EXATO):
+        bloco = np.asarray(sorteios[posicao:min(posicao + TAMANHO_BLOCO_EXATO, fim)])
+        # Retorno e melhor acerto de cada sorteio somados fatia a fatia, antes de elevar ao quadrado.
+        retorno = np.zeros(len(bloco))
+        maximo = np.zeros(len(bloco), dtype=np.uint8)
+        for fatia in range(0, len(jogos), jogos_por_fatia):
+            acertos = contar_bits(bloco[:, None] & jogos[None, fatia:fatia + jogos_por_fatia])
+            contagem += np.bincount(acertos.ravel(), minlength=DEZENAS_POR_JOGO + 1)
+            np.maximum(maximo, acertos.max(axis=1), out=maximo)
+            retorno += valores[acertos].sum(axis=1)
+        melhor += np.bincount(maximo, minlength=DEZENAS_POR_JOGO + 1)
+        soma += retorno.sum()
+        soma_quadrados += (retorno * retorno).sum()
+        sem_prejuizo += int((retorno >= custo_portfolio).sum())
+    return contagem, melhor, soma, soma_quadrados, sem_prejuizo
+
+
+@perfilado("calcular_valor_esperado")
+def calcular_valor_esperado(jogos, premios=PREMIOS_FIXOS, custo_aposta=CUSTO_APOSTA, processos=None, diretorio_indice=DIRETORIO_INDICE):
+    """
+    Distribuição exata de acertos do portfólio sobre todos os sorteios possíveis, com retorno
+    esperado (pelas faixas presentes em `premios`), variância e probabilidade de não ter prejuízo.
+    """
+    jogos = np.asarray(jogos, dtype=np.uint32)
+    carregar_indice(diretorio_indice)
+    valores = np.zeros(DEZENAS_POR_JOGO + 1)
+    for faixa, valor in premios.items():
+        valores[faixa] = valor
+    custo_portfolio = len(jogos) * custo_aposta
+    processos = processos or os.cpu_count() or 1
+    limites = np.linspace(0, TOTAL_JOGOS, processos + 1).astype(np.int64)
+    argumentos = [(jogos, diretorio_indice, int(a), int(b), valores, custo_portfolio) for a, b in zip(limites[:-1], limites[1:])]
+    if processos <= 1:
+        partes = [_avaliar_intervalo(*argumento) for argumento in argumentos]
+    else:
+        with ProcessPoolExecutor(max_workers=processos) as executor:
+            partes = list(executor.map(_avaliar_intervalo, *zip(*argumentos)))
+    contagem = sum(parte[0] for parte in partes)
+    melhor = sum(parte[1] for parte in partes)
+    media = sum(parte[2] for parte in partes) / TOTAL_JOGOS
+    variancia = max(sum(parte[3] for parte in partes) / TOTAL_JOGOS - media * media, 0.0)
+    return {
+        'sorteios_possiveis': TOTAL_JOGOS,
+        # Probabilidade de um jogo do portfólio fazer exatamente k acertos (média entre os jogos).
+        'probabilidade_acertos': {faixa: contagem[faixa] / (TOTAL_JOGOS * max(len(jogos), 1)) for faixa in FAIXAS_PREMIADAS},
+        # Probabilidade de o melhor jogo do portfólio fazer exatamente k acertos num sorteio.
+        'probabilidade_melhor_acerto': {faixa: melhor[faixa] / TOTAL_JOGOS for faixa in FAIXAS_PREMIADAS},
+        'premios_esperados': {faixa: contagem[faixa] / TOTAL_JOGOS for faixa in FAIXAS_PREMIADAS},
+        'custo': custo_portfolio,
+        'retorno_esperado': media,
+        'saldo_esperado': media - custo_portfolio,
+        'desvio_padrao': variancia ** 0.5,
+        'variancia': variancia,
+        'probabilidade_sem_prejuizo': sum(parte[4] for parte in partes) / TOTAL_JOGOS,
+    }
@@ -2,105 +2,109 @@ import streamlit as st
 import pandas as pd
 import itertools
 from collections import Counter
-import requests
-import random
+import os
 import plotly.graph_objects as go
 import json
-from sklearn.ensemble import RandomForestClassifier
+import threading
+from math import comb
+import numpy as np
+import nucleo
+from nucleo import ler_dezenas, ler_estrategia, gerar_jogos, concursos_alinhados
+from historico import ARQUIVO_EXCEL, ARQUIVO_CACHE, COLUNAS_BOLAS
+from busca_resultados import iniciar_atualizacao_em_segundo_plano
+from cache_analises import cache_por_conteudo, estatisticas_cache
+from motor_jogos import mascaras_para_matriz, mascaras_de_sorteios, jogo_para_mascara, mascara_para_jogo
+from indice_jogos import carregar_indice
+from fechamento import construir_fechamento
+from exportacao import FORMATOS_EXPORTACAO, MAXIMO_JOGOS_DOWNLOAD, exportar_jogos, tamanho_exportacao
+from estatisticas import sincronizar_estatisticas, frequencia_e_atraso, frequencia_na_janela, frequencia_intervalo, frequencia_movel
+from coocorrencia import combinacoes_frequentes
+from simulacao import PREMIOS_FIXOS, FAIXAS_PREMIADAS, matriz_acertos, simular_custo_beneficio, calcular_valor_esperado
+from conferidor import ler_jogos, conferir_historico, premios_por_faixa
+from perfil import criar_perfil, usar_perfil, ativar_perfil, desativar_perfil, perfil_ativo, relatorio_perfil, limpar_perfil
+from gerador_ultra import gerar_jogos_ultra
+from modelo_ia import chave_modelo, carregar_ou_treinar_modelo, pontuar_jogos_ia
+from backtest import gerar_faixas, grade_alinhamento
 
 # --- Configuração da Página e Constantes ---
 st.set_page_config(page_title="Analisador Lotofácil Ultra", page_icon="💎", layout="wide")
-MOLDURA_DEZENAS = {1, 2, 3, 4, 5, 6, 10, 11, 15, 16, 20, 21, 22, 23, 24, 25}
-PRIMOS = {2, 3, 5, 7, 11, 13, 17, 19, 23}
-CUSTO_APOSTA = 3.0
-PREMIOS_FIXOS = {11: 6.0, 12: 12.0, 13: 30.0}
+LIMITE_RANKING_IA = 1000
+LIMITE_TABELA_CONFERENCIA = 1000
 HEATMAP_COLORS_GREEN = ['#F7F7F7', '#D9F0D9', '#B8E5B8', '#98DB98', '#77D177', '#56C756', '#34BE34', '#11B411', '#00AA00', '#008B00']
 HEATMAP_COLORS_RED = ['#F7F7F7', '#FADBD8', '#F5B7B1', '#F0928A', '#EB6E62', '#E6473B', '#E02113', '#C7000E', '#B3000C', '#A2000A']
 
+# O perfil é ligado antes de qualquer etapa rodar, para medir também o carregamento dos dados.
+# Cada sessão mede no seu próprio perfil: ligar ou desligar aqui não afeta as outras sessões.
+if 'registro_perfil' not in st.session_state: st.session_state.registro_perfil = criar_perfil()
+usar_perfil(st.session_state.registro_perfil)
+if st.session_state.get('perfil_ativo'):
+    ativar_perfil(memoria=st.session_state.get('perfil_memoria', False))
+elif perfil_ativo():
+    desativar_perfil()
+
 # --- FUNÇÕES DE PROCESSAMENTO DE DADOS E ANÁLISE ---
-@st.cache_data(ttl=3600)
+@st.cache_resource(ttl=3600)
+def iniciar_busca_de_resultados():
+    # Uma busca por processo (renovada a cada hora), rodando fora da renderização da página.
+    return iniciar_atualizacao_em_segundo_plano()
+
+@st.cache_data(max_entries=1)
+def carregar_dados_locais(assinatura_arquivos):
+    # `assinatura_arquivos` muda sempre que a planilha ou o cache são regravados; só a versão
+    # atual fica no cache, as anteriores não servem mais para nada.
+    return nucleo.carregar_dados()
+
+def assinatura(caminho):
+    return os.stat(caminho).st_mtime_ns if os.path.exists(caminho) else None
+
 def carregar_dados_locais_e_api():
-    df_completo = None
-    try:
-        df_hist = pd.read_excel("Lotofácil.xlsx")
-        df_hist = df_hist.iloc[:, :17]
-        df_hist.columns = ['Concurso', 'Data Sorteio', 'Bola1', 'Bola2', 'Bola3', 'Bola4', 'Bola5', 'Bola6', 'Bola7', 'Bola8', 'Bola9', 'Bola10', 'Bola11', 'Bola12', 'Bola13', 'Bola14', 'Bola15']
-        df_completo = df_hist
-    except FileNotFoundError:
+    busca = iniciar_busca_de_resultados()
+    df_completo = carregar_dados_locais((assinatura(ARQUIVO_EXCEL), assinatura(ARQUIVO_CACHE)))
+    if df_completo is None:
         st.error("ERRO CRÍTICO: O arquivo 'Lotofácil.xlsx' não foi encontrado na mesma pasta do programa.")
         return None
-    try:
-        url = "https://servicebus2.caixa.gov.br/portaldeloterias/api/lotofacil"
-        response = requests.get(url, headers={'User-Agent': 'Mozilla/5.0'}, verify=False)
-        response.raise_for_status()
-        data = response.json()
-        ultimo_resultado = {'Concurso': data.get('numero'), 'Data Sorteio': data.get('dataApuracao'), **{f'Bola{i+1}': int(dezena) for i, dezena in enumerate(data.get('listaDezenas', []))}}
-        df_ultimo = pd.DataFrame([ultimo_resultado])
-        if not df_completo['Concurso'].isin([df_ultimo['Concurso'][0]]).any():
-            df_completo = pd.concat([df_completo, df_ultimo], ignore_index=True)
-    except Exception:
-        st.warning(f"Aviso: Não foi possível buscar o último resultado da API. Usando apenas os dados do seu arquivo Excel.")
-    for col in df_completo.columns:
-        if 'Bola' in col or 'Concurso' in col:
-            df_completo[col] = pd.to_numeric(df_completo[col], errors='coerce')
-    return df_completo.sort_values(by='Concurso').reset_index(drop=True)
+    if busca['thread'].is_alive():
+        st.caption("🔄 Buscando novos concursos na API em segundo plano...")
+    elif busca['erro'] is not None:
+        st.warning("Aviso: Não foi possível buscar os últimos resultados da API. Usando apenas os dados locais.")
+    elif busca['falhas']:
+        st.warning(f"Aviso: {len(busca['falhas'])} concurso(s) não puderam ser baixados da API (a partir do {min(busca['falhas'])}). "
+                   "Os concursos seguintes serão buscados na próxima atualização.")
+    return df_completo
+
+@st.cache_resource
+def carregar_indice_jogos():
+    return carregar_indice()
 
-@st.cache_data
-def extrair_numeros(_df):
-    bola_cols = [col for col in _df.columns if col.startswith('Bola')]
-    return _df[bola_cols].dropna().astype(int).values.tolist()
+extrair_numeros = cache_por_conteudo(nucleo.extrair_numeros)
 
-@st.cache_data
-def analisar_frequencia_e_atraso(_todos_os_sorteios):
-    frequencia = Counter(itertools.chain(*_todos_os_sorteios))
-    atraso = {}
-    total_concursos = len(_todos_os_sorteios)
-    for dezena in range(1, 26):
-        try:
-            ultimo_sorteio_idx_geral = max(i for i, sorteio in enumerate(_todos_os_sorteios) if dezena in sorteio)
-            atraso[dezena] = total_concursos - 1 - ultimo_sorteio_idx_geral
-        except ValueError:
-            atraso[dezena] = total_concursos
-    return frequencia, atraso
+@st.cache_resource
+def estado_estatisticas_compartilhado():
+    # Estado único do processo, compartilhado entre sessões e atualizado de forma incremental.
+    return {'trava': threading.Lock(), 'estado': None}
+
+def consultar_estatisticas(todos_os_sorteios, consulta):
+    compartilhado = estado_estatisticas_compartilhado()
+    with compartilhado['trava']:
+        compartilhado['estado'] = sincronizar_estatisticas(compartilhado['estado'], todos_os_sorteios)
+        return consulta(compartilhado['estado'])
+
+def analisar_frequencia_e_atraso(todos_os_sorteios):
+    return consultar_estatisticas(todos_os_sorteios, frequencia_e_atraso)
 
-@st.cache_data
-def encontrar_combinacoes_frequentes(_numeros_sorteados, tamanho, top_n=15):
-    todas_as_combinacoes = itertools.chain.from_iterable(itertools.combinations(sorteio, tamanho) for sorteio in _numeros_sorteados)
-    return Counter(todas_as_combinacoes).most_common(top_n)
+@cache_por_conteudo
+def encontrar_combinacoes_frequentes(numeros_sorteados, tamanho, top_n=15):
+    return combinacoes_frequentes(mascaras_de_sorteios(numeros_sorteados), tamanho, top_n)
 
-@st.cache_data
-def sugerir_universo_estrategico(_df, _todos_os_sorteios, num_sorteios=1000, tamanho_universo=19):
-    df_recente = _df.tail(num_sorteios)
-    numeros_recentes = extrair_numeros(df_recente)
-    frequencia_recente = Counter(itertools.chain(*numeros_recentes))
-    _, atraso_geral = analisar_frequencia_e_atraso(_todos_os_sorteios)
-    scores = {}
-    max_freq = max(frequencia_recente.values()) if frequencia_recente else 1
-    max_atraso = max(atraso_geral.values()) if atraso_geral else 1
-    for dezena in range(1, 26):
-        score_freq = frequencia_recente.get(dezena, 0) / max_freq
-        score_atraso = atraso_geral.get(dezena, 0) / max_atraso
-        scores[dezena] = (0.6 * score_freq) + (0.4 * score_atraso)
-    dezenas_ordenadas = sorted(scores.items(), key=lambda item: item[1], reverse=True)
-    universo_sugerido = [dezena for dezena, score in dezenas_ordenadas[:tamanho_universo]]
-    return sorted(universo_sugerido)
+def sugerir_universo_estrategico(todos_os_sorteios, num_sorteios=1000, tamanho_universo=19):
+    return consultar_estatisticas(todos_os_sorteios, lambda estado: nucleo.sugerir_universo_estrategico(estado, num_sorteios, tamanho_universo))
 
-@st.cache_data
-def executar_backtest_filtros(_df, n_concursos, min_rep, max_rep, min_imp, max_imp, min_mold, max_mold):
-    sorteios_teste = _df.tail(n_concursos).copy()
-    sorteios_alinhados = []
-    if len(sorteios_teste) < 2: return []
-    for index in range(1, len(sorteios_teste)):
-        concurso_atual_row = sorteios_teste.iloc[index]
-        concurso_anterior_row = sorteios_teste.iloc[index - 1]
-        dezenas_atuais = set(concurso_atual_row[[f'Bola{i}' for i in range(1,16)]])
-        dezenas_anteriores = set(concurso_anterior_row[[f'Bola{i}' for i in range(1,16)]])
-        qtd_repetidas = len(dezenas_atuais.intersection(dezenas_anteriores))
-        qtd_impares = len([n for n in dezenas_atuais if n % 2 != 0])
-        qtd_moldura = len(dezenas_atuais.intersection(MOLDURA_DEZENAS))
-        if (min_rep <= qtd_repetidas <= max_rep) and (min_imp <= qtd_impares <= max_imp) and (min_mold <= qtd_moldura <= max_mold):
-            sorteios_alinhados.append(int(concurso_atual_row['Concurso']))
-    return sorteios_alinhados
+metricas_backtest = cache_por_conteudo(nucleo.metricas_backtest)
+
+def executar_backtest_filtros(df, n_concursos, min_rep, max_rep, min_imp, max_imp, min_mold, max_mold):
+    # Mesmo backtest do núcleo, mas com as métricas vindas do cache de análises.
+    if len(df.tail(n_concursos)) < 2: return []
+    return concursos_alinhados(*metricas_backtest(df, n_concursos), (min_rep, max_rep), (min_imp, max_imp), (min_mold, max_mold))
 
 def gerar_mapa_de_calor_plotly(dados, titulo, colorscale):
     st.subheader(titulo)
@@ -111,32 +115,10 @@ def gerar_mapa_de_calor_plotly(dados, titulo, colorscale):
     fig.update_layout(height=450, margin=dict(t=20, l=10, r=10, b=10), yaxis=dict(showgrid=False, zeroline=False, showticklabels=False, autorange='reversed'), xaxis=dict(showgrid=False, zeroline=False, showticklabels=False), plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)')
     st.plotly_chart(fig, use_container_width=True)
 
-def extrair_features(jogo):
-    jogo_set = set(jogo)
-    features = {'soma_dezenas': sum(jogo_set), 'qtd_impares': len([n for n in jogo_set if n % 2 != 0]), 'qtd_primos': len(jogo_set.intersection(PRIMOS)), 'qtd_moldura': len(jogo_set.intersection(MOLDURA_DEZENAS))}
-    features['qtd_pares'] = 15 - features['qtd_impares']
-    for i in range(1, 26):
-        features[f'dezena_{i}'] = 1 if i in jogo_set else 0
-    return features
-
-@st.cache_resource
-def treinar_modelo_ia(_todos_os_sorteios):
-    positivos = _todos_os_sorteios
-    negativos = []
-    while len(negativos) < len(positivos):
-        jogo_aleatorio = tuple(sorted(random.sample(range(1, 26), 15)))
-        if jogo_aleatorio not in positivos and jogo_aleatorio not in negativos:
-            negativos.append(jogo_aleatorio)
-    df_positivos = pd.DataFrame([extrair_features(j) for j in positivos])
-    df_positivos['label'] = 1
-    df_negativos = pd.DataFrame([extrair_features(j) for j in negativos])
-    df_negativos['label'] = 0
-    df_treino = pd.concat([df_positivos, df_negativos], ignore_index=True)
-    X = df_treino.drop('label', axis=1)
-    y = df_treino['label']
-    modelo = RandomForestClassifier(n_estimators=100, random_state=42, n_jobs=-1)
-    modelo.fit(X, y)
-    return modelo
+@st.cache_resource(max_entries=1)
+def carregar_modelo_ia(chave, _mascaras_sorteios):
+    # `chave` identifica o histórico; o modelo vem do disco se já foi treinado para ele.
+    return carregar_ou_treinar_modelo(_mascaras_sorteios)
 
 # --- INÍCIO DA APLICAÇÃO ---
 st.title("🚀 Analisador Lotofácil Ultra")
@@ -146,12 +128,14 @@ if 'sugeridas' not in st.session_state: st.session_state.sugeridas = ""
 if 'sorteios_alinhados' not in st.session_state: st.session_state.sorteios_alinhados = []
 if 'backtest_rodado' not in st.session_state: st.session_state.backtest_rodado = False
 if 'codigo_estrategia' not in st.session_state: st.session_state.codigo_estrategia = ""
-if 'jogos_filtrados' not in st.session_state: st.session_state.jogos_filtrados = []
+if 'jogos_filtrados' not in st.session_state: st.session_state.jogos_filtrados = np.zeros(0, dtype=np.uint32)
+if 'universo_jogos_filtrados' not in st.session_state: st.session_state.universo_jogos_filtrados = []
 
 df_resultados = carregar_dados_locais_e_api()
 
 if df_resultados is not None and not df_resultados.empty:
     todos_os_sorteios = extrair_numeros(df_resultados)
+    concursos_validos = df_resultados.dropna(subset=[f'Bola{i}' for i in range(1, 16)])['Concurso'].astype(int).tolist()
     ultimo_concurso_num = int(df_resultados.iloc[-1]['Concurso'])
     
     st.success(f"**Dados carregados com sucesso!** Último concurso na base: **{ultimo_concurso_num}**.")
@@ -159,9 +143,10 @@ if df_resultados is not None and not df_resultados.empty:
     with st.sidebar:
         st.header("Defina sua Estratégia")
         st.subheader("✨ Sugestão Inteligente")
-        if st.button("Sugerir Universo (Análise de 1000 Sorteios)"):
-            with st.spinner("Analisando 1000 sorteios..."):
-                universo = sugerir_universo_estrategico(df_resultados, todos_os_sorteios)
+        n_sorteios_sugestao = st.slider("Sorteios analisados na sugestão:", 50, len(todos_os_sorteios), min(1000, len(todos_os_sorteios)), step=50, key='n_sorteios_sugestao')
+        if st.button(f"Sugerir Universo (Análise de {n_sorteios_sugestao} Sorteios)"):
+            with st.spinner(f"Analisando {n_sorteios_sugestao} sorteios..."):
+                universo = sugerir_universo_estrategico(todos_os_sorteios, n_sorteios_sugestao)
                 st.session_state.sugeridas = ", ".join(map(str, universo))
                 st.session_state.dezenas_gerador = st.session_state.sugeridas
         
@@ -169,25 +154,53 @@ if df_resultados is not None and not df_resultados.empty:
         st.subheader("Filtros do Gerador")
         min_rep_gerador, max_rep_gerador = st.slider("Repetidas:", 0, 15, (8, 10), key='slider_rep_gerador')
         min_imp_gerador, max_imp_gerador = st.slider("Ímpares:", 0, 15, (7, 9), key='slider_imp_gerador')
+        with st.expander("⚙️ Filtros Avançados"):
+            min_mold_gerador, max_mold_gerador = st.slider("Moldura:", 0, 16, (0, 16), key='slider_mold_gerador')
+            min_primos_gerador, max_primos_gerador = st.slider("Primos:", 0, 9, (0, 9), key='slider_primos_gerador')
+            min_soma_gerador, max_soma_gerador = st.slider("Soma das dezenas:", 120, 270, (120, 270), key='slider_soma_gerador')
+            max_sequencia_gerador = st.slider("Máximo de dezenas consecutivas:", 1, 15, 15, key='slider_sequencia_gerador')
+            fixas_gerador = st.text_input("Dezenas fixas (sempre presentes):", key='fixas_gerador')
+            excluidas_gerador = st.text_input("Dezenas excluídas:", key='excluidas_gerador')
+        limite_gerador = st.number_input("Parar após X jogos aceitos (0 = todos):", min_value=0, value=0, step=100, key='limite_gerador')
         
         with st.expander("💾 Salvar / Carregar Estratégia"):
             if st.button("Gerar Código para Salvar"):
-                estrategia_atual = {"universo_dezenas": st.session_state.dezenas_gerador,"filtro_repetidas": st.session_state.slider_rep_gerador,"filtro_impares": st.session_state.slider_imp_gerador}
+                estrategia_atual = {"universo_dezenas": st.session_state.dezenas_gerador,"filtro_repetidas": st.session_state.slider_rep_gerador,"filtro_impares": st.session_state.slider_imp_gerador,
+                                    "filtro_moldura": st.session_state.slider_mold_gerador,"filtro_primos": st.session_state.slider_primos_gerador,"filtro_soma": st.session_state.slider_soma_gerador,
+                                    "max_sequencia": st.session_state.slider_sequencia_gerador,"dezenas_fixas": st.session_state.fixas_gerador,"dezenas_excluidas": st.session_state.excluidas_gerador}
                 st.session_state.codigo_estrategia = json.dumps(estrategia_atual, indent=2)
             if st.session_state.codigo_estrategia:
                 st.code(st.session_state.codigo_estrategia, language='json')
             codigo_para_carregar = st.text_area("Cole o código da estratégia aqui para carregar:")
             if st.button("Carregar Estratégia"):
                 try:
-                    dados_carregados = json.loads(codigo_para_carregar)
-                    st.session_state.dezenas_gerador = dados_carregados.get("universo_dezenas", "")
-                    st.session_state.slider_rep_gerador = tuple(dados_carregados.get("filtro_repetidas", (8, 10)))
-                    st.session_state.slider_imp_gerador = tuple(dados_carregados.get("filtro_impares", (7, 9)))
+                    dados_carregados = ler_estrategia(codigo_para_carregar)
+                    st.session_state.dezenas_gerador = dados_carregados["universo_dezenas"]
+                    st.session_state.slider_rep_gerador = dados_carregados["filtro_repetidas"]
+                    st.session_state.slider_imp_gerador = dados_carregados["filtro_impares"]
+                    st.session_state.slider_mold_gerador = dados_carregados["filtro_moldura"]
+                    st.session_state.slider_primos_gerador = dados_carregados["filtro_primos"]
+                    st.session_state.slider_soma_gerador = dados_carregados["filtro_soma"]
+                    st.session_state.slider_sequencia_gerador = dados_carregados["max_sequencia"]
+                    st.session_state.fixas_gerador = dados_carregados["dezenas_fixas"]
+                    st.session_state.excluidas_gerador = dados_carregados["dezenas_excluidas"]
                     st.success("Estratégia carregada!")
                     st.experimental_rerun()
                 except Exception:
                     st.error(f"Erro ao carregar o código.")
 
+        with st.expander("🧠 Cache de Análises"):
+            cache = estatisticas_cache()
+            st.caption(f"{cache['entradas']} resultados em cache · {cache['bytes'] / 2**20:.1f} de {cache['orcamento'] / 2**20:.0f} MB")
+            st.caption(f"Acertos: {cache['acertos']} · Falhas: {cache['falhas']} · Descartes: {cache['descartes']}")
+
+        with st.expander("⏱️ Perfil de Desempenho (depuração)"):
+            st.checkbox("Medir o tempo de cada etapa", key='perfil_ativo')
+            st.checkbox("Medir também o pico de memória (deixa as etapas mais lentas)", key='perfil_memoria')
+            st.button("Zerar medições", on_click=limpar_perfil, args=(st.session_state.registro_perfil,), key='zerar_perfil')
+            # Preenchido no fim da página, depois que as etapas desta execução já rodaram.
+            painel_perfil = st.container()
+
     tabs = ["🎯 Gerador", "📊 Análise", "🤖 Filtro I.A.", "✅ Conferidor", "🔬 Backtesting", "💰 Simulação", "🗺️ Mapa de Calor"]
     tab_gerador, tab_analise, tab_ia, tab_conferidor, tab_backtest, tab_simulacao, tab_mapa_calor = st.tabs(tabs)
 
@@ -203,25 +216,75 @@ if df_resultados is not None and not df_resultados.empty:
                     if len(dezenas_escolhidas) < 15:
                          st.error("Erro: Você precisa escolher pelo menos 15 dezenas.")
                     else:
-                        combinacoes = list(itertools.combinations(dezenas_escolhidas, 15))
-                        jogos_filtrados = []
-                        with st.spinner(f"Filtrando {len(combinacoes)} combinações..."):
-                            for jogo_tupla in combinacoes:
-                                jogo_set = set(jogo_tupla)
-                                if not (min_rep_gerador <= len(jogo_set.intersection(ultimo_concurso_numeros)) <= max_rep_gerador): continue
-                                if not (min_imp_gerador <= len([n for n in jogo_set if n % 2 != 0]) <= max_imp_gerador): continue
-                                jogos_filtrados.append(sorted(list(jogo_set)))
-                        st.session_state.jogos_filtrados = jogos_filtrados
-                        st.success(f"De **{len(combinacoes)}** jogos possíveis, **{len(jogos_filtrados)}** foram selecionados após os filtros.")
-                        if jogos_filtrados:
-                            st.write("---")
+                        total_combinacoes = comb(len(dezenas_escolhidas), 15)
+                        restricoes_gerador = {'repetidas': (min_rep_gerador, max_rep_gerador), 'impares': (min_imp_gerador, max_imp_gerador),
+                                              'moldura': (min_mold_gerador, max_mold_gerador), 'primos': (min_primos_gerador, max_primos_gerador),
+                                              'soma': (min_soma_gerador, max_soma_gerador), 'max_sequencia': max_sequencia_gerador,
+                                              'fixas': ler_dezenas(fixas_gerador), 'excluidas': ler_dezenas(excluidas_gerador)}
+                        with st.spinner(f"Filtrando {total_combinacoes} combinações..."):
+                            # Com limite, a busca com cortes para assim que encontra os primeiros jogos.
+                            indice = None if limite_gerador else carregar_indice_jogos()
+                            mascaras_filtradas = gerar_jogos(dezenas_escolhidas, restricoes_gerador, ultimo_concurso_numeros, limite_gerador, indice)
+                        # Só as máscaras ficam na sessão (4 bytes por jogo); as dezenas são montadas por página.
+                        st.session_state.jogos_filtrados = np.ascontiguousarray(mascaras_filtradas, dtype=np.uint32)
+                        # O universo fica junto dos jogos: o fechamento usa este, não o que estiver no campo de texto agora.
+                        st.session_state.universo_jogos_filtrados = dezenas_escolhidas
+                        st.session_state.pagina_jogos = 1
+                        st.success(f"De **{total_combinacoes}** jogos possíveis, **{len(mascaras_filtradas)}** foram selecionados após os filtros.")
+                        if len(mascaras_filtradas):
                             st.info(f"Os jogos gerados estão prontos para serem analisados na aba '🤖 Filtro I.A.'.")
-                            if len(jogos_filtrados) > 50:
-                                 st.write(f"Mostrando os primeiros 50 jogos de {len(jogos_filtrados)} gerados:")
-                            c1,c2,c3 = st.columns(3)
-                            for i, jogo in enumerate(jogos_filtrados[:50]):
-                                jogo_str = ", ".join(f"{num:02d}" for num in jogo)
-                                [c1,c2,c3][i % 3].text(f"Jogo {i+1:03d}: [ {jogo_str} ]")
+                jogos_gerados = st.session_state.jogos_filtrados
+                if len(jogos_gerados):
+                    st.write("---")
+                    c1, c2, c3, c4 = st.columns(4)
+                    tamanho_pagina = c1.selectbox("Jogos por página:", (50, 100, 500, 1000), key='tamanho_pagina_jogos')
+                    total_paginas = -(-len(jogos_gerados) // tamanho_pagina)
+                    if st.session_state.get('pagina_jogos', 1) > total_paginas:
+                        st.session_state.pagina_jogos = total_paginas
+                    pagina = c2.number_input("Página:", min_value=1, max_value=total_paginas, step=1, key='pagina_jogos')
+                    inicio_pagina = (pagina - 1) * tamanho_pagina
+                    pagina_jogos = jogos_gerados[inicio_pagina:inicio_pagina + tamanho_pagina]
+                    formato_exportacao = c3.selectbox("Formato do arquivo:", tuple(FORMATOS_EXPORTACAO), key='formato_exportacao')
+                    # O arquivo só é montado quando o botão é clicado, mas inteiro na memória do servidor
+                    # (é assim que o Streamlit serve downloads); por isso há um limite de jogos por arquivo.
+                    jogos_download = jogos_gerados[:MAXIMO_JOGOS_DOWNLOAD]
+                    rotulo_download = f"Baixar {len(jogos_gerados)} jogos 📥" if len(jogos_download) == len(jogos_gerados) else f"Baixar os primeiros {len(jogos_download)} jogos 📥"
+                    c4.download_button(rotulo_download,
+                                       lambda: b"".join(exportar_jogos(jogos_download, formato_exportacao)),
+                                       file_name=f"jogos_lotofacil.{formato_exportacao}",
+                                       mime=FORMATOS_EXPORTACAO[formato_exportacao]['mime'], key='baixar_jogos')
+                    if len(jogos_download) < len(jogos_gerados):
+                        st.info(f"O download pelo navegador vai até {MAXIMO_JOGOS_DOWNLOAD} jogos "
+                                f"({tamanho_exportacao(MAXIMO_JOGOS_DOWNLOAD, formato_exportacao) / 2**20:.0f} MB), montados na memória do servidor. "
+                                "Para exportar todos, salve a estratégia e rode `python lote_estrategias.py estrategia.json`, que grava o arquivo em disco aos pedaços.")
+                    st.dataframe(pd.DataFrame(mascaras_para_matriz(pagina_jogos), columns=COLUNAS_BOLAS,
+                                              index=pd.RangeIndex(inicio_pagina + 1, inicio_pagina + len(pagina_jogos) + 1, name='Jogo')),
+                                 use_container_width=True)
+                    st.caption(f"Jogos {inicio_pagina + 1} a {inicio_pagina + len(pagina_jogos)} de {len(jogos_gerados)} (página {pagina} de {total_paginas}).")
+                    with st.expander("🎡 Fechamento: menor conjunto de jogos com garantia"):
+                        st.write("Escolhe, dentre os jogos gerados, o menor grupo que garante um mínimo de acertos caso as dezenas sorteadas caiam no seu universo.")
+                        c1, c2 = st.columns(2)
+                        garantia_fechamento = c1.slider("Garantir pelo menos (acertos):", 11, 15, 11, key='garantia_fechamento')
+                        condicao_fechamento = c2.slider("Se X dezenas sorteadas estiverem no universo:", garantia_fechamento, 15, 15, key='condicao_fechamento')
+                        if st.button("Montar Fechamento 🎡", key='montar_fechamento'):
+                            try:
+                                with st.spinner("Calculando a cobertura dos jogos gerados..."):
+                                    fechamento = construir_fechamento(jogos_gerados, st.session_state.universo_jogos_filtrados,
+                                                                      garantia_fechamento, condicao_fechamento)
+                                c1, c2, c3 = st.columns(3)
+                                c1.metric("Jogos no fechamento", len(fechamento['jogos']), delta=f"de {len(jogos_gerados)} gerados", delta_color="off")
+                                c2.metric("Custo", f"R$ {fechamento['custo']:,.2f}")
+                                c3.metric("Cobertura da garantia", f"{fechamento['cobertura'] * 100:.1f} %")
+                                if fechamento['garantia_completa']:
+                                    st.success(f"Garantia completa: **{garantia_fechamento}** acertos sempre que **{condicao_fechamento}** dezenas sorteadas estiverem no universo.")
+                                else:
+                                    st.warning(f"Os jogos gerados cobrem {fechamento['alvos_cobertos']} de {fechamento['alvos']} casos. Afrouxe os filtros do gerador para chegar a 100%.")
+                                c1, c2, c3 = st.columns(3)
+                                for i, jogo in enumerate(mascaras_para_matriz(fechamento['jogos']).tolist()):
+                                    jogo_str = ", ".join(f"{num:02d}" for num in jogo)
+                                    [c1,c2,c3][i % 3].text(f"Jogo {i+1:03d}: [ {jogo_str} ]")
+                            except ValueError as erro:
+                                st.error(str(erro))
         except Exception:
             st.error(f"Ocorreu um erro ao gerar os jogos. Verifique as dezenas inseridas.")
 
@@ -242,68 +305,108 @@ if df_resultados is not None and not df_resultados.empty:
             st.dataframe(df_atraso, use_container_width=True)
             st.subheader("💎 Trios de Diamante (Top 15)")
             st.dataframe(pd.DataFrame(encontrar_combinacoes_frequentes(todos_os_sorteios, 3), columns=['Trio', 'Vezes']), use_container_width=True)
+        with st.expander("🔎 Quadras e Quinas mais frequentes"):
+            tamanho_combinacao = st.selectbox("Tamanho da combinação:", (4, 5), key='tamanho_combinacao')
+            st.dataframe(pd.DataFrame(encontrar_combinacoes_frequentes(todos_os_sorteios, tamanho_combinacao), columns=['Combinação', 'Vezes']), use_container_width=True)
         
     with tab_ia:
         st.header("🤖 Filtro com Inteligência Artificial")
         st.info("Use o 'Crítico de Arte' para avaliar os jogos gerados. Ele dá uma nota de 0 a 100% indicando o quão 'harmônico' e parecido com um jogo vencedor o seu jogo é.")
-        if not st.session_state.get('jogos_filtrados'):
+        if not len(st.session_state.jogos_filtrados):
             st.warning("Você precisa primeiro gerar jogos na aba '🎯 Gerador' para poder analisá-los aqui.")
         else:
             if st.button(f"Analisar {len(st.session_state.jogos_filtrados)} jogos com I.A.", type="primary"):
                 with st.spinner("Treinando o modelo de I.A. e avaliando seus jogos... (Isso pode demorar um pouco na primeira vez)"):
-                    modelo = treinar_modelo_ia(todos_os_sorteios)
-                    df_jogos_para_analise = pd.DataFrame([extrair_features(j) for j in st.session_state.jogos_filtrados])
-                    X_cols = modelo.feature_names_in_
-                    df_jogos_para_analise = df_jogos_para_analise[X_cols]
-                    probabilidades = modelo.predict_proba(df_jogos_para_analise)[:, 1]
-                    resultados_ia = []
-                    for i, jogo in enumerate(st.session_state.jogos_filtrados):
-                        score = probabilidades[i] * 100
-                        resultados_ia.append({"Pontuação I.A.": f"{score:.2f}%", "Jogo": ", ".join(map(str, sorted(jogo)))})
-                    df_resultados_ia = pd.DataFrame(resultados_ia)
-                    df_resultados_ia = df_resultados_ia.sort_values(by="Pontuação I.A.", ascending=False)
+                    mascaras_sorteios = mascaras_de_sorteios(todos_os_sorteios)
+                    modelo = carregar_modelo_ia(chave_modelo(mascaras_sorteios), mascaras_sorteios)
+                    mascaras_jogos = st.session_state.jogos_filtrados
+                    probabilidades = pontuar_jogos_ia(modelo, mascaras_jogos)
+                    ordem = np.argsort(-probabilidades, kind='stable')[:LIMITE_RANKING_IA]
+                    df_resultados_ia = pd.DataFrame({"Pontuação I.A.": [f"{probabilidades[i] * 100:.2f}%" for i in ordem],
+                                                     "Jogo": [", ".join(map(str, jogo)) for jogo in mascaras_para_matriz(mascaras_jogos[ordem]).tolist()]})
+                    if len(probabilidades) > LIMITE_RANKING_IA:
+                        st.write(f"Mostrando os {LIMITE_RANKING_IA} melhores de {len(probabilidades)} jogos avaliados:")
                     st.subheader("Ranking de Jogos por Qualidade (segundo a I.A.)")
                     st.dataframe(df_resultados_ia, use_container_width=True)
 
     with tab_conferidor:
         st.header("✅ Conferidor de Jogos")
-        st.write("Cole seus jogos e o resultado do sorteio para ver seus acertos.")
+        st.write("Cole seus jogos ou envie um arquivo (um jogo por linha) e confira contra um resultado ou contra todo o histórico.")
         c1, c2 = st.columns(2)
         with c1:
             jogos_para_conferir = st.text_area("Cole seus jogos aqui (um por linha)", height=250, placeholder="Ex: 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15")
+            arquivo_jogos = st.file_uploader("...ou envie um arquivo .txt/.csv (tem prioridade sobre o texto):", type=['txt', 'csv'], key='arquivo_conferidor')
         with c2:
-            resultado_str = st.text_input("Digite o resultado do sorteio (15 dezenas separadas por vírgula)")
+            modo_conferencia = st.radio("Conferir contra:", ("Resultado digitado", "Concurso do histórico", "Todo o histórico"), key='modo_conferencia')
+            if modo_conferencia == "Resultado digitado":
+                resultado_str = st.text_input("Digite o resultado do sorteio (15 dezenas separadas por vírgula)")
+            elif modo_conferencia == "Concurso do histórico":
+                concurso_conferido = st.selectbox("Concurso:", concursos_validos[::-1], key='concurso_conferido')
         if st.button("Conferir Meus Jogos", type="primary"):
             try:
-                resultado_set = set([int(num.strip()) for num in resultado_str.split(',') if num.strip().isdigit()])
-                if len(resultado_set) != 15:
+                if arquivo_jogos is not None:
+                    arquivo_jogos.seek(0)
+                with st.spinner("Lendo os jogos..."):
+                    mascaras_conferidas, linhas_descartadas = ler_jogos(arquivo_jogos if arquivo_jogos is not None else jogos_para_conferir)
+                if linhas_descartadas:
+                    st.warning(f"{linhas_descartadas} linha(s) ignorada(s): cada jogo precisa de 15 a 20 dezenas distintas entre 1 e 25.")
+                if modo_conferencia == "Resultado digitado":
+                    resultado_set = set([int(num.strip()) for num in resultado_str.split(',') if num.strip().isdigit()])
+                    sorteio_conferido = [sorted(resultado_set)] if len(resultado_set) == 15 else None
+                elif modo_conferencia == "Concurso do histórico":
+                    sorteio_conferido = [todos_os_sorteios[concursos_validos.index(concurso_conferido)]]
+                if modo_conferencia != "Todo o histórico" and sorteio_conferido is None:
                     st.error("Erro: O resultado do sorteio deve conter exatamente 15 números válidos.")
-                else:
-                    linhas = jogos_para_conferir.strip().split('\n')
-                    jogos = [set([int(num.strip()) for num in linha.replace('[', '').replace(']', '').split(',') if num.strip().isdigit()]) for linha in linhas if linha]
-                    if not jogos:
-                        st.warning("Nenhum jogo para conferir. Por favor, cole seus jogos na área de texto.")
+                elif not len(mascaras_conferidas):
+                    st.warning("Nenhum jogo para conferir. Por favor, cole seus jogos na área de texto.")
+                elif modo_conferencia != "Todo o histórico":
+                    st.subheader("Resultado da Conferência")
+                    acertos = matriz_acertos(mascaras_conferidas, mascaras_de_sorteios(sorteio_conferido))[:, 0]
+                    ordem = np.argsort(-acertos.astype(np.int16), kind='stable')[:LIMITE_TABELA_CONFERENCIA]
+                    if len(acertos) > LIMITE_TABELA_CONFERENCIA:
+                        st.write(f"Mostrando os {LIMITE_TABELA_CONFERENCIA} melhores de {len(acertos)} jogos conferidos:")
+                    st.dataframe(pd.DataFrame({'Jogo': [", ".join(map(str, mascara_para_jogo(m))) for m in mascaras_conferidas[ordem]],
+                                               'Acertos': acertos[ordem]}, index=pd.Index(ordem + 1, name='Nº')), use_container_width=True)
+                    st.subheader("Resumo de Prêmios")
+                    # Apostas de 16 a 20 dezenas contam um prêmio por jogo simples premiado.
+                    premios = premios_por_faixa(mascaras_conferidas, acertos).sum(axis=0)
+                    if premios.sum() > 0:
+                        for coluna in range(len(FAIXAS_PREMIADAS) - 1, -1, -1):
+                            if premios[coluna]:
+                                st.success(f"Você teve **{premios[coluna]}** prêmio(s) de **{FAIXAS_PREMIADAS[coluna]}** acertos!")
                     else:
-                        st.subheader("Resultado da Conferência")
-                        resultados_conferencia = []
-                        premios = Counter()
-                        for i, jogo_set in enumerate(jogos):
-                            if len(jogo_set) > 0:
-                                acertos = len(jogo_set.intersection(resultado_set))
-                                jogo_formatado = ", ".join(map(str, sorted(list(jogo_set))))
-                                resultados_conferencia.append({'Jogo': jogo_formatado, 'Acertos': acertos})
-                                if acertos >= 11:
-                                    premios[acertos] += 1
-                        df_conferencia = pd.DataFrame(resultados_conferencia)
-                        st.dataframe(df_conferencia, use_container_width=True)
-                        st.subheader("Resumo de Prêmios")
-                        if sum(premios.values()) > 0:
-                            for acertos, qtd in sorted(premios.items(), reverse=True):
-                                st.success(f"Você teve **{qtd}** jogo(s) com **{acertos}** acertos!")
-                        else:
-                            st.info("Nenhum jogo premiado (11 ou mais acertos).")
+                        st.info("Nenhum jogo premiado (11 ou mais acertos).")
+                else:
+                    with st.spinner(f"Conferindo {len(mascaras_conferidas)} jogos em {len(todos_os_sorteios)} concursos..."):
+                        historico_conferido = conferir_historico(mascaras_conferidas, mascaras_de_sorteios(todos_os_sorteios))
+                    st.session_state.conferencia_historico = (mascaras_conferidas, historico_conferido)
             except Exception:
                 st.error(f"Ocorreu um erro ao conferir os jogos. Verifique se os números foram digitados corretamente.")
+        if modo_conferencia == "Todo o histórico" and st.session_state.get('conferencia_historico'):
+            mascaras_conferidas, historico_conferido = st.session_state.conferencia_historico
+            melhor, faixas = historico_conferido['melhor_acerto'], historico_conferido['faixas']
+            st.subheader(f"Conferência contra os {len(todos_os_sorteios)} concursos")
+            colunas_premios = st.columns(len(FAIXAS_PREMIADAS))
+            for coluna, faixa in enumerate(FAIXAS_PREMIADAS):
+                colunas_premios[coluna].metric(f"{faixa} acertos", int(faixas[:, coluna].sum()))
+            melhor_jogo = int(np.lexsort((-historico_conferido['posicao_melhor'], melhor))[-1])
+            st.info(f"Melhor resultado da história: **{melhor[melhor_jogo]} acertos** no concurso **{concursos_validos[historico_conferido['posicao_melhor'][melhor_jogo]]}** (jogo nº {melhor_jogo + 1}).")
+            # Ordena pelo melhor acerto e, no empate, pelas faixas mais altas.
+            ordem = np.lexsort(tuple(faixas[:, coluna] for coluna in range(len(FAIXAS_PREMIADAS))) + (melhor,))[::-1][:LIMITE_TABELA_CONFERENCIA]
+            if len(melhor) > LIMITE_TABELA_CONFERENCIA:
+                st.write(f"Mostrando os {LIMITE_TABELA_CONFERENCIA} melhores de {len(melhor)} jogos conferidos:")
+            df_historico = pd.DataFrame({'Jogo': [", ".join(map(str, mascara_para_jogo(m))) for m in mascaras_conferidas[ordem]],
+                                         'Melhor Acerto': melhor[ordem],
+                                         'Concurso do Melhor': np.asarray(concursos_validos)[historico_conferido['posicao_melhor'][ordem]]},
+                                        index=pd.Index(ordem + 1, name='Nº'))
+            for coluna, faixa in enumerate(FAIXAS_PREMIADAS):
+                df_historico[f'{faixa} pts'] = faixas[ordem, coluna]
+            st.dataframe(df_historico, use_container_width=True)
+            with st.expander("📈 Acertos de um jogo em cada concurso"):
+                linha_jogo = st.number_input("Número do jogo:", min_value=1, max_value=len(mascaras_conferidas), value=melhor_jogo + 1, key='linha_jogo_conferido')
+                acertos_jogo = matriz_acertos(mascaras_conferidas[linha_jogo - 1:linha_jogo], mascaras_de_sorteios(todos_os_sorteios))[0]
+                st.write(f"Jogo: `{', '.join(map(str, mascara_para_jogo(mascaras_conferidas[linha_jogo - 1])))}`")
+                st.line_chart(pd.DataFrame({'Acertos': acertos_jogo}, index=pd.Index(concursos_validos, name='Concurso')))
 
     with tab_backtest:
         st.header("🔬 Backtesting de Filtros")
@@ -321,13 +424,32 @@ if df_resultados is not None and not df_resultados.empty:
         if st.session_state.backtest_rodado:
             st.write("---")
             st.subheader("Resultado da Validação")
-            total_testado = len(df_resultados.tail(n_concursos_filtros)) - 1
+            total_testado = len(metricas_backtest(df_resultados, n_concursos_filtros)[0])
             total_alinhado = len(st.session_state.sorteios_alinhados)
             percentual = (total_alinhado / total_testado * 100) if total_testado > 0 else 0
             st.metric(label="Percentual de Alinhamento da Estratégia", value=f"{percentual:.1f} %", delta=f"{total_alinhado} de {total_testado} concursos")
             st.progress(int(percentual))
             with st.expander("Ver concursos que se alinharam com a estratégia"):
                 st.write(st.session_state.sorteios_alinhados)
+        st.write("---")
+        with st.expander("🧮 Varredura de Parâmetros (todas as faixas de uma vez)"):
+            largura_grade = st.slider("Largura máxima de cada faixa:", 1, 6, 3, key='largura_grade')
+            _, metricas_grade = metricas_backtest(df_resultados, n_concursos_filtros)
+            faixas_rep, faixas_imp, faixas_mold = gerar_faixas(0, 15, largura_grade), gerar_faixas(0, 15, largura_grade), gerar_faixas(0, 16, largura_grade)
+            grade = grade_alinhamento(metricas_grade, faixas_rep, faixas_imp, faixas_mold)
+            grade_mold_atual = grade_alinhamento(metricas_grade, faixas_rep, faixas_imp, [(bt_min_mold, bt_max_mold)])[:, :, 0]
+            st.subheader(f"Alinhamento (%) por Repetidas x Ímpares, com Moldura entre {bt_min_mold} e {bt_max_mold}")
+            rotulos_rep = [f"{a}-{b}" for a, b in faixas_rep]
+            rotulos_imp = [f"{a}-{b}" for a, b in faixas_imp]
+            fig_grade = go.Figure(data=go.Heatmap(z=grade_mold_atual, x=rotulos_imp, y=rotulos_rep, colorscale=HEATMAP_COLORS_GREEN, hovertemplate="Repetidas %{y}<br>Ímpares %{x}<br>%{z:.1f}%<extra></extra>"))
+            fig_grade.update_layout(height=600, margin=dict(t=20, l=10, r=10, b=10), xaxis_title="Ímpares", yaxis_title="Repetidas")
+            st.plotly_chart(fig_grade, use_container_width=True)
+            st.subheader("🏅 Melhores combinações de faixas")
+            melhores = np.argsort(grade, axis=None)[::-1][:20]
+            r_idx, i_idx, m_idx = np.unravel_index(melhores, grade.shape)
+            st.dataframe(pd.DataFrame({'Repetidas': [rotulos_rep[i] for i in r_idx], 'Ímpares': [rotulos_imp[i] for i in i_idx],
+                                       'Moldura': [f"{faixas_mold[i][0]}-{faixas_mold[i][1]}" for i in m_idx],
+                                       'Alinhamento (%)': np.round(grade[r_idx, i_idx, m_idx], 1)}), use_container_width=True)
     
     with tab_simulacao:
         st.header("💰 Simulação Avançada")
@@ -342,25 +464,17 @@ if df_resultados is not None and not df_resultados.empty:
             df_freq_alinhada = pd.DataFrame(freq_alinhada.items(), columns=['Dezena', 'Frequência (nos Alinhados)']).sort_values(by='Frequência (nos Alinhados)', ascending=False).set_index('Dezena')
             st.subheader("Análise dos Sorteios Alinhados")
             st.dataframe(df_freq_alinhada, use_container_width=True)
-            if st.button("Gerar 50 Jogos 'Ultra' 💎", type="primary"):
+            c1, c2, c3, c4 = st.columns(4)
+            tamanho_elite = c1.slider("Dezenas no universo de elite:", 19, 23, 19, key='tamanho_elite')
+            n_pares_ultra = c2.slider("Pares considerados:", 5, 100, 20, step=5, key='n_pares_ultra')
+            n_trios_ultra = c3.slider("Trios considerados:", 5, 100, 20, step=5, key='n_trios_ultra')
+            n_jogos_ultra = c4.number_input("Jogos a gerar:", min_value=1, max_value=1000, value=50, step=10, key='n_jogos_ultra')
+            if st.button(f"Gerar {n_jogos_ultra} Jogos 'Ultra' 💎", type="primary"):
                 with st.spinner("Analisando os sorteios alinhados e gerando jogos..."):
-                    universo_elite = [dezena for dezena, freq in freq_alinhada.most_common(19)]
-                    top_pares = encontrar_combinacoes_frequentes(numeros_alinhados, 2, top_n=20)
-                    top_trios = encontrar_combinacoes_frequentes(numeros_alinhados, 3, top_n=20)
-                    st.info(f"Universo de Elite com 19 dezenas encontrado: `{sorted(universo_elite)}`")
-                    candidatos = list(itertools.combinations(universo_elite, 15))
-                    jogos_com_score = []
-                    for jogo in candidatos:
-                        jogo_set = set(jogo)
-                        score = 0
-                        for par, freq in top_pares:
-                            if set(par).issubset(jogo_set): score += 1
-                        for trio, freq in top_trios:
-                            if set(trio).issubset(jogo_set): score += 3
-                        jogos_com_score.append((jogo, score))
-                    jogos_com_score.sort(key=lambda x: x[1], reverse=True)
-                    jogos_finais = [jogo for jogo, score in jogos_com_score[:50]]
-                    st.subheader("🏆 Top 50 Jogos Gerados com a Estratégia Ultra")
+                    universo_elite, jogos_finais, _ = gerar_jogos_ultra(mascaras_de_sorteios(numeros_alinhados), tamanho_elite, n_pares_ultra, n_trios_ultra, n_jogos_ultra)
+                    st.info(f"Universo de Elite com {len(universo_elite)} dezenas encontrado: `{universo_elite}`")
+                    jogos_finais = mascaras_para_matriz(jogos_finais).tolist()
+                    st.subheader(f"🏆 Top {len(jogos_finais)} Jogos Gerados com a Estratégia Ultra")
                     c1, c2, c3 = st.columns(3)
                     for i, jogo in enumerate(jogos_finais):
                         jogo_str = ", ".join(f"{num:02d}" for num in sorted(list(jogo)))
@@ -371,24 +485,45 @@ if df_resultados is not None and not df_resultados.empty:
         st.subheader("Simulação de Custo/Benefício")
         jogos_para_simular = st.text_area("Cole aqui os jogos que você quer testar (um por linha)", height=200, placeholder="Ex: 01, 02, 03...")
         n_concursos_simulacao = st.number_input("Simular apostas nos últimos X concursos:", min_value=10, max_value=len(df_resultados)-1, value=50, step=10, key="n_simulacao")
+        modo_exato = st.checkbox("Modo exato: todos os sorteios possíveis (valor esperado)", key="modo_exato")
+        if modo_exato:
+            c1, c2 = st.columns(2)
+            premio_14 = c1.number_input("Estimativa do prêmio de 14 acertos (R$)", min_value=0.0, value=0.0, step=100.0, key="premio_14_exato")
+            premio_15 = c2.number_input("Estimativa do prêmio de 15 acertos (R$)", min_value=0.0, value=0.0, step=100000.0, key="premio_15_exato")
         if st.button("Calcular Custo/Benefício 💰"):
             try:
                 linhas_simulacao = jogos_para_simular.strip().split('\n')
                 jogos_apostados = [set(int(num.strip()) for num in linha.replace('[', '').replace(']', '').split(',') if num.strip()) for linha in linhas_simulacao if linha]
                 if not jogos_apostados:
                     st.error("Nenhum jogo válido encontrado para simular.")
+                elif modo_exato:
+                    with st.spinner(f"Conferindo {len(jogos_apostados)} jogos contra os {comb(25, 15):,} sorteios possíveis..."):
+                        mascaras_apostadas = np.array([jogo_para_mascara(aposta) for aposta in jogos_apostados], dtype=np.uint32)
+                        premios_exatos = {**PREMIOS_FIXOS, 14: premio_14, 15: premio_15}
+                        valor = calcular_valor_esperado(mascaras_apostadas, premios_exatos)
+                        st.subheader("Valor Esperado Exato")
+                        c1, c2, c3, c4 = st.columns(4)
+                        c1.metric("Custo do Portfólio", f"R$ {valor['custo']:,.2f}")
+                        c2.metric("Retorno Esperado", f"R$ {valor['retorno_esperado']:,.2f}")
+                        c3.metric("Desvio Padrão", f"R$ {valor['desvio_padrao']:,.2f}")
+                        c4.metric("Chance de Não Ter Prejuízo", f"{valor['probabilidade_sem_prejuizo']:.6%}")
+                        st.dataframe(pd.DataFrame({
+                            'Acertos': list(valor['premios_esperados']),
+                            'Prêmios esperados por concurso': list(valor['premios_esperados'].values()),
+                            'Chance por jogo': [f"1 em {1 / p:,.0f}" if p else "-" for p in valor['probabilidade_acertos'].values()],
+                            'Chance do melhor jogo': [f"{p:.6%}" for p in valor['probabilidade_melhor_acerto'].values()],
+                        }), hide_index=True, use_container_width=True)
+                        if not (premio_14 and premio_15):
+                            st.caption("Faixas de 14 e 15 acertos sem estimativa entram com valor zero no retorno esperado.")
                 else:
                     with st.spinner(f"Simulando {len(jogos_apostados)} jogos em {n_concursos_simulacao} concursos..."):
-                        sorteios_para_teste = todos_os_sorteios[-n_concursos_simulacao:]
-                        premios = Counter()
-                        for sorteio_resultado in sorteios_para_teste:
-                            for aposta in jogos_apostados:
-                                acertos = len(aposta.intersection(set(sorteio_resultado)))
-                                if acertos >= 11:
-                                    premios[acertos] += 1
-                        custo_total = len(jogos_apostados) * n_concursos_simulacao * CUSTO_APOSTA
-                        receita_total_fixa = sum(premios[acertos] * PREMIOS_FIXOS.get(acertos, 0) for acertos in [11, 12, 13])
-                        saldo = receita_total_fixa - custo_total
+                        sorteios_para_teste = mascaras_de_sorteios(todos_os_sorteios[-n_concursos_simulacao:])
+                        mascaras_apostadas = np.array([jogo_para_mascara(aposta) for aposta in jogos_apostados], dtype=np.uint32)
+                        simulacao = simular_custo_beneficio(mascaras_apostadas, sorteios_para_teste)
+                        premios = simulacao['premios']
+                        custo_total = simulacao['custo_total']
+                        receita_total_fixa = simulacao['receita_total']
+                        saldo = simulacao['saldo']
                         st.subheader("Relatório Financeiro da Simulação")
                         c1, c2, c3 = st.columns(3)
                         c1.metric("Custo Total Estimado", f"R$ {custo_total:,.2f}")
@@ -400,6 +535,12 @@ if df_resultados is not None and not df_resultados.empty:
                         st.success(f"**13 Acertos:** {premios[13]} prêmio(s) (Receita: R$ {premios[13] * PREMIOS_FIXOS[13]:,.2f})")
                         st.warning(f"**14 Acertos:** {premios[14]} prêmio(s) (valor variável)")
                         st.error(f"**15 Acertos:** {premios[15]} prêmio(s) (valor variável)")
+                        st.subheader("Saldo Acumulado por Concurso")
+                        concursos_simulados = concursos_validos[-n_concursos_simulacao:]
+                        st.line_chart(pd.DataFrame({'Saldo acumulado (R$)': np.cumsum(simulacao['saldo_por_concurso'])}, index=concursos_simulados))
+                        with st.expander("Ver saldo de cada jogo"):
+                            df_saldo_jogos = pd.DataFrame({'Jogo': [", ".join(map(str, sorted(aposta))) for aposta in jogos_apostados], 'Saldo (R$)': simulacao['saldo_por_jogo']})
+                            st.dataframe(df_saldo_jogos.sort_values(by='Saldo (R$)', ascending=False), use_container_width=True)
             except Exception:
                 st.error("Ocorreu um erro ao processar os jogos colados para simulação.")
 
@@ -407,16 +548,39 @@ if df_resultados is not None and not df_resultados.empty:
         st.header("🗺️ Mapa de Calor do Volante")
         st.info("Visualize a 'temperatura' de cada dezena com base em diferentes critérios analíticos.")
         tipo_analise = st.selectbox("Selecione o tipo de análise para o Mapa de Calor:",
-            ("Frequência Geral", "Frequência (Últimos 200 Sorteios)", "Atraso Atual"))
+            ("Frequência Geral", "Frequência (Últimos 200 Sorteios)", "Frequência (Intervalo Livre)", "Frequência Móvel", "Atraso Atual"))
         if tipo_analise == "Frequência Geral":
             frequencia_geral, _ = analisar_frequencia_e_atraso(todos_os_sorteios)
             gerar_mapa_de_calor_plotly(frequencia_geral, "Frequência de cada dezena em todo o histórico", HEATMAP_COLORS_GREEN)
         elif tipo_analise == "Frequência (Últimos 200 Sorteios)":
-            sorteios_recentes = extrair_numeros(df_resultados.tail(200))
-            frequencia_recente = Counter(itertools.chain(*sorteios_recentes))
+            frequencia_recente = consultar_estatisticas(todos_os_sorteios, frequencia_na_janela)
             gerar_mapa_de_calor_plotly(frequencia_recente, "Frequência de cada dezena nos últimos 200 sorteios", HEATMAP_COLORS_GREEN)
+        elif tipo_analise == "Frequência (Intervalo Livre)":
+            concurso_inicio, concurso_fim = st.select_slider("Intervalo de concursos:", options=concursos_validos, value=(concursos_validos[max(len(concursos_validos) - 200, 0)], concursos_validos[-1]))
+            inicio, fim = concursos_validos.index(concurso_inicio), concursos_validos.index(concurso_fim)
+            frequencia_janela = consultar_estatisticas(todos_os_sorteios, lambda estado: frequencia_intervalo(estado, inicio, fim))
+            gerar_mapa_de_calor_plotly(frequencia_janela, f"Frequência de cada dezena entre os concursos {concurso_inicio} e {concurso_fim}", HEATMAP_COLORS_GREEN)
+        elif tipo_analise == "Frequência Móvel":
+            largura_movel = st.slider("Largura da janela (concursos):", 10, 1000, 200, step=10, key='largura_movel')
+            dezenas_movel = st.multiselect("Dezenas:", list(range(1, 26)), default=[1, 13, 25], key='dezenas_movel')
+            movel = consultar_estatisticas(todos_os_sorteios, lambda estado: frequencia_movel(estado, largura_movel))
+            if len(movel) and dezenas_movel:
+                st.subheader(f"Frequência em janela móvel de {largura_movel} concursos")
+                df_movel = pd.DataFrame(movel[:, [d - 1 for d in dezenas_movel]], columns=[f"Dezena {d}" for d in dezenas_movel], index=concursos_validos[largura_movel - 1:])
+                st.line_chart(df_movel)
         elif tipo_analise == "Atraso Atual":
             _, atraso_atual = analisar_frequencia_e_atraso(todos_os_sorteios)
             gerar_mapa_de_calor_plotly(atraso_atual, "Atraso (nº de concursos sem sair) de cada dezena", HEATMAP_COLORS_RED)
+
+    if perfil_ativo():
+        relatorio = relatorio_perfil()
+        if relatorio:
+            painel_perfil.dataframe(pd.DataFrame([{'Etapa': etapa, 'Chamadas': entrada['chamadas'], 'Total (s)': round(entrada['segundos'], 3),
+                                                   'Máx. (s)': round(entrada['max_segundos'], 3),
+                                                   'Pico (MB)': round(entrada['pico_bytes'] / 2**20, 1) if entrada['pico_bytes'] is not None else None}
+                                                  for etapa, entrada in relatorio.items()]).sort_values(by='Total (s)', ascending=False),
+                                    hide_index=True, use_container_width=True)
+        else:
+            painel_perfil.caption("Nenhuma etapa medida ainda: use o app e as medições aparecem aqui.")
 else:
     st.warning("Aguardando o carregamento dos dados...")
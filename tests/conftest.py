@@ -0,0 +1,21 @@
+import os
+import sys
+
+# Os módulos do projeto ficam na raiz do repositório, fora de um pacote.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from indice_jogos import construir_indice, carregar_indice
+
+
+@pytest.fixture(scope="session")
+def diretorio_indice(tmp_path_factory):
+    # O índice dos C(25, 15) jogos é construído uma vez por execução e compartilhado pelos testes.
+    diretorio = str(tmp_path_factory.mktemp("indice") / "indice_jogos")
+    construir_indice(diretorio)
+    return diretorio
+
+
+@pytest.fixture(scope="session")
+def indice(diretorio_indice):
+    return carregar_indice(diretorio_indice, construir_se_ausente=False)
@@ -0,0 +1,107 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+import pandas as pd
+import pytest
+from historico import COLUNAS_BOLAS, COLUNAS_HISTORICO, _salvar_cache, _ler_cache
+from busca_resultados import buscar_concursos_faltantes, atualizar_historico, iniciar_atualizacao_em_segundo_plano
+
+# Servidor HTTP local que imita a API da Caixa: /lotofacil devolve o último concurso e
+# /lotofacil/<n> cada concurso. Os números em `falhas` respondem sempre com o status indicado;
+# os de `instaveis` respondem 503 tantas vezes quanto o valor guardado e depois funcionam.
+ULTIMO_CONCURSO = 20
+
+
+def dezenas_do_concurso(numero):
+    rng = np.random.default_rng(numero)
+    return sorted(int(d) for d in rng.choice(np.arange(1, 26), 15, replace=False))
+
+
+@pytest.fixture
+def api():
+    falhas, instaveis = {}, {}
+
+    class Manipulador(BaseHTTPRequestHandler):
+        def do_GET(self):
+            partes = self.path.strip('/').split('/')
+            numero = int(partes[1]) if len(partes) > 1 else ULTIMO_CONCURSO
+            if instaveis.get(numero):
+                instaveis[numero] -= 1
+                self.send_response(503)
+                self.end_headers()
+                return
+            if numero in falhas or numero > ULTIMO_CONCURSO:
+                self.send_response(falhas.get(numero, 404))
+                self.end_headers()
+                return
+            corpo = json.dumps({'numero': numero, 'dataApuracao': '01/01/2024',
+                                'listaDezenas': [f"{d:02d}" for d in dezenas_do_concurso(numero)]}).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(corpo)))
+            self.end_headers()
+            self.wfile.write(corpo)
+
+        def log_message(self, *args):
+            pass
+
+    servidor = ThreadingHTTPServer(('127.0.0.1', 0), Manipulador)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    yield {'url': f"http://127.0.0.1:{servidor.server_address[1]}/lotofacil", 'falhas': falhas, 'instaveis': instaveis}
+    servidor.shutdown()
+    servidor.server_close()
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    # Sem a planilha no diretório atual, carregar_historico lê direto do cache.
+    monkeypatch.chdir(tmp_path)
+    linhas = [{'Concurso': n, 'Data Sorteio': '01/01/2024', **dict(zip(COLUNAS_BOLAS, dezenas_do_concurso(n)))} for n in range(1, 11)]
+    caminho = str(tmp_path / "historico_cache.npz")
+    _salvar_cache(pd.DataFrame(linhas)[COLUNAS_HISTORICO], caminho, {'mtime_ns': 0, 'tamanho': 0, 'sha256': ''})
+    return caminho
+
+
+def test_busca_todos_os_concursos_faltantes(api):
+    novos, falhas = buscar_concursos_faltantes(10, url_base=api['url'], tentativas=0)
+    assert falhas == {}
+    assert novos['Concurso'].tolist() == list(range(11, ULTIMO_CONCURSO + 1))
+    assert novos.loc[0, COLUNAS_BOLAS].tolist() == dezenas_do_concurso(11)
+
+
+def test_falha_devolve_concursos_ate_o_buraco(api):
+    api['falhas'].update({14: 404, 17: 404})
+    novos, falhas = buscar_concursos_faltantes(10, url_base=api['url'], tentativas=0)
+    assert novos['Concurso'].tolist() == [11, 12, 13]
+    assert sorted(falhas) == [14, 17]
+    assert 'HTTPError' in falhas[14]
+
+
+def test_atualizacao_grava_ate_o_buraco_e_completa_depois(api, cache):
+    api['falhas'][14] = 404
+    gravados, falhas = atualizar_historico(cache, api['url'], tentativas=0)
+    assert gravados == 3 and list(falhas) == [14]
+    assert _ler_cache(cache)[0]['Concurso'].max() == 13
+    # Na próxima atualização o concurso volta a responder e o histórico é completado.
+    api['falhas'].clear()
+    gravados, falhas = atualizar_historico(cache, api['url'], tentativas=0)
+    df = _ler_cache(cache)[0]
+    assert gravados == ULTIMO_CONCURSO - 13 and falhas == {}
+    assert df['Concurso'].tolist() == list(range(1, ULTIMO_CONCURSO + 1))
+    assert df.loc[df['Concurso'] == 14, COLUNAS_BOLAS].values.tolist() == [dezenas_do_concurso(14)]
+
+
+def test_nova_tentativa_apos_erro_503(api):
+    api['instaveis'][15] = 1
+    novos, falhas = buscar_concursos_faltantes(14, url_base=api['url'], tentativas=2)
+    assert falhas == {} and api['instaveis'][15] == 0
+    assert novos['Concurso'].tolist() == list(range(15, ULTIMO_CONCURSO + 1))
+
+
+def test_estado_da_busca_em_segundo_plano(api, cache):
+    api['falhas'][12] = 404
+    estado = iniciar_atualizacao_em_segundo_plano(cache, api['url'], tentativas=0)
+    estado['thread'].join(timeout=30)
+    assert estado['erro'] is None
+    assert estado['novos'] == 1 and list(estado['falhas']) == [12]
@@ -0,0 +1,100 @@
+import re
+import random
+from itertools import combinations
+import numpy as np
+import pytest
+from motor_jogos import DEZENAS_POR_JOGO, jogo_para_mascara, mascaras_de_sorteios
+from simulacao import FAIXAS_PREMIADAS
+from conferidor import ler_jogos, conferir_historico, premios_por_faixa
+
+# O leitor vetorizado é conferido contra um leitor linha a linha com expressões regulares, e a
+# conferência contra a expansão de cada aposta em todos os seus jogos simples de 15 dezenas.
+
+
+def ler_jogos_referencia(texto):
+    mascaras, descartadas = [], 0
+    for linha in texto.split(b'\n'):
+        conteudo_inicio = linha.rfind(b':') + 1
+        numeros = [m for m in re.finditer(rb'\d+', linha[conteudo_inicio:])
+                   if not (m.start() + conteudo_inicio > 0 and re.match(rb'[A-Za-z\x80-\xff]', linha[m.start() + conteudo_inicio - 1:m.start() + conteudo_inicio]))]
+        if not numeros:
+            continue
+        valores = [int(m.group()) for m in numeros]
+        if (any(len(m.group()) > 2 for m in numeros) or any(not 1 <= v <= 25 for v in valores)
+                or len(set(valores)) != len(valores) or not 15 <= len(valores) <= 20):
+            descartadas += 1
+            continue
+        mascaras.append(jogo_para_mascara(valores))
+    return np.array(mascaras, dtype=np.uint32), descartadas
+
+
+def texto_aleatorio(semente, linhas=400):
+    rng = random.Random(semente)
+    partes = []
+    for numero in range(linhas):
+        dezenas = rng.sample(range(1, 26), rng.choice((14, 15, 15, 15, 16, 18, 20, 21)))
+        sorteio = rng.random()
+        if sorteio < 0.05:
+            dezenas[0] = rng.choice((0, 26, 100, 7))  # fora de 1..25, três dígitos ou repetida
+        separador = rng.choice((", ", ",", " ", ";", "\t", " - "))
+        linha = separador.join(f"{d:02d}" if rng.random() < 0.5 else str(d) for d in dezenas)
+        estilo = rng.random()
+        if estilo < 0.2:
+            linha = f"Jogo {numero:03d}: [ {linha} ]"
+        elif estilo < 0.25:
+            linha = "Bola1,Bola2,Bola3"
+        elif estilo < 0.3:
+            linha = ""
+        elif estilo < 0.35:
+            linha = "Aposta nº 7 – " + linha
+        partes.append(linha + rng.choice(("\n", "\r\n")))
+    return "".join(partes).encode()
+
+
+@pytest.mark.parametrize("tamanho_bloco", [7, 100, 4096, 1 << 22])
+def test_leitura_igual_referencia(tamanho_bloco):
+    for semente in range(5):
+        texto = texto_aleatorio(semente)
+        esperado, descartadas = ler_jogos_referencia(texto)
+        obtido, obtido_descartadas = ler_jogos(texto, tamanho_bloco=tamanho_bloco)
+        assert np.array_equal(obtido, esperado) and obtido_descartadas == descartadas
+
+
+def test_leitura_de_texto_e_ultima_linha_sem_quebra():
+    jogos, descartadas = ler_jogos("1,2,3,4,5,6,7,8,9,10,11,12,13,14,15\n16 17 18 19 20 21 22 23 24 25 1 2 3 4 5")
+    assert descartadas == 0
+    assert jogos.tolist() == [jogo_para_mascara(range(1, 16)), jogo_para_mascara(list(range(16, 26)) + [1, 2, 3, 4, 5])]
+
+
+def conferir_referencia(jogos, sorteios):
+    melhor, posicao, faixas = [], [], []
+    for jogo in jogos:
+        simples = list(combinations(jogo, DEZENAS_POR_JOGO))
+        acertos = [[len(set(s) & set(sorteio)) for s in simples] for sorteio in sorteios]
+        maximos = [max(a) for a in acertos]
+        melhor.append(max(maximos))
+        posicao.append(maximos.index(max(maximos)))
+        faixas.append([sum(a.count(faixa) for a in acertos) for faixa in FAIXAS_PREMIADAS])
+    return melhor, posicao, faixas
+
+
+@pytest.mark.parametrize("processos", [1, 2])
+def test_conferencia_expande_apostas_de_16_a_20_dezenas(processos):
+    rng = random.Random(3)
+    sorteios = [sorted(rng.sample(range(1, 26), 15)) for _ in range(40)]
+    jogos = [sorted(rng.sample(range(1, 26), k)) for k in (15, 15, 16, 17, 18)]
+    # Apostas que contêm um sorteio inteiro: 16 e 17 dezenas com 15 acertos.
+    jogos += [sorted(sorteios[5] + [d for d in range(1, 26) if d not in sorteios[5]][:extras]) for extras in (1, 2)]
+    resultado = conferir_historico([jogo_para_mascara(jogo) for jogo in jogos], mascaras_de_sorteios(sorteios), processos=processos)
+    melhor, posicao, faixas = conferir_referencia(jogos, sorteios)
+    assert resultado['melhor_acerto'].tolist() == melhor
+    assert resultado['posicao_melhor'].tolist() == posicao
+    assert resultado['faixas'].tolist() == faixas
+    assert faixas[-2][-2:] == [15, 1]
+
+
+def test_premios_de_um_sorteio():
+    # Acertos contra o sorteio 1..15.
+    jogos = [jogo_para_mascara(range(1, 17)), jogo_para_mascara(list(range(3, 18))), jogo_para_mascara(range(1, 21))]
+    acertos = [15, 13, 15]
+    assert premios_por_faixa(jogos, acertos).tolist() == [[0, 0, 0, 15, 1], [0, 0, 1, 0, 0], [6825, 4550, 1050, 75, 1]]
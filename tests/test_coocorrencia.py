@@ -0,0 +1,57 @@
+import random
+from collections import Counter
+from itertools import combinations
+import numpy as np
+import pytest
+from motor_jogos import DEZENAS_POR_JOGO, jogo_para_mascara
+from coocorrencia import contar_pares, contar_trios, contar_subconjuntos, combinacoes_frequentes
+
+# As contagens por álgebra de matrizes e por máscaras são conferidas contra a enumeração direta
+# das tuplas de cada concurso com itertools.combinations e Counter.
+
+
+@pytest.fixture(scope="module")
+def sorteios():
+    rng = random.Random(7)
+    return [sorted(rng.sample(range(1, 26), DEZENAS_POR_JOGO)) for _ in range(300)]
+
+
+@pytest.fixture(scope="module")
+def mascaras(sorteios):
+    return np.array([jogo_para_mascara(sorteio) for sorteio in sorteios], dtype=np.uint32)
+
+
+def contagem_direta(sorteios, tamanho):
+    return Counter(tupla for sorteio in sorteios for tupla in combinations(sorteio, tamanho))
+
+
+def test_pares_e_trios(sorteios, mascaras):
+    pares, trios = contar_pares(mascaras), contar_trios(mascaras)
+    for (a, b), vezes in contagem_direta(sorteios, 2).items():
+        assert pares[a - 1, b - 1] == pares[b - 1, a - 1] == vezes
+    for (a, b, c), vezes in contagem_direta(sorteios, 3).items():
+        assert trios[a - 1, b - 1, c - 1] == trios[c - 1, a - 1, b - 1] == vezes
+    assert pares.sum() == len(sorteios) * DEZENAS_POR_JOGO ** 2
+
+
+@pytest.mark.parametrize("tamanho", [4, 5])
+def test_subconjuntos(sorteios, mascaras, tamanho):
+    subconjuntos, contagens = contar_subconjuntos(mascaras, tamanho)
+    esperado = contagem_direta(sorteios, tamanho)
+    todos = list(combinations(range(1, 26), tamanho))
+    assert subconjuntos.tolist() == [jogo_para_mascara(tupla) for tupla in todos]
+    assert contagens.tolist() == [esperado.get(tupla, 0) for tupla in todos]
+
+
+@pytest.mark.parametrize("tamanho", [1, 2, 3, 4, 5])
+def test_top_n_igual_most_common(sorteios, mascaras, tamanho):
+    esperado = contagem_direta(sorteios, tamanho)
+    # Empates em ordem lexicográfica, como a ordenação estável de combinacoes_frequentes.
+    ordenado = sorted(esperado.items(), key=lambda item: (-item[1], item[0]))
+    for top_n in (1, 15, 40):
+        assert combinacoes_frequentes(mascaras, tamanho, top_n) == ordenado[:top_n]
+
+
+def test_tamanho_invalido(mascaras):
+    with pytest.raises(ValueError):
+        combinacoes_frequentes(mascaras, 6)
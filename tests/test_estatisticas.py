@@ -0,0 +1,92 @@
+import random
+from collections import Counter
+import numpy as np
+import pytest
+from estatisticas import (criar_estado_estatisticas, anexar_sorteio, sincronizar_estatisticas, frequencia_e_atraso,
+                          frequencia_na_janela, frequencia_intervalo, frequencia_recente, frequencia_movel)
+
+# O estado incremental (soma de prefixos com folga, janela móvel) é conferido contra Counter
+# sobre fatias do histórico, depois de sequências de anexos e sincronizações.
+JANELA = 20
+
+
+def sorteios_aleatorios(quantidade, semente=0):
+    rng = random.Random(semente)
+    return [sorted(rng.sample(range(1, 26), 15)) for _ in range(quantidade)]
+
+
+def contar(sorteios):
+    return Counter(dezena for sorteio in sorteios for dezena in sorteio)
+
+
+def conferir_estado(estado, sorteios):
+    frequencia, atraso = frequencia_e_atraso(estado)
+    assert frequencia == contar(sorteios)
+    for dezena in range(1, 26):
+        ultimo = max((i for i, sorteio in enumerate(sorteios) if dezena in sorteio), default=None)
+        assert atraso[dezena] == (len(sorteios) - 1 - ultimo if ultimo is not None else len(sorteios))
+    assert frequencia_na_janela(estado) == contar(sorteios[-JANELA:])
+    rng = random.Random(len(sorteios))
+    for _ in range(20):
+        inicio, fim = sorted(rng.randint(-3, len(sorteios) + 3) for _ in range(2))
+        assert frequencia_intervalo(estado, inicio, fim) == contar(sorteios[max(inicio, 0):max(fim + 1, 0)])
+    for quantidade in (1, JANELA, len(sorteios) + 5):
+        assert frequencia_recente(estado, quantidade) == contar(sorteios[-quantidade:])
+    for largura in (1, 7, max(len(sorteios), 1)):
+        movel = frequencia_movel(estado, largura)
+        assert len(movel) == max(len(sorteios) - largura + 1, 0)
+        for posicao in (0, len(movel) // 2, len(movel) - 1)[:len(movel)]:
+            janela = contar(sorteios[posicao:posicao + largura])
+            assert movel[posicao].tolist() == [janela[dezena] for dezena in range(1, 26)]
+
+
+def test_anexos_passam_da_capacidade_e_da_janela():
+    sorteios = sorteios_aleatorios(150)
+    estado = criar_estado_estatisticas(sorteios[:3], JANELA)
+    capacidade_inicial = len(estado['acumulado'])
+    for tamanho in range(4, len(sorteios) + 1):
+        anexar_sorteio(estado, sorteios[tamanho - 1])
+        if tamanho in (JANELA - 1, JANELA, JANELA + 1, capacidade_inicial - 1, capacidade_inicial, 150):
+            conferir_estado(estado, sorteios[:tamanho])
+    assert len(estado['acumulado']) > capacidade_inicial
+
+
+def test_estado_vazio():
+    estado = criar_estado_estatisticas([], JANELA)
+    assert frequencia_e_atraso(estado) == (Counter(), {dezena: 0 for dezena in range(1, 26)})
+    anexar_sorteio(estado, list(range(1, 16)))
+    conferir_estado(estado, [list(range(1, 16))])
+
+
+def test_sincronizacao_incremental_igual_a_reconstrucao():
+    sorteios = sorteios_aleatorios(300, semente=1)
+    estado = None
+    for tamanho in (0, 1, 19, 20, 21, 64, 65, 200, 300):
+        anterior = estado
+        estado = sincronizar_estatisticas(estado, sorteios[:tamanho], JANELA)
+        if anterior is not None:
+            assert estado is anterior  # só cresceu no final: anexos, sem reconstruir
+        conferir_estado(estado, sorteios[:tamanho])
+
+
+def test_correcao_retroativa_reconstroi_o_estado():
+    sorteios = sorteios_aleatorios(700, semente=2)
+    estado = sincronizar_estatisticas(None, sorteios, JANELA)
+    corrigidos = [list(sorteio) for sorteio in sorteios]
+    corrigidos[100] = sorted(set(range(1, 26)) - set(corrigidos[100]))[:10] + corrigidos[100][:5]
+    corrigidos[100].sort()
+    assert corrigidos[100] != sorteios[100]
+    novo = sincronizar_estatisticas(estado, corrigidos, JANELA)
+    assert novo is not estado
+    conferir_estado(novo, corrigidos)
+    # Histórico menor ou janela diferente também reconstroem.
+    assert sincronizar_estatisticas(novo, corrigidos[:-1], JANELA) is not novo
+    assert sincronizar_estatisticas(novo, corrigidos, JANELA + 1)['janela'] == JANELA + 1
+
+
+def test_largura_invalida():
+    estado = criar_estado_estatisticas(sorteios_aleatorios(10), JANELA)
+    for largura in (0, -1):
+        with pytest.raises(ValueError):
+            frequencia_movel(estado, largura)
+    assert np.array_equal(frequencia_movel(estado, 10)[0], frequencia_movel(estado, 10).sum(axis=0))
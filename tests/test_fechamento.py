@@ -0,0 +1,58 @@
+import random
+from itertools import combinations
+from math import comb
+import numpy as np
+import pytest
+import fechamento
+from motor_jogos import DEZENAS_POR_JOGO, jogo_para_mascara, mascara_para_jogo
+from fechamento import construir_fechamento
+
+# A garantia do fechamento é conferida por força bruta: para cada subconjunto de `condicao`
+# dezenas do universo, algum jogo escolhido precisa acertar pelo menos `garantia` delas.
+
+
+def alvos_cobertos(jogos, universo, garantia, condicao):
+    conjuntos = [set(jogo) for jogo in jogos]
+    return sum(any(len(jogo.intersection(alvo)) >= garantia for jogo in conjuntos)
+               for alvo in combinations(universo, condicao))
+
+
+def casos(semente):
+    rng = random.Random(semente)
+    for tamanho_universo in (17, 18):
+        universo = sorted(rng.sample(range(1, 26), tamanho_universo))
+        todos = [jogo_para_mascara(jogo) for jogo in combinations(universo, DEZENAS_POR_JOGO)]
+        for garantia, condicao in ((11, 15), (13, 15), (14, 15), (11, 13), (12, 12)):
+            # Com todos os jogos do universo a garantia é sempre completa; com uma amostra, nem sempre.
+            yield universo, todos, garantia, condicao
+            yield universo, rng.sample(todos, rng.randint(3, 40)), garantia, condicao
+
+
+@pytest.mark.parametrize("bloco", [None, 7])
+def test_garantia_igual_forca_bruta(monkeypatch, bloco):
+    if bloco is not None:
+        # Blocos pequenos de candidatos exercitam a montagem dos bitsets em várias threads.
+        monkeypatch.setattr(fechamento, '_BLOCO_CANDIDATOS', bloco)
+    for universo, candidatos, garantia, condicao in casos(3 if bloco is None else 4):
+        resultado = construir_fechamento(np.array(candidatos, dtype=np.uint32), universo, garantia, condicao, processos=4)
+        jogos = [mascara_para_jogo(int(mascara)) for mascara in resultado['jogos']]
+        assert set(int(mascara) for mascara in resultado['jogos']) <= set(candidatos)
+        assert len(set(int(mascara) for mascara in resultado['jogos'])) == len(jogos)
+        cobertos = alvos_cobertos(jogos, universo, garantia, condicao)
+        # O guloso só para quando nenhum candidato cobre mais nada: cobre tudo o que é cobrível.
+        cobriveis = alvos_cobertos([mascara_para_jogo(mascara) for mascara in candidatos], universo, garantia, condicao)
+        assert resultado['alvos_cobertos'] == cobertos == cobriveis
+        assert resultado['alvos'] == comb(len(universo), condicao)
+        assert resultado['garantia_completa'] == (cobertos == resultado['alvos'])
+        if len(candidatos) == comb(len(universo), DEZENAS_POR_JOGO):
+            assert resultado['garantia_completa']
+        assert resultado['custo'] == len(jogos) * fechamento.CUSTO_APOSTA
+
+
+def test_parametros_invalidos():
+    universo = list(range(1, 18))
+    for garantia, condicao in ((0, 15), (12, 11), (11, 16)):
+        with pytest.raises(ValueError):
+            construir_fechamento(np.zeros(0, dtype=np.uint32), universo, garantia, condicao)
+    with pytest.raises(ValueError):
+        construir_fechamento(np.zeros(0, dtype=np.uint32), list(range(1, 14)), 11, 14)
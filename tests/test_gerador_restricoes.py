@@ -0,0 +1,123 @@
+import random
+from itertools import combinations
+import numpy as np
+import pytest
+from motor_jogos import DEZENAS_POR_JOGO, IMPARES, MOLDURA_DEZENAS, PRIMOS, jogo_para_mascara, filtrar_jogos
+import gerador_restricoes
+from gerador_restricoes import gerar_jogos_com_restricoes
+from indice_jogos import consultar_indice
+
+# Os cortes do branch-and-bound (e os filtros vetorizados) são conferidos contra a força bruta:
+# itertools.combinations do universo filtrado com conjuntos do Python, sem nenhum corte.
+CASOS = 60
+
+
+def faixa_em_volta(rng, valor, largura):
+    # Faixa aleatória que contém `valor`, ou nenhuma restrição (None) em parte dos casos.
+    if rng.random() < 0.25:
+        return None
+    return max(valor - rng.randint(0, largura), 0), valor + rng.randint(0, largura)
+
+
+def restricoes_aleatorias(rng, universo, ultimo_sorteio):
+    # As faixas ficam em volta das métricas de um jogo do universo, para a maioria dos casos ter
+    # jogos aprovados; fixas e excluídas às vezes contradizem esse jogo e esvaziam o resultado.
+    jogo = sorted(rng.sample(universo, DEZENAS_POR_JOGO))
+    conjunto = set(jogo)
+    restricoes = {'repetidas': faixa_em_volta(rng, len(conjunto & set(ultimo_sorteio)), 2),
+                  'impares': faixa_em_volta(rng, len(conjunto & IMPARES), 2),
+                  'moldura': faixa_em_volta(rng, len(conjunto & MOLDURA_DEZENAS), 2),
+                  'primos': faixa_em_volta(rng, len(conjunto & PRIMOS), 2),
+                  'soma': faixa_em_volta(rng, sum(jogo), 25)}
+    if rng.random() < 0.6:
+        restricoes['max_sequencia'] = maior_sequencia_jogo(jogo) + rng.randint(-1, 2)
+    if rng.random() < 0.5:
+        restricoes['fixas'] = rng.sample(universo, rng.randint(1, 4))
+    if rng.random() < 0.5:
+        restricoes['excluidas'] = rng.sample(universo, rng.randint(1, 2))
+    return restricoes
+
+
+def maior_sequencia_jogo(jogo):
+    maior = atual = 1
+    for anterior, dezena in zip(jogo, jogo[1:]):
+        atual = atual + 1 if dezena == anterior + 1 else 1
+        maior = max(maior, atual)
+    return maior
+
+
+def aprovado(jogo, restricoes, ultimo_sorteio):
+    conjunto = set(jogo)
+    for nome, referencia in (('repetidas', ultimo_sorteio), ('impares', IMPARES), ('moldura', MOLDURA_DEZENAS), ('primos', PRIMOS)):
+        faixa = restricoes.get(nome)
+        if faixa is not None and not faixa[0] <= len(conjunto & set(referencia)) <= faixa[1]:
+            return False
+    soma = restricoes.get('soma')
+    if soma is not None and not soma[0] <= sum(jogo) <= soma[1]:
+        return False
+    if restricoes.get('max_sequencia') is not None and maior_sequencia_jogo(jogo) > restricoes['max_sequencia']:
+        return False
+    if not set(restricoes.get('fixas') or []) <= conjunto or conjunto & set(restricoes.get('excluidas') or []):
+        return False
+    return True
+
+
+def forca_bruta(universo, restricoes, ultimo_sorteio):
+    return np.array([jogo_para_mascara(jogo) for jogo in combinations(sorted(universo), DEZENAS_POR_JOGO)
+                     if aprovado(jogo, restricoes, ultimo_sorteio)], dtype=np.uint32)
+
+
+def gerar(universo, restricoes, ultimo_sorteio, **opcoes):
+    blocos = list(gerar_jogos_com_restricoes(universo, restricoes, ultimo_sorteio, **opcoes))
+    return np.concatenate(blocos) if blocos else np.zeros(0, dtype=np.uint32)
+
+
+def casos(semente, tamanhos=(15, 16, 17, 18, 19)):
+    rng = random.Random(semente)
+    for _ in range(CASOS):
+        universo = sorted(rng.sample(range(1, 26), rng.choice(tamanhos)))
+        ultimo_sorteio = sorted(rng.sample(range(1, 26), DEZENAS_POR_JOGO))
+        yield universo, restricoes_aleatorias(rng, universo, ultimo_sorteio), ultimo_sorteio
+
+
+@pytest.mark.parametrize("semente", range(3))
+def test_gerador_com_restricoes_igual_forca_bruta(semente):
+    for universo, restricoes, ultimo_sorteio in casos(semente):
+        esperado = forca_bruta(universo, restricoes, ultimo_sorteio)
+        # Blocos pequenos também exercitam a divisão da saída em vários blocos.
+        assert np.array_equal(gerar(universo, restricoes, ultimo_sorteio, tamanho_bloco=7), esperado), (universo, restricoes)
+
+
+@pytest.mark.parametrize("sufixo", [0, 3, 8])
+def test_cortes_em_python_ate_o_sufixo_vetorizado(monkeypatch, sufixo):
+    # Com sufixo curto, a maior parte da árvore é percorrida em Python antes de completar os jogos.
+    monkeypatch.setattr(gerador_restricoes, 'TAMANHO_SUFIXO_VETORIZADO', sufixo)
+    for universo, restricoes, ultimo_sorteio in casos(40 + sufixo, tamanhos=(15, 17, 19)):
+        esperado = forca_bruta(universo, restricoes, ultimo_sorteio)
+        assert np.array_equal(gerar(universo, restricoes, ultimo_sorteio, tamanho_bloco=5), esperado), (universo, restricoes)
+        assert np.array_equal(gerar(universo, restricoes, ultimo_sorteio, limite=13), esperado[:13])
+
+
+def test_limite_devolve_os_primeiros_jogos():
+    for universo, restricoes, ultimo_sorteio in casos(10):
+        esperado = forca_bruta(universo, restricoes, ultimo_sorteio)
+        limite = random.Random(len(esperado)).randint(1, 50)
+        assert np.array_equal(gerar(universo, restricoes, ultimo_sorteio, limite=limite), esperado[:limite])
+
+
+def test_filtros_vetorizados_igual_forca_bruta():
+    for universo, restricoes, ultimo_sorteio in casos(20):
+        todos = np.array([jogo_para_mascara(jogo) for jogo in combinations(universo, DEZENAS_POR_JOGO)], dtype=np.uint32)
+        obtido = filtrar_jogos(todos, ultimo_sorteio, **restricoes)
+        assert np.array_equal(obtido, forca_bruta(universo, restricoes, ultimo_sorteio)), (universo, restricoes)
+
+
+def test_repetidas_sem_ultimo_sorteio_gera_erro():
+    with pytest.raises(ValueError):
+        gerar(range(1, 19), {'repetidas': (8, 10)}, None)
+
+
+def test_consulta_ao_indice_igual_gerador(indice):
+    for universo, restricoes, ultimo_sorteio in casos(30, tamanhos=(15, 17, 19, 21)):
+        esperado = gerar(universo, restricoes, ultimo_sorteio)
+        assert np.array_equal(consultar_indice(indice, universo, ultimo_sorteio, **restricoes), esperado), (universo, restricoes)
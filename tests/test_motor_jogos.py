@@ -0,0 +1,71 @@
+import random
+from itertools import combinations
+import numpy as np
+import pytest
+from motor_jogos import (DEZENAS_POR_JOGO, IMPARES, MOLDURA_DEZENAS, PRIMOS, jogo_para_mascara, mascara_para_jogo,
+                         contar_bits, somar_dezenas, calcular_contagens, maior_sequencia, iterar_blocos_combinacoes,
+                         gerar_combinacoes, gerar_jogos_filtrados)
+
+# As operações sobre máscaras são conferidas contra as mesmas contas feitas jogo a jogo.
+
+
+def jogos_aleatorios(quantidade, semente=0):
+    rng = random.Random(semente)
+    return [sorted(rng.sample(range(1, 26), rng.randint(1, 25))) for _ in range(quantidade)]
+
+
+def test_mascara_ida_e_volta():
+    for jogo in jogos_aleatorios(200):
+        assert mascara_para_jogo(jogo_para_mascara(jogo)) == jogo
+
+
+def test_contagens_por_jogo():
+    jogos = jogos_aleatorios(500)
+    mascaras = np.array([jogo_para_mascara(jogo) for jogo in jogos], dtype=np.uint32)
+    ultimo_sorteio = jogos[0]
+    contagens = calcular_contagens(mascaras, ultimo_sorteio)
+    assert contar_bits(mascaras).tolist() == [len(jogo) for jogo in jogos]
+    assert somar_dezenas(mascaras).tolist() == [sum(jogo) for jogo in jogos]
+    assert contagens['impares'].tolist() == [len(set(jogo) & IMPARES) for jogo in jogos]
+    assert contagens['moldura'].tolist() == [len(set(jogo) & MOLDURA_DEZENAS) for jogo in jogos]
+    assert contagens['primos'].tolist() == [len(set(jogo) & PRIMOS) for jogo in jogos]
+    assert contagens['repetidas'].tolist() == [len(set(jogo) & set(ultimo_sorteio)) for jogo in jogos]
+
+
+def test_maior_sequencia():
+    jogos = jogos_aleatorios(500, semente=1)
+    esperado = []
+    for jogo in jogos:
+        maior = atual = 1
+        for anterior, dezena in zip(jogo, jogo[1:]):
+            atual = atual + 1 if dezena == anterior + 1 else 1
+            maior = max(maior, atual)
+        esperado.append(maior)
+    assert maior_sequencia([jogo_para_mascara(jogo) for jogo in jogos]).tolist() == esperado
+
+
+@pytest.mark.parametrize("tamanho_universo,tamanho,tamanho_bloco", [(15, 15, 1 << 20), (18, 15, 500), (20, 5, 4096), (25, 3, 1 << 10)])
+def test_blocos_na_ordem_de_itertools(tamanho_universo, tamanho, tamanho_bloco):
+    universo = random.Random(tamanho_universo).sample(range(1, 26), tamanho_universo)
+    blocos = list(iterar_blocos_combinacoes(universo, tamanho, tamanho_bloco))
+    obtido = np.concatenate(blocos)
+    esperado = [jogo_para_mascara(jogo) for jogo in combinations(sorted(universo), tamanho)]
+    assert obtido.tolist() == esperado
+    assert np.array_equal(gerar_combinacoes(universo, tamanho), obtido)
+
+
+def test_universo_pequeno_nao_gera_jogos():
+    assert list(iterar_blocos_combinacoes(range(1, 15))) == []
+    assert len(gerar_combinacoes(range(1, 15))) == 0
+
+
+def test_jogos_filtrados_respeitam_o_limite():
+    universo = list(range(1, 19))
+    todos = gerar_combinacoes(universo)
+    impares = contar_bits(todos & np.uint32(jogo_para_mascara(IMPARES)))
+    esperado = todos[(impares >= 7) & (impares <= 9)]
+    for limite in (None, 1, 37, len(esperado) + 5):
+        blocos = list(gerar_jogos_filtrados(universo, limite=limite, tamanho_bloco=1000, impares=(7, 9)))
+        obtido = np.concatenate(blocos)
+        assert np.array_equal(obtido, esperado[:limite])
+        assert (contar_bits(obtido) == DEZENAS_POR_JOGO).all()
@@ -0,0 +1,70 @@
+import random
+from math import comb
+import numpy as np
+import pytest
+import simulacao
+from motor_jogos import DEZENAS_POR_JOGO, jogo_para_mascara
+from indice_jogos import TOTAL_JOGOS
+from simulacao import FAIXAS_PREMIADAS, PREMIOS_FIXOS, CUSTO_APOSTA, calcular_valor_esperado, matriz_acertos
+
+# O valor esperado exato (em blocos de sorteios, fatias de jogos e processos) é conferido contra
+# uma passada direta de matriz_acertos sobre todos os sorteios do índice e contra a hipergeométrica.
+
+
+def portfolio(quantidade, semente=0):
+    rng = random.Random(semente)
+    return np.array([jogo_para_mascara(rng.sample(range(1, 26), DEZENAS_POR_JOGO)) for _ in range(quantidade)], dtype=np.uint32)
+
+
+def passada_direta(jogos, sorteios, premios=PREMIOS_FIXOS, custo_aposta=CUSTO_APOSTA):
+    valores = np.zeros(DEZENAS_POR_JOGO + 1)
+    for faixa, valor in premios.items():
+        valores[faixa] = valor
+    contagem = np.zeros(DEZENAS_POR_JOGO + 1, dtype=np.int64)
+    melhor = np.zeros(DEZENAS_POR_JOGO + 1, dtype=np.int64)
+    retornos = []
+    for inicio in range(0, len(sorteios), 1 << 18):
+        acertos = matriz_acertos(jogos, np.asarray(sorteios[inicio:inicio + (1 << 18)]))
+        contagem += np.bincount(acertos.ravel(), minlength=DEZENAS_POR_JOGO + 1)
+        melhor += np.bincount(acertos.max(axis=0), minlength=DEZENAS_POR_JOGO + 1)
+        retornos.append(valores[acertos].sum(axis=0))
+    retorno = np.concatenate(retornos)
+    return contagem, melhor, retorno, len(jogos) * custo_aposta
+
+
+def conferir(resultado, jogos, contagem, melhor, retorno, custo):
+    assert resultado['sorteios_possiveis'] == TOTAL_JOGOS
+    for faixa in FAIXAS_PREMIADAS:
+        assert resultado['premios_esperados'][faixa] == pytest.approx(contagem[faixa] / TOTAL_JOGOS, rel=1e-12)
+        assert resultado['probabilidade_acertos'][faixa] == pytest.approx(contagem[faixa] / (TOTAL_JOGOS * len(jogos)), rel=1e-12)
+        assert resultado['probabilidade_melhor_acerto'][faixa] == pytest.approx(melhor[faixa] / TOTAL_JOGOS, rel=1e-12)
+    assert resultado['retorno_esperado'] == pytest.approx(retorno.mean(), rel=1e-9)
+    assert resultado['variancia'] == pytest.approx(retorno.var(), rel=1e-6)
+    assert resultado['probabilidade_sem_prejuizo'] == (retorno >= custo).sum() / TOTAL_JOGOS
+    assert resultado['custo'] == custo
+
+
+@pytest.mark.parametrize("memoria", [None, 1, 1 << 21])
+def test_valor_esperado_igual_passada_direta(monkeypatch, diretorio_indice, indice, memoria):
+    # Memória mínima força fatias de um jogo; 2 MB, fatias de alguns jogos com resto no final.
+    if memoria is not None:
+        monkeypatch.setattr(simulacao, 'MEMORIA_BLOCO_EXATO', memoria)
+    jogos = portfolio(7)
+    resultado = calcular_valor_esperado(jogos, processos=1, diretorio_indice=diretorio_indice)
+    conferir(resultado, jogos, *passada_direta(jogos, indice['mascara']))
+
+
+def test_valor_esperado_em_processos(diretorio_indice, indice):
+    jogos = portfolio(4, semente=1)
+    premios = {11: 6.0, 12: 12.0, 13: 30.0, 14: 1500.0}
+    resultado = calcular_valor_esperado(jogos, premios, processos=3, diretorio_indice=diretorio_indice)
+    conferir(resultado, jogos, *passada_direta(jogos, indice['mascara'], premios))
+
+
+def test_jogo_unico_segue_a_hipergeometrica(diretorio_indice):
+    resultado = calcular_valor_esperado(portfolio(1, semente=2), processos=1, diretorio_indice=diretorio_indice)
+    esperado = {faixa: comb(15, faixa) * comb(10, 15 - faixa) / comb(25, 15) for faixa in FAIXAS_PREMIADAS}
+    for faixa in FAIXAS_PREMIADAS:
+        assert resultado['probabilidade_acertos'][faixa] == pytest.approx(esperado[faixa], rel=1e-12)
+        assert resultado['probabilidade_melhor_acerto'][faixa] == pytest.approx(esperado[faixa], rel=1e-12)
+    assert resultado['retorno_esperado'] == pytest.approx(sum(PREMIOS_FIXOS[faixa] * esperado[faixa] for faixa in PREMIOS_FIXOS))